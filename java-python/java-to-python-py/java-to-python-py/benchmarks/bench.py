@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.corpus import CorpusSpec, count_nodes, generate_project
+from benchmarks.startup import run_startup
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 内置场景：每个只放大一个维度，便于定位是哪类输入变慢
+SUITE: Dict[str, Dict[str, int]] = {
+    "baseline": {},
+    "wide": {"files": 60, "methods": 4},
+    "deep": {"files": 4, "depth": 7, "statements": 2},
+    "long_expr": {"files": 4, "expr_len": 60},
+    "overloads": {"files": 4, "overloads": 6},
+}
+
+# 比较时的方向：+1 越大越好，-1 越小越好
+METRICS = {"nodes_per_sec": 1, "lines_per_sec": 1, "peak_rss_kb": -1}
+
+
+def _peak_rss_kb() -> int:
+    # Linux 上 ru_maxrss 单位是 KB，macOS 上是字节
+    scale = 1024 if sys.platform == "darwin" else 1
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale
+    return max(own, kids)
+
+
+def run_once(in_json: str, jobs: int = 1, executor: str = "process", stream: bool = False) -> Dict[str, Any]:
+    """在当前进程里按 run_converter 的方式转换一次（加载 + Converter.run），返回各阶段耗时。"""
+    from converter.converter import Converter
+    from converter.node import load_ast
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_py = os.path.join(tmp, "out.py")
+        start = time.perf_counter()
+        if stream:
+            conv = Converter(None)
+            load_ms = 0.0
+        else:
+            with open(in_json, encoding="utf-8") as f:
+                ast = load_ast(f)
+            load_ms = (time.perf_counter() - start) * 1000
+            conv = Converter(ast)
+        result = conv.run(in_json, out_py, stream=stream, jobs=jobs, executor=executor, quiet=True)
+        total_ms = (time.perf_counter() - start) * 1000
+    phases = dict(result["timing"].get("phases") or {})
+    phases["load_ms"] = load_ms
+    return {
+        "total_ms": total_ms,
+        "phases_ms": phases,
+        "lines": result["timing"]["lines"],
+        "efficiency": result["efficiency"],
+        "parse_rate": result["syntax"].get("rate", 0.0),
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def _run_isolated(in_json: str, jobs: int, executor: str, stream: bool) -> Dict[str, Any]:
+    # 每次在新进程里跑：峰值 RSS 与各级缓存都不受前一次影响
+    cmd = [sys.executable, "-m", "benchmarks", "_once", in_json, "--jobs", str(jobs), "--executor", executor]
+    if stream:
+        cmd.append("--stream")
+    out = subprocess.run(cmd, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run_suite(cases: List[str], scale: float = 1.0, repeat: int = 3, jobs: int = 1, executor: str = "process",
+              stream: bool = False, log=print) -> Dict[str, Any]:
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scale": scale,
+            "repeat": repeat,
+            "jobs": jobs,
+            "executor": executor,
+            "stream": stream,
+        },
+        "cases": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in cases:
+            spec = CorpusSpec(**SUITE[name])
+            spec.files = max(1, round(spec.files * scale))
+            ast = generate_project(spec)
+            nodes = count_nodes(ast)
+            in_json = os.path.join(tmp, f"{name}.json")
+            with open(in_json, "w", encoding="utf-8") as f:
+                json.dump(ast, f, ensure_ascii=False)
+            ast = None
+            runs = [_run_isolated(in_json, jobs, executor, stream) for _ in range(max(1, repeat))]
+            runs.sort(key=lambda r: r["total_ms"])
+            median = runs[len(runs) // 2]
+            seconds = median["total_ms"] / 1000
+            case = {
+                "spec": spec.to_dict(),
+                "nodes": nodes,
+                "lines": median["lines"],
+                "nodes_per_sec": nodes / seconds if seconds else 0.0,
+                "lines_per_sec": median["lines"] / seconds if seconds else 0.0,
+                "peak_rss_kb": max(r["peak_rss_kb"] for r in runs),
+                "total_ms": median["total_ms"],
+                "total_ms_runs": [r["total_ms"] for r in runs],
+                "stdev_ms": statistics.pstdev([r["total_ms"] for r in runs]),
+                "phases_ms": median["phases_ms"],
+                "efficiency": median["efficiency"],
+                "parse_rate": median["parse_rate"],
+            }
+            report["cases"][name] = case
+            log(f"{name:<10} 节点 {nodes:>8}  {case['nodes_per_sec']:>10.0f} 节点/s  "
+                f"{case['lines_per_sec']:>9.0f} 行/s  峰值RSS {case['peak_rss_kb'] / 1024:>7.1f} MB  "
+                f"用时 {case['total_ms']:>8.1f} ms")
+    return report
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """逐场景、逐指标比较；变差超过 threshold（相对值）的记为回归。"""
+    rows = []
+    for name, b in base.get("cases", {}).items():
+        n = new.get("cases", {}).get(name)
+        if n is None:
+            continue
+        if b.get("spec") != n.get("spec"):
+            # 语料规模不同（如 --scale 不一致），吞吐量没有可比性
+            rows.append({"case": name, "metric": "spec", "skipped": True, "regression": False})
+            continue
+        for metric, direction in METRICS.items():
+            old, cur = b.get(metric), n.get(metric)
+            if not old or cur is None:
+                continue
+            change = (cur - old) / old
+            rows.append({
+                "case": name,
+                "metric": metric,
+                "base": old,
+                "new": cur,
+                "change": change,
+                "regression": change * direction < -threshold,
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Converter throughput benchmarks.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="Generate the synthetic corpora, convert them and write a JSON baseline.")
+    p_run.add_argument("--cases", nargs="+", choices=sorted(SUITE), default=list(SUITE))
+    p_run.add_argument("--scale", type=float, default=1.0, help="Multiply the file count of every case.")
+    p_run.add_argument("--repeat", type=int, default=3, help="Runs per case; the median run is reported.")
+    p_run.add_argument("--jobs", type=int, default=1)
+    p_run.add_argument("--executor", choices=("process", "thread"), default="process")
+    p_run.add_argument("--stream", action="store_true")
+    p_run.add_argument("--out", default=None, help="Write results as JSON to this path.")
+    p_run.add_argument("--compare", default=None, metavar="BASELINE", help="Compare against a saved baseline.")
+    p_run.add_argument("--threshold", type=float, default=0.10)
+
+    p_cmp = sub.add_parser("compare", help="Compare two result files and fail on regressions.")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="Relative change that counts as a regression.")
+
+    p_gen = sub.add_parser("generate", help="Write one synthetic Project AST to a JSON file.")
+    p_gen.add_argument("out")
+    for field, default in CorpusSpec().to_dict().items():
+        p_gen.add_argument(f"--{field.replace('_', '-')}", dest=field, type=int, default=default)
+
+    p_start = sub.add_parser("startup", help="Measure cold start (import + one tiny AST, and the run_converter.py "
+                                                        "entrypoint); compare with a baseline.")
+    p_start.add_argument("--repeat", type=int, default=9, help="Fresh interpreters to run; the fastest is reported.")
+    p_start.add_argument("--out", default=None, help="Write results as JSON to this path (usable as a baseline).")
+    p_start.add_argument("--compare", default=None, metavar="BASELINE",
+                         help="Fail if slower than this saved startup result by more than --threshold, "
+                              "or if more modules are imported.")
+    p_start.add_argument("--threshold", type=float, default=0.25)
+
+    p_once = sub.add_parser("_once")
+    p_once.add_argument("in_json")
+    p_once.add_argument("--jobs", type=int, default=1)
+    p_once.add_argument("--executor", default="process")
+    p_once.add_argument("--stream", action="store_true")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "_once":
+        print(json.dumps(run_once(args.in_json, args.jobs, args.executor, args.stream)))
+        return 0
+
+    if args.cmd == "startup":
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+        report = run_startup(args.repeat, baseline, args.threshold)
+        if args.out:
+            Path(args.out).write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        return _print_startup(report)
+
+    if args.cmd == "generate":
+        spec = CorpusSpec(**{k: getattr(args, k) for k in CorpusSpec().to_dict()})
+        ast = generate_project(spec)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(ast, f, ensure_ascii=False)
+        print(f"✅ {args.out}: {spec.files} 个文件, {count_nodes(ast)} 个节点")
+        return 0
+
+    if args.cmd == "run":
+        report = run_suite(args.cases, args.scale, args.repeat, args.jobs, args.executor, args.stream)
+        if args.out:
+            Path(args.out).write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            print(f"✅ 结果 → {args.out}")
+        if not args.compare:
+            return 0
+        base = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        return _print_compare(compare(base, report, args.threshold), args.threshold)
+
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    return _print_compare(compare(base, new, args.threshold), args.threshold)
+
+
+def _print_startup(report: Dict[str, Any]) -> int:
+    print(f"冷启动 {report['total_ms']:.1f} ms（导入 {report['import_ms']:.1f} / 加载 {report['load_ms']:.1f} / "
+          f"转换 {report['convert_ms']:.1f}），{report['modules']} 个模块")
+    print(f"命令行 run_converter.py {report['cli_ms']:.1f} ms，{report['cli_modules']} 个模块")
+    print("导入最慢（self，-X importtime）:")
+    for r in report["slowest"][:5]:
+        print(f"  {r['module']:<32} {r['self_us'] / 1000:>7.2f} ms")
+    if report["forbidden"]:
+        print(f"❌ 冷启动路径导入了: {', '.join(report['forbidden'])}")
+    cmp = report.get("compare")
+    if cmp is not None:
+        for r in cmp["rows"]:
+            if r.get("skipped"):
+                print("基线的 Python 版本不同，未比较")
+                continue
+            mark = "❌" if r["regression"] else "  "
+            print(f"{mark} {r['metric']:<10} {r['base']:>10.1f} → {r['new']:>10.1f}  ({r['change']:+.1%})")
+    if report["ok"]:
+        print("✅ 冷启动未回归" if cmp is not None else "✅ 冷启动路径没有按需模块")
+    return 0 if report["ok"] else 1
+
+
+def _print_compare(rows: List[Dict[str, Any]], threshold: float) -> int:
+    bad = [r for r in rows if r["regression"]]
+    for r in rows:
+        if r.get("skipped"):
+            print(f"{r['case']:<10} 语料规格不同，未比较")
+            continue
+        flag = "回归" if r["regression"] else "ok"
+        print(f"{r['case']:<10} {r['metric']:<14} {r['base']:>12.1f} → {r['new']:>12.1f}  {r['change']:+7.1%}  {flag}")
+    if bad:
+        print(f"❌ {len(bad)} 项指标变差超过 {threshold:.0%}")
+        return 1
+    print(f"✅ 无超过 {threshold:.0%} 的回归")
+    return 0
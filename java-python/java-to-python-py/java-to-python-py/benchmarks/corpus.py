@@ -0,0 +1,172 @@
+import random
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class CorpusSpec:
+    """合成语料的规模参数（生成结果与 Main.java 导出的 Project AST 同构）。"""
+    files: int = 10
+    classes: int = 2  # 每个文件的顶层类数
+    methods: int = 6  # 每个类的方法名个数
+    depth: int = 2  # 方法体内控制语句的嵌套深度
+    expr_len: int = 4  # 算术表达式的项数
+    overloads: int = 1  # 每个方法名的重载个数
+    statements: int = 4  # 每层语句块的语句数
+    seed: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Builder:
+    def __init__(self, spec: CorpusSpec):
+        self.spec = spec
+        self.rnd = random.Random(spec.seed)
+        self.line = 1
+
+    def node(self, type_: str, name: str = "", attrs: Optional[Dict[str, str]] = None, value: Optional[str] = None,
+             kids: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        n: Dict[str, Any] = {"type": type_, "name": name, "line": self.line, "column": 1,
+                             "endLine": self.line, "endColumn": 2}
+        self.line += 1
+        if value is not None:
+            n["value"] = value
+        if attrs:
+            n["attrs"] = attrs
+        n["children"] = kids or []
+        return n
+
+    # ---------------- 表达式 ----------------
+
+    def arith(self, names: List[str]) -> str:
+        ops = ("+", "-", "*")
+        parts = [self.rnd.choice(names)]
+        for i in range(1, max(1, self.spec.expr_len)):
+            term = self.rnd.choice(names) if i % 3 else f"({self.rnd.choice(names)} + {i})"
+            parts.append(f"{self.rnd.choice(ops)} {term}")
+        return " ".join(parts)
+
+    def expr_node(self, code: str) -> Dict:
+        return self.node("BinaryExpr", kids=[self.node("NameExpr", code.split()[0])])
+
+    # ---------------- 语句 ----------------
+
+    def expr_stmt(self, code: str) -> Dict:
+        return self.node("ExpressionStmt", attrs={"code": code}, kids=[self.node("MethodCallExpr")])
+
+    def simple_stmts(self, names: List[str], k: int) -> List[Dict]:
+        out = []
+        for j in range(k):
+            kind = (j + self.rnd.randrange(5)) % 5
+            if kind == 0:
+                out.append(self.expr_stmt(f"total = {self.arith(names)}"))
+            elif kind == 1:
+                out.append(self.expr_stmt(f"items.add({self.arith(names)})"))
+            elif kind == 2:
+                out.append(self.expr_stmt(f"System.out.println(\"v=\" + {self.rnd.choice(names)})"))
+            elif kind == 3:
+                out.append(self.expr_stmt(f"int t{j} = items.size() + {self.rnd.choice(names)}"))
+            else:
+                out.append(self.expr_stmt(f"this.count = {self.rnd.choice(names)}"))
+        return out
+
+    def block(self, names: List[str], depth: int) -> Dict:
+        stmts = self.simple_stmts(names, self.spec.statements)
+        if depth > 0:
+            inner = names + [f"i{depth}"]
+            kind = depth % 4
+            if kind == 0:
+                stmts.append(self.node(
+                    "IfStmt", f"if({names[0]} > {depth})", attrs={"condition": f"{names[0]} > {depth}"},
+                    kids=[self.expr_node(names[0]), self.block(names, depth - 1), self.block(names, depth - 1)]))
+            elif kind == 1:
+                stmts.append(self.node(
+                    "ForStmt", "for(…)",
+                    attrs={"init": f"[int i{depth} = 0]", "compare": f"i{depth} < {names[0]}",
+                           "update": f"[i{depth}++]"},
+                    kids=[self.node("VariableDeclarationExpr"), self.expr_node(f"i{depth}"), self.node("UnaryExpr"),
+                          self.block(inner, depth - 1)]))
+            elif kind == 2:
+                stmts.append(self.node(
+                    "WhileStmt", f"while({names[0]} < {depth * 10})", attrs={"condition": f"{names[0]} < {depth * 10}"},
+                    kids=[self.expr_node(names[0]), self.block(names, depth - 1)]))
+            else:
+                stmts.append(self.node(
+                    "ForEachStmt", "for-each(…)", attrs={"var": f"Integer i{depth}", "iterable": "items"},
+                    kids=[self.node("VariableDeclarationExpr"), self.node("NameExpr", "items"),
+                          self.block(inner, depth - 1)]))
+        return self.node("BlockStmt", kids=stmts)
+
+    # ---------------- 声明 ----------------
+
+    def param(self, name: str, type_: str = "int") -> Dict:
+        return self.node("Parameter", name, attrs={"modifiers": "[]", "type": type_, "isVarArgs": "false",
+                                                  "annotations": "[]"},
+                         kids=[self.node("PrimitiveType"), self.node("SimpleName")])
+
+    def method(self, name: str, nparams: int, static: bool = False) -> Dict:
+        params = [f"p{k}" for k in range(nparams)] or ["seed"]
+        body = self.block(params, self.spec.depth)
+        body["children"].append(self.node("ReturnStmt", "return", attrs={"expr": self.arith(params)}))
+        mods = "[public , static ]" if static else "[public ]"
+        return self.node(
+            "MethodDeclaration", name, value="int",
+            attrs={"modifiers": mods, "typeParams": "[]", "throws": "[]", "annotations": "[]", "type": "int",
+                   "params": "[" + ", ".join(f"int {p}" for p in params[:nparams]) + "]"},
+            kids=[self.node("Modifier"), self.node("SimpleName")] + [self.param(p) for p in params[:nparams]]
+                 + [self.node("PrimitiveType"), body])
+
+    def field(self, name: str, type_: str) -> Dict:
+        return self.node(
+            "FieldDeclaration", value=type_, attrs={"modifiers": "[private ]", "annotations": "[]"},
+            kids=[self.node("Modifier"), self.node("VariableDeclarator", name, value=type_, attrs={"type": type_},
+                                                   kids=[self.node("ClassOrInterfaceType"), self.node("SimpleName")])])
+
+    def ctor(self, cls: str) -> Dict:
+        body = self.node("BlockStmt", kids=[self.expr_stmt("this.items = new ArrayList<>()"),
+                                            self.expr_stmt("this.count = 0")])
+        return self.node("ConstructorDeclaration", cls, attrs={"modifiers": "[public ]", "throws": "[]"},
+                         kids=[self.node("SimpleName"), body])
+
+    def cls(self, name: str) -> Dict:
+        kids = [self.node("Javadoc", value=f"\n * Synthetic class {name}.\n "), self.node("Modifier"),
+                self.node("SimpleName"), self.field("items", "ArrayList<Integer>"), self.field("count", "int"),
+                self.ctor(name)]
+        for m in range(self.spec.methods):
+            for o in range(max(1, self.spec.overloads)):
+                kids.append(self.method(f"op{m}", o + 1))
+        if name.endswith("0"):
+            main = self.method("main", 0, static=True)
+            main["attrs"]["params"] = "[String[] args]"
+            main["value"] = main["attrs"]["type"] = "void"
+            kids.append(main)
+        return self.node("ClassOrInterfaceDeclaration", name, value="class",
+                         attrs={"modifiers": "[public ]", "typeParams": "[]", "extends": "[]", "implements": "[]",
+                                "annotations": "[]"}, kids=kids)
+
+    def file(self, idx: int) -> Dict:
+        self.line = 1
+        kids = [self.node("PackageDeclaration", "com.example.bench",
+                          attrs={"name": "com.example.bench", "isStatic": "false", "isAsterisk": "false"}),
+                self.node("ImportDeclaration", "java.util.ArrayList",
+                          attrs={"name": "java.util.ArrayList", "isStatic": "false", "isAsterisk": "false"})]
+        kids += [self.cls(f"Bench{idx}C{c}") for c in range(self.spec.classes)]
+        cu = self.node("CompilationUnit", kids=kids)
+        return {"type": "File", "name": f"Bench{idx}.java", "value": f"src/com/example/bench/Bench{idx}.java",
+                "children": [cu]}
+
+
+def generate_project(spec: CorpusSpec) -> Dict[str, Any]:
+    """按 spec 生成 Project AST（可直接交给 Converter 或写成 JSON）。"""
+    b = _Builder(spec)
+    return {"type": "Project", "name": "Project", "children": [b.file(i) for i in range(spec.files)]}
+
+
+def count_nodes(node) -> int:
+    total, stack = 0, [node]
+    while stack:
+        n = stack.pop()
+        total += 1
+        stack.extend(n.get("children") or ())
+    return total
@@ -0,0 +1,155 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.corpus import CorpusSpec, generate_project
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 冷启动路径（导入转换器 + 转换一个小 AST）上不该出现的模块：它们只属于并行 / 语法检查 / 内存统计 / 服务等按需路径
+FORBIDDEN = ("concurrent.futures", "multiprocessing", "asyncio", "tracemalloc", "ast")
+
+# 命令行转换（run_converter.py in.json out.py --quiet）不该导入的模块：只属于 serve / convert-ast /
+# build-mappings / 并行 / --memory 等分支；语法检查要用 ast，所以这里不含 ast
+CLI_FORBIDDEN = ("asyncio", "concurrent.futures", "multiprocessing", "tracemalloc", "mmap", "zipfile",
+                 "xml.etree.ElementTree", "tempfile", "dataclasses")
+
+# 与基线比较的指标：耗时按相对变化（threshold）判断，模块数只要变多就算回归
+TIME_METRICS = ("total_ms", "import_ms", "cli_ms")
+COUNT_METRICS = ("modules", "cli_modules")
+
+# 在全新解释器里执行（python -c ...）：只导入转换器本身，不带基准脚本的依赖
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from converter.converter import Converter
+from converter.node import load_ast
+t1 = time.perf_counter()
+with open(sys.argv[1], encoding="utf-8") as f:
+    tree = load_ast(f)
+t2 = time.perf_counter()
+conv = Converter(tree)
+lines = conv.convert_node(tree)
+t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "load_ms": (t2 - t1) * 1000, "convert_ms": (t3 - t2) * 1000,
+                  "lines": len(lines), "modules": sorted(sys.modules)}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """-X importtime 的输出 → [{module, self_us, cumulative_us}]（按出现顺序）。"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        rows.append({"module": parts[2].strip(), "self_us": int(parts[0]), "cumulative_us": int(parts[1])})
+    return rows
+
+
+def probe_once(in_json: str, importtime: bool = False) -> Dict[str, Any]:
+    """
+    跑一次探针。计时用的探针不开 -X importtime（它本身会拖慢导入）；
+    importtime=True 只用来取各模块的导入耗时明细（slowest / importtime_us）。
+    """
+    flags = ["-X", "importtime"] if importtime else []
+    proc = subprocess.run([sys.executable, *flags, "-c", _PROBE, in_json], cwd=ROOT, check=True,
+                          capture_output=True, text=True)
+    res = json.loads(proc.stdout.strip().splitlines()[-1])
+    res["total_ms"] = res["import_ms"] + res["load_ms"] + res["convert_ms"]
+    if importtime:
+        rows = parse_importtime(proc.stderr)
+        res["importtime_us"] = next((r["cumulative_us"] for r in rows if r["module"] == "converter.converter"), 0)
+        res["slowest"] = sorted(rows, key=lambda r: -r["self_us"])[:10]
+    return res
+
+
+def probe_cli(in_json: str, out_py: str, importtime: bool = False) -> Dict[str, Any]:
+    """
+    跑一次真正的命令行入口（run_converter.py，--quiet），计整个子进程的墙钟时间（含解释器启动）。
+    importtime=True 时另取 -X importtime 明细，用来数命令行路径导入的模块。
+    """
+    flags = ["-X", "importtime"] if importtime else []
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *flags, os.path.join(ROOT, "run_converter.py"), in_json, out_py, "--quiet"],
+                          cwd=ROOT, check=True, capture_output=True, text=True)
+    res = {"cli_ms": (time.perf_counter() - start) * 1000}
+    if importtime:
+        modules = {r["module"] for r in parse_importtime(proc.stderr)}
+        res["cli_modules"] = len(modules)
+        res["cli_forbidden"] = sorted(m for m in CLI_FORBIDDEN if m in modules)
+    return res
+
+
+def compare_startup(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.25) -> List[Dict[str, Any]]:
+    """
+    与保存的基线（同一台机器上 startup --out 的结果）比较：耗时变慢超过 threshold（相对值）、
+    或冷启动导入的模块变多记为回归。Python 版本不同时不比较（导入耗时与模块数都没有可比性）。
+    """
+    if base.get("python") != new.get("python"):
+        return [{"metric": "python", "skipped": True, "regression": False}]
+    rows = []
+    for metric in TIME_METRICS:
+        old, cur = base.get(metric), new.get(metric)
+        if not old or cur is None:
+            continue
+        change = (cur - old) / old
+        rows.append({"metric": metric, "base": old, "new": cur, "change": change, "regression": change > threshold})
+    for metric in COUNT_METRICS:
+        old, cur = base.get(metric), new.get(metric)
+        if not old or cur is None:
+            continue
+        rows.append({"metric": metric, "base": old, "new": cur, "change": (cur - old) / old,
+                     "regression": cur > old})
+    return rows
+
+
+def run_startup(repeat: int = 9, baseline: Optional[Dict[str, Any]] = None,
+                threshold: float = 0.25) -> Dict[str, Any]:
+    """
+    冷启动基准：每次在全新解释器里导入转换器并转换一个单文件 AST，取最快的一次
+    （机器上的干扰只会让冷启动变慢，最快值比中位数稳定得多，适合与基线比较）。
+    同样取最快的一次计时真正的命令行入口 run_converter.py（cli_ms，含参数解析、映射包加载、写文件与语法检查）；
+    计时前先跑一次，让映射包与字节码缓存就位。
+    给定 baseline 时逐项与之比较（见 compare_startup），结果里带 compare。
+    ok=False 表示冷启动路径导入了 FORBIDDEN / CLI_FORBIDDEN 里的模块，或相对基线回归。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        in_json = os.path.join(tmp, "tiny.json")
+        with open(in_json, "w", encoding="utf-8") as f:
+            json.dump(generate_project(CorpusSpec(files=1, classes=1, methods=2)), f, ensure_ascii=False)
+        runs = [probe_once(in_json) for _ in range(max(1, repeat))]
+        detail = probe_once(in_json, importtime=True)
+        out_py = os.path.join(tmp, "tiny.py")
+        cli = probe_cli(in_json, out_py, importtime=True)
+        cli_ms = min(probe_cli(in_json, out_py)["cli_ms"] for _ in range(max(1, repeat)))
+    runs.sort(key=lambda r: r["total_ms"])
+    best = runs[0]
+    modules = set(best.pop("modules"))
+    forbidden = sorted(m for m in FORBIDDEN if m in modules)
+    report = {
+        "python": sys.version.split()[0],
+        "repeat": len(runs),
+        "total_ms": best["total_ms"],
+        "total_ms_runs": [r["total_ms"] for r in runs],
+        "import_ms": best["import_ms"],
+        "importtime_us": detail["importtime_us"],
+        "load_ms": best["load_ms"],
+        "convert_ms": best["convert_ms"],
+        "modules": len(modules),
+        "cli_ms": cli_ms,
+        "cli_modules": cli["cli_modules"],
+        "forbidden": forbidden + [m for m in cli["cli_forbidden"] if m not in forbidden],
+        "slowest": detail["slowest"],
+    }
+    rows = compare_startup(baseline, report, threshold) if baseline is not None else []
+    if baseline is not None:
+        report["compare"] = {"threshold": threshold, "rows": rows}
+    report["ok"] = not forbidden and not any(r["regression"] for r in rows)
+    return report
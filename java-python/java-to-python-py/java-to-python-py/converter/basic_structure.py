@@ -6,10 +6,10 @@ class ProjectConverter:
     def __init__(self, root):
         self.root = root
 
-    def convert(self, node) -> List[str]:
+    def convert(self, node, ctx=None) -> List[str]:
         lines = []
         for ch in children(node):
-            lines.extend(self.root.convert_node(ch))
+            lines.extend(self.root.convert_node(ch, ctx))
         return lines
 
 class FileConverter:
@@ -17,21 +17,21 @@ class FileConverter:
     def __init__(self, root):
         self.root = root
 
-    def convert(self, node) -> List[str]:
+    def convert(self, node, ctx=None) -> List[str]:
         name = node.get("name", "<file>")
         lines = [f"# --- File: {name} ---", ""]
         for ch in children(node):
-            lines.extend(self.root.convert_node(ch))
+            lines.extend(self.root.convert_node(ch, ctx))
         lines.append("")
         return lines
 
 class PackageConverter:
     """package -> 注释行"""
-    def convert(self, node) -> List[str]:
+    def convert(self, node, ctx=None) -> List[str]:
         return [f"# package: {node.get('name','')}", ""]
 
 class ImportConverter:
     """import -> 注释行（不直接引入 Java 包）"""
-    def convert(self, node) -> List[str]:
+    def convert(self, node, ctx=None) -> List[str]:
         name = node.get("name", "")
         return [f"# import: {name}", ""]
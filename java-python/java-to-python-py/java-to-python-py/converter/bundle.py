@@ -0,0 +1,322 @@
+import os
+import pickle
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+BUNDLE_FORMAT = 1
+
+_PKG_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_PATH = os.path.join(_PKG_DIR, "mappings.bundle")
+XLSX_PATH = os.path.join(os.path.dirname(_PKG_DIR), "映射表.xlsx")
+ADDITIONS_PATH = os.path.join(_PKG_DIR, "mappings_additions.json")
+# 参与编译的三个来源：API_MAP 所在的源码、additions 与分析人员维护的节点映射表
+SOURCES = (
+    ("mappings.py", os.path.join(_PKG_DIR, "mappings.py")),
+    ("mappings_additions.json", ADDITIONS_PATH),
+    ("映射表.xlsx", XLSX_PATH),
+)
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# 映射表里表示"无等价节点"的写法
+_NO_EQUIVALENT = ("—", "-", "–", "n/a", "")
+# "ImportDeclaration (静态导入/多名)"：节点名 + 变体说明
+_QUALIFIED = re.compile(r"^([A-Za-z_]\w*)\s*[(（](.+)[)）]$")
+# 可直接比较的写法：点分名，或 API_MAP 模板去掉 ({args}) 后的点分名
+_PLAIN = re.compile(r"^[A-Za-z_][\w.]*$")
+
+
+def source_stats() -> Dict[str, Optional[Tuple[int, int]]]:
+    """各来源文件的 (mtime_ns, size)（缺失为 None）：load_bundle 先比它，对上了就不必读文件算哈希。"""
+    out = {}
+    for name, path in SOURCES:
+        try:
+            st = os.stat(path)
+            out[name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            out[name] = None
+    return out
+
+
+def source_digests() -> Dict[str, Optional[str]]:
+    """各来源文件的 sha256（缺失为 None）。"""
+    import hashlib
+
+    out = {}
+    for name, path in SOURCES:
+        try:
+            with open(path, "rb") as f:
+                out[name] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            out[name] = None
+    return out
+
+
+def _version(digests: Dict[str, Optional[str]]) -> str:
+    import hashlib
+
+    h = hashlib.sha256(f"bundle={BUNDLE_FORMAT}".encode())
+    for name, digest in sorted(digests.items()):
+        h.update(f"\0{name}\0{digest or '-'}".encode())
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def bundle_version() -> str:
+    """映射包版本：由三个来源的内容决定，与包文件是否已构建无关（cache.converter_fingerprint 用它）。"""
+    return _version(source_digests())
+
+
+# ---------- xlsx（zip + XML，仅标准库） ----------
+
+def _col_index(ref: str) -> int:
+    n = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        n = n * 26 + (ord(ch.upper()) - 64)
+    return n - 1
+
+
+def _rich_text(el) -> str:
+    # <si>/<is> 里的纯文本：直接的 <t> 或各 <r><t>，跳过注音 <rPh>
+    parts = [t.text or "" for t in el.findall(f"{_NS}t")]
+    parts += [t.text or "" for r in el.findall(f"{_NS}r") for t in r.findall(f"{_NS}t")]
+    return "".join(parts)
+
+
+def _first_sheet(z) -> str:
+    import xml.etree.ElementTree as ET
+
+    try:
+        wb = ET.fromstring(z.read("xl/workbook.xml"))
+        sheet = wb.find(f"{_NS}sheets/{_NS}sheet")
+        rid = sheet.get(f"{_REL_NS}id")
+        rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+        for rel in rels.iter(f"{_PKG_REL_NS}Relationship"):
+            if rel.get("Id") == rid:
+                target = rel.get("Target")
+                return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    except Exception:
+        pass
+    return "xl/worksheets/sheet1.xml"
+
+
+def read_xlsx(path) -> List[List[Optional[str]]]:
+    """读取 xlsx 第一个工作表：每行一个按列号排好的字符串列表（空单元格为 None，空行跳过）。"""
+    import xml.etree.ElementTree as ET
+    import zipfile
+
+    with zipfile.ZipFile(path) as z:
+        strings: List[str] = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            strings = [_rich_text(si) for si in ET.fromstring(z.read("xl/sharedStrings.xml")).iter(f"{_NS}si")]
+        sheet = ET.fromstring(z.read(_first_sheet(z)))
+    rows = []
+    for row in sheet.iter(f"{_NS}row"):
+        cells: Dict[int, str] = {}
+        for i, c in enumerate(row.findall(f"{_NS}c")):
+            ref = c.get("r")
+            col = _col_index(ref) if ref else i
+            kind = c.get("t")
+            if kind == "inlineStr":
+                el = c.find(f"{_NS}is")
+                val = _rich_text(el) if el is not None else None
+            else:
+                v = c.find(f"{_NS}v")
+                val = v.text if v is not None else None
+                if val is not None and kind == "s":
+                    val = strings[int(val)]
+            if val is not None and val.strip():
+                cells[col] = val.strip()
+        if cells:
+            rows.append([cells.get(i) for i in range(max(cells) + 1)])
+    return rows
+
+
+def parse_node_table(rows: List[List[Optional[str]]]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    映射表（列：JavaParser 节点 | Python ast 节点 | 说明 | 示例；只有第一列的行是分组标题）→
+    ({节点类型小写: {java, python, notes, example, section, row, variants}}, 冲突列表)。
+    "A / B"、"A + B" 拆成多个节点；"A (说明)" 记为 A 的变体；同一节点两行给出不同 Python 节点时取先出现的并报冲突。
+    """
+    nodes: Dict[str, Dict[str, Any]] = {}
+    conflicts: List[Dict[str, Any]] = []
+    section = None
+    for rowno, row in enumerate(rows[1:], start=2):
+        cells = (row + [None] * 4)[:4]
+        java, python, notes, example = cells
+        if not java:
+            continue
+        if python is None and notes is None and example is None:
+            section = java
+            continue
+        python = None if (python or "").strip().lower() in _NO_EQUIVALENT else python
+        for name in re.split(r"\s+[/+]\s+", java.replace("等", " ")):
+            name = name.strip()
+            if not name or name.lower() in _NO_EQUIVALENT:
+                continue
+            m = _QUALIFIED.match(name)
+            name, variant = (m.group(1), m.group(2).strip()) if m else (name, None)
+            entry = nodes.setdefault(name.lower(), {"java": name, "python": None, "notes": None, "example": None,
+                                                    "section": section, "row": None, "variants": {}})
+            if variant is not None:
+                prev = entry["variants"].setdefault(variant, python)
+                if prev != python:
+                    conflicts.append({"source": "映射表.xlsx", "key": f"{name} ({variant})", "kept": prev,
+                                      "other": python, "row": rowno})
+            elif entry["row"] is None:
+                entry.update(python=python, notes=notes, example=example, section=section, row=rowno)
+            elif entry["python"] != python:
+                conflicts.append({"source": "映射表.xlsx", "key": name, "kept": entry["python"], "other": python,
+                                  "row": rowno})
+    return nodes, conflicts
+
+
+def load_node_table(path=XLSX_PATH) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """读不到映射表时为空。"""
+    try:
+        return parse_node_table(read_xlsx(path))
+    except Exception:
+        return {}, []
+
+
+# ---------- 编译 ----------
+
+def _plain(py) -> Optional[str]:
+    if not isinstance(py, str):
+        return None
+    py = py.strip()
+    if py.endswith("({args})"):
+        py = py[:-len("({args})")]
+    return py if _PLAIN.match(py) else None
+
+
+def api_conflicts(api_map: Dict[str, Dict[str, Any]], additions: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    API_MAP 与 additions 的冲突，以 API_MAP 为准（同 MappingIndex）：
+      - 多个短类名登记同一 FQN 但 type 不同（by_fqn 取第一个）
+      - additions 的类 / 方法写法是点分名且与 API_MAP 的 type / 映射不同（散文式提示不比较）
+    """
+    conflicts = []
+    first: Dict[str, str] = {}
+    for short, entry in api_map.items():
+        fqn = entry.get("fqn")
+        if not fqn:
+            continue
+        if fqn not in first:
+            first[fqn] = short
+        elif api_map[first[fqn]].get("type") != entry.get("type"):
+            kept = api_map[first[fqn]]
+            conflicts.append({"source": "API_MAP", "key": fqn, "kept": f"{first[fqn]}: {kept.get('type')}",
+                              "other": f"{short}: {entry.get('type')}"})
+    for key, hint in additions.items():
+        other = _plain(hint.get("py"))
+        if other is None:
+            continue
+        if key in first:
+            kept = api_map[first[key]].get("type")
+        else:
+            cls, _, meth = key.rpartition(".")
+            if cls not in first:
+                continue
+            entry = api_map[first[cls]]
+            kept = entry.get("methods", {}).get(meth) or entry.get("static", {}).get(meth)
+        if kept and _plain(kept) != other:
+            conflicts.append({"source": "mappings_additions.json", "key": key, "kept": kept, "other": hint.get("py")})
+    return conflicts
+
+
+def compile_sources(xlsx=XLSX_PATH, additions_path=ADDITIONS_PATH) -> Dict[str, Any]:
+    """把 API_MAP、additions 与映射表编译成一个包（dict）：预建好的 MappingIndex + 冲突列表 + 版本。"""
+    from converter.mappings import API_MAP, MappingIndex, load_additions
+
+    stats = source_stats()
+    digests = source_digests()
+    additions = load_additions(additions_path)
+    nodes, conflicts = load_node_table(xlsx)
+    return {
+        "format": BUNDLE_FORMAT,
+        "version": _version(digests),
+        "sources": digests,
+        "stats": stats,
+        "index": MappingIndex(API_MAP, additions, nodes),
+        "conflicts": api_conflicts(API_MAP, additions) + conflicts,
+    }
+
+
+def _write(bundle: Dict[str, Any], out) -> int:
+    # 先写临时文件再 rename：并发的进程看到的要么是旧包要么是完整的新包
+    data = pickle.dumps(bundle, protocol=pickle.HIGHEST_PROTOCOL)
+    folder, name = os.path.split(os.path.abspath(out))
+    tmp = os.path.join(folder, f".{name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, out)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return len(data)
+
+
+def build_bundle(out=BUNDLE_PATH) -> Dict[str, Any]:
+    """编译并写出映射包（pickle），返回 {version, conflicts, nodes, bytes, elapsed_ms}。"""
+    start = time.perf_counter()
+    bundle = compile_sources()
+    size = _write(bundle, out)
+    return {
+        "version": bundle["version"],
+        "conflicts": bundle["conflicts"],
+        "nodes": len(bundle["index"].nodes),
+        "bytes": size,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+def load_bundle(path=BUNDLE_PATH) -> Optional[Dict[str, Any]]:
+    """
+    读取映射包；不存在、格式不符或任一来源已改动（版本对不上）时返回 None。
+    来源的 (mtime_ns, size) 与编译时相同就直接采用，否则按内容哈希比较版本（只是 touch 过的来源仍然有效）。
+    """
+    try:
+        with open(path, "rb") as f:
+            bundle = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(bundle, dict) or bundle.get("format") != BUNDLE_FORMAT:
+        return None
+    if bundle.get("stats") == source_stats():
+        return bundle
+    if bundle.get("version") != bundle_version():
+        return None
+    return bundle
+
+
+def load_or_build(path=BUNDLE_PATH) -> Dict[str, Any]:
+    """
+    读取映射包；缺失或过期时现场编译并尽量写回（目录只读等写不了时照常返回编译结果），
+    之后的每次转换只需一次 pickle.load，不再解析 映射表.xlsx。
+    """
+    bundle = load_bundle(path)
+    if bundle is None:
+        bundle = compile_sources()
+    else:
+        stats = source_stats()
+        if bundle.get("stats") == stats:
+            return bundle
+        bundle["stats"] = stats  # 来源只是被 touch 过：记下新的 (mtime_ns, size)，之后不必再算哈希
+    try:
+        _write(bundle, path)
+    except OSError:
+        pass
+    return bundle
+
+
+def format_conflict(c: Dict[str, Any]) -> str:
+    where = f"{c['source']}" + (f" 第 {c['row']} 行" if c.get("row") else "")
+    return f"{where}: {c['key']} → 保留 {c['kept']!r}，忽略 {c['other']!r}"
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from converter.bundle import bundle_version
+from converter.node import to_plain
+
+CACHE_FORMAT = 1
+
+# 只对本次运行有意义的字段（--profile / --rule-stats / --memory 的测量值），不写入缓存
+VOLATILE_KEYS = ("profile", "rules", "memory")
+
+_PKG_DIR = Path(__file__).resolve().parent
+
+
+@lru_cache(maxsize=None)
+def converter_fingerprint() -> str:
+    """
+    转换器版本指纹：converter 包内全部 .py 源码 + mappings_additions.json + 映射包版本（含 映射表.xlsx）。
+    任一规则/映射改动都会改变指纹，从而让旧缓存自然失效。
+    """
+    h = hashlib.sha256(f"format={CACHE_FORMAT}".encode())
+    h.update(f"\0mappings={bundle_version()}".encode())
+    files = sorted(_PKG_DIR.glob("*.py")) + [_PKG_DIR / "mappings_additions.json"]
+    for path in files:
+        if not path.is_file():
+            continue
+        h.update(b"\0" + path.name.encode() + b"\0")
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def canonical_hash(node: Dict) -> str:
+    """子树的规范化哈希（键排序、紧凑分隔符），与 JSON 排版及节点形式（dict / Node）无关。"""
+    text = json.dumps(node, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=to_plain)
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class ConversionCache:
+    """
+    File 子树级别的内容寻址缓存：
+      key = sha256(转换器指纹 + 子树规范化哈希)
+      value = convert_isolated() 的结果 {lines, stats, required_imports, ast_type_counts}
+    以 <dir>/<key[:2]>/<key>.json 存放，写入走临时文件 + os.replace，多进程并发写安全。
+    """
+
+    def __init__(self, cache_dir, fingerprint: Optional[str] = None):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = fingerprint or converter_fingerprint()
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, node: Dict) -> str:
+        h = hashlib.sha256(self.fingerprint.encode())
+        h.update(canonical_hash(node).encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                res = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return res
+
+    def put(self, key: str, result: Dict[str, Any]):
+        result = {k: v for k, v in result.items() if k not in VOLATILE_KEYS}
+        path = self._path(key)
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            if tmp and os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"dir": str(self.dir), "hits": self.hits, "misses": self.misses}
@@ -2,6 +2,7 @@
 from typing import List
 from converter.util import children, collect_doc, get_attr
 from converter.mappings import map_type
+from converter.emitter import BLANK_EMPTY, Line, indent, line_text
 
 class TopClassConverter:
     """
@@ -26,13 +27,12 @@ class TopClassConverter:
         return ['"""' + safe + '"""']
 
     # ---------- Enum ----------
-    def convert_enum(self, node) -> List[str]:
+    def convert_enum(self, node, ctx=None) -> List[Line]:
         out = ["import enum", ""]
         name = node.get("name", "Enum")
         out.append(f"class {name}(enum.Enum):")
         # doc
-        for dl in self._doc_lines(node):
-            out.append("    " + dl)
+        out.extend(indent(self._doc_lines(node)))
         # constants
         constants = [ch.get("name") for ch in children(node)
                      if ch.get("type") in ("EnumConstantDeclaration", "EnumConstant")]
@@ -45,13 +45,12 @@ class TopClassConverter:
         return out
 
     # ---------- Record ----------
-    def convert_record(self, node) -> List[str]:
+    def convert_record(self, node, ctx=None) -> List[Line]:
         out = ["from dataclasses import dataclass", ""]
         name = node.get("name", "Record")
         out.append("@dataclass")
         out.append(f"class {name}:")
-        for dl in self._doc_lines(node):
-            out.append("    " + dl)
+        out.extend(indent(self._doc_lines(node)))
         # record 参数（方案B里通常把参数作为 Parameter 子节点，类型在 attrs.type）
         params = [ch for ch in children(node) if ch.get("type") in ("Parameter", "RecordComponent", "Component")]
         if not params:
@@ -78,12 +77,11 @@ class TopClassConverter:
         return out
 
     # ---------- Interface ----------
-    def convert_interface(self, node) -> List[str]:
+    def convert_interface(self, node, ctx=None) -> List[Line]:
         out = ["import abc", ""]
         name = node.get("name", "Interface")
         out.append(f"class {name}(abc.ABC):")
-        for dl in self._doc_lines(node):
-            out.append("    " + dl)
+        out.extend(indent(self._doc_lines(node)))
         methods = [ch for ch in children(node) if ch.get("type") in ("Method", "MethodDeclaration", "Function")]
         if not methods:
             out.append("    pass")
@@ -99,19 +97,19 @@ class TopClassConverter:
         return out
 
     # ---------- Class ----------
-    def convert_class(self, node) -> List[str]:
+    def convert_class(self, node, ctx) -> List[Line]:
         # reset per-class field state
         try:
-            self.root.field_conv.reset_for_class()
+            self.root.field_conv.reset_for_class(ctx)
         except Exception:
             pass
         # 仅为当前类维护字段集合，供表达式转换判定 self.
         try:
-            self.root.field_names = set()
+            ctx.field_names = set()
         except Exception:
             pass
         try:
-            self.root.field_info = {}
+            ctx.field_info = {}
         except Exception:
             pass
 
@@ -123,29 +121,24 @@ class TopClassConverter:
             ) and ch.get("name")
         ]
         try:
-            self.root.push_class(node.get("name", "Class"), nested_names)
+            ctx.push_class(node.get("name", "Class"), nested_names)
         except Exception:
             pass
 
         name = node.get("name", "Class")
         out = [f"class {name}:"]
-        for dl in self._doc_lines(node):
-            out.append("    " + dl)
+        out.extend(indent(self._doc_lines(node)))
 
         # fields
         for ch in children(node):
             if ch.get("type") in ("Field", "FieldDeclaration"):
-                fl = self.root.field_conv.convert(ch)
-                for l in fl:
-                    out.append(f"    {l}")
+                out.extend(indent(ctx.timed(self.root.field_conv.convert, ch, ctx)))
 
         # constructors
         constructors = [ch for ch in children(node) if ch.get("type") in ("Constructor", "ConstructorDeclaration")]
         has_init = bool(constructors)
         if constructors:
-            mlines = self.root.method_conv.convert_constructors(constructors)
-            for ml in mlines:
-                out.append(f"    {ml}")
+            out.extend(indent(ctx.timed(self.root.method_conv.convert_constructors, constructors, ctx)))
 
         # methods (handle overloads)
         method_nodes = [ch for ch in children(node) if ch.get("type") in ("Method", "MethodDeclaration", "Function")]
@@ -163,19 +156,17 @@ class TopClassConverter:
             for key in order:
                 nodes = grouped[key]
                 if len(nodes) > 1:
-                    mlines = self.root.method_conv.convert_overloads(nodes)
+                    mlines = ctx.timed(self.root.method_conv.convert_overloads, nodes, ctx)
                 else:
-                    mlines = self.root.method_conv.convert(nodes[0])
-                for ml in mlines:
-                    out.append(f"    {ml}")
+                    mlines = ctx.timed(self.root.method_conv.convert, nodes[0], ctx)
+                out.extend(indent(mlines))
 
         # synthesize __init__ if needed
         if not has_init:
-            init_lines = self.root.field_conv.emit_init_if_needed()
+            init_lines = self.root.field_conv.emit_init_if_needed(ctx)
             if init_lines:
                 out.append("")
-                for ml in init_lines:
-                    out.append(f"    {ml}")
+                out.extend(indent(init_lines))
 
         # nested types
         for ch in children(node):
@@ -183,38 +174,37 @@ class TopClassConverter:
                 "ClassOrInterfaceDeclaration", "EnumDeclaration", "RecordDeclaration", "AnnotationDeclaration",
                 "Class", "Interface"  # 兼容备用
             ):
-                nested = self.root.convert_node(ch)
+                nested = self.root.convert_node(ch, ctx)
                 out.append("")
-                for line in nested:
-                    out.append("    " + line if line.strip() else "")
+                out.extend(indent(nested, 1, BLANK_EMPTY))
 
         # empty-body -> pass
-        body_non_comments = [ln for ln in out[1:] if ln.strip() and not ln.strip().startswith("#")]
+        body_non_comments = [ln for ln in map(line_text, out[1:]) if ln.strip() and not ln.strip().startswith("#")]
         if not body_non_comments:
-            out.append("    pass")
+            out.append((1, "pass"))
         out.append("")
         try:
-            self.root.pop_class()
+            ctx.pop_class()
         except Exception:
             pass
         return out
 
     # ---------- Dispatcher ----------
-    def convert(self, node) -> List[str]:
+    def convert(self, node, ctx) -> List[Line]:
         t = (node.get("type") or "").strip()
         # 明确枚举
         if t in ("Enum", "EnumDeclaration"):
-            return self.convert_enum(node)
+            return self.convert_enum(node, ctx)
         # 记录
         if t in ("Record", "RecordDeclaration"):
-            return self.convert_record(node)
+            return self.convert_record(node, ctx)
         # 直接 Interface 类型
         if t in ("Interface", "InterfaceDeclaration"):
-            return self.convert_interface(node)
+            return self.convert_interface(node, ctx)
         # ClassOrInterfaceDeclaration -> 进一步判定
         if t == "ClassOrInterfaceDeclaration":
             if (node.get("value") or "").strip().lower() == "interface":
-                return self.convert_interface(node)
-            return self.convert_class(node)
+                return self.convert_interface(node, ctx)
+            return self.convert_class(node, ctx)
         # 回退：凡是能当成类的都当类
-        return self.convert_class(node)
+        return self.convert_class(node, ctx)
@@ -0,0 +1,128 @@
+import collections
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def new_stats() -> Dict[str, Any]:
+    return {
+        "actionable": 0,
+        "converted_ok": 0,
+        "converted_trivial": 0,
+        "fallback_lines": 0,
+        "unhandled_by_type": defaultdict(int),
+        "unmapped_methods": defaultdict(int),
+    }
+
+
+class ConversionContext:
+    """
+    单次转换（通常是一个 File）的全部可变状态。
+    Converter 与各子转换器只持有只读的分发表/映射，状态都经由 ctx 传递，
+    因此同一个 Converter 可以在多个线程里同时转换不同文件而互不干扰。
+    """
+
+    def __init__(self, coverage: bool = True, profile: bool = False, rules: bool = False):
+        self.symtab: Dict[str, str] = {}  # 变量/字段 -> Java 短类型
+        self.field_names = set()  # 仅记录类字段名，用于 self. 注入（兼容旧逻辑）
+        self.field_info: Dict[str, Dict[str, str]] = {}  # 字段名 -> 可见性等元数据
+        self.param_alias: Dict[str, str] = {}  # 参数重命名映射（关键字规避）
+        self.required_imports = set()
+        self.pq_keys: Dict[str, str] = {}
+        self.scope_stack: List[set] = []
+        self.class_stack: List[str] = []
+        self.nested_class_stack: List[set] = []
+        self.doc_comment_suppression = 0
+        self.stats = new_stats()
+        # 节点类型计数在分发时顺带完成；为 None 表示不统计（--no-coverage）
+        self.ast_type_counts = collections.Counter() if coverage else None
+        self.visited: Dict[int, Dict] = {}  # 已分发、尚待父节点收尾的节点
+        self.visit_depth = 0
+        # 处理器耗时统计；为 None 表示不统计（未开 --profile）
+        self.profile = None
+        if profile:
+            from converter.profile import HandlerProfile
+
+            self.profile = HandlerProfile()
+        # 表达式规则统计；为 None 表示不统计（未开 --rule-stats），规则函数据此决定是否计时
+        self.rules = None
+        if rules:
+            from converter.rulestats import RuleStats
+
+            self.rules = RuleStats()
+        # FieldConverter 的每类状态
+        self.pending_fields: List[Tuple[str, Optional[str], Optional[str]]] = []
+        self.class_has_ctor = False
+
+    # ---------------- 作用域 ----------------
+
+    def push_scope(self, names=None):
+        scope = set()
+        if names:
+            scope.update(names)
+        self.scope_stack.append(scope)
+
+    def pop_scope(self):
+        if self.scope_stack:
+            self.scope_stack.pop()
+
+    def add_local(self, name: str):
+        if not name:
+            return
+        if not self.scope_stack:
+            self.scope_stack.append(set())
+        self.scope_stack[-1].add(name)
+
+    def is_local(self, name: str) -> bool:
+        if not name:
+            return False
+        return any(name in scope for scope in reversed(self.scope_stack))
+
+    def is_field_ref(self, name: str) -> bool:
+        if not name:
+            return False
+        return name in self.field_names and not self.is_local(name)
+
+    # ---------------- 类栈 ----------------
+
+    def push_class(self, name: str, nested_names=None):
+        self.class_stack.append(name)
+        self.nested_class_stack.append(set(nested_names or []))
+
+    def pop_class(self):
+        if self.class_stack:
+            self.class_stack.pop()
+        if self.nested_class_stack:
+            self.nested_class_stack.pop()
+
+    # ---------------- 计时 ----------------
+
+    def timed(self, fn, *args):
+        """开启 --profile 时把不经分发表直接调用的子转换（如 convert_overloads）单独计时。"""
+        if self.profile is None:
+            return fn(*args)
+        from converter.profile import handler_name
+
+        return self.profile.call(handler_name(fn), None, fn, *args)
+
+    # ---------------- 结果 ----------------
+
+    def snapshot_stats(self) -> Dict[str, Any]:
+        return {
+            "actionable": self.stats["actionable"],
+            "converted_ok": self.stats["converted_ok"],
+            "converted_trivial": self.stats["converted_trivial"],
+            "fallback_lines": self.stats["fallback_lines"],
+            "unhandled_by_type": dict(self.stats["unhandled_by_type"]),
+            "unmapped_methods": dict(self.stats["unmapped_methods"]),
+        }
+
+    def file_result(self, lines: List[str]) -> Dict[str, Any]:
+        """可合并的单文件结果（进程池/线程池/缓存共用的格式）。"""
+        return {
+            "lines": lines,
+            "stats": self.snapshot_stats(),
+            "required_imports": sorted(self.required_imports),
+            "ast_type_counts": dict(self.ast_type_counts or {}),
+            **({"profile": self.profile.to_dict()} if self.profile is not None else {}),
+            **({"rules": self.rules.to_dict()} if self.rules is not None else {}),
+        }
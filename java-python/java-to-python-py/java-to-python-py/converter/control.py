@@ -1,6 +1,7 @@
 import re
 from typing import List
 from converter.util import children, get_attr
+from converter.emitter import Line, indent_block
 
 _EXC_MAP = {
     "IllegalArgumentException": "ValueError",
@@ -17,27 +18,26 @@ class ControlConverter:
     def __init__(self, root):
         self.root = root
 
-    def _emit_block(self, node) -> List[str]:
-        lines: List[str] = []
+    def _emit_block(self, node, ctx) -> List[Line]:
+        lines: List[Line] = []
         for ch in children(node):
-            lines.extend(self.root.convert_node(ch))
+            lines.extend(self.root.convert_node(ch, ctx))
         return lines
 
-    def _indent(self, lines: List[str], n: int = 1) -> List[str]:
-        pad = "    " * n
-        return [pad + l if l.strip() else "" for l in lines] or [pad + "pass"]
+    def _indent(self, lines: List[Line], n: int = 1) -> List[Line]:
+        return indent_block(lines, n)
 
-    def _expr(self, expr: str) -> str:
+    def _expr(self, expr: str, ctx) -> str:
         if not expr:
             return ""
         try:
-            converted = self.root.expr_conv.convert({"type": "Inline", "name": expr})
+            converted = ctx.timed(self.root.expr_conv.convert, {"type": "Inline", "name": expr}, ctx)
             return converted[0] if converted else expr
         except Exception:
             return expr
 
-    def convert_if(self, node) -> List[str]:
-        cond = self._expr(get_attr(node, "condition") or node.get("name", "True"))
+    def convert_if(self, node, ctx) -> List[Line]:
+        cond = self._expr(get_attr(node, "condition") or node.get("name", "True"), ctx)
         chs = children(node)
         block_children = [ch for ch in chs if ch.get("type") == "BlockStmt"]
         if block_children:
@@ -46,14 +46,14 @@ class ControlConverter:
         else:
             then_part = chs[1] if len(chs) >= 2 else None
             else_part = chs[2] if len(chs) >= 3 else None
-        lines = [f"if {cond}:"] + self._indent(self._emit_block(then_part) if then_part else [])
+        lines = [f"if {cond}:"] + self._indent(self._emit_block(then_part, ctx) if then_part else [])
         if else_part:
             lines.append("else:")
-            lines += self._indent(self._emit_block(else_part))
+            lines += self._indent(self._emit_block(else_part, ctx))
         return lines
 
-    def convert_for(self, node) -> List[str]:
-        cmp_s = self._expr((get_attr(node, "compare") or "").strip())
+    def convert_for(self, node, ctx) -> List[Line]:
+        cmp_s = self._expr((get_attr(node, "compare") or "").strip(), ctx)
         init_s = (get_attr(node, "init") or "").strip()
         update_s = (get_attr(node, "update") or "").strip()
         if init_s.startswith("[") and init_s.endswith("]"):
@@ -78,7 +78,7 @@ class ControlConverter:
             m_init = re.search(r"(?:\w+\s+)?([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.+)", init_s)
             if m_init:
                 var = m_init.group(1).strip()
-                start = self._expr(m_init.group(2).strip())
+                start = self._expr(m_init.group(2).strip(), ctx)
             m_update = re.search(r"([A-Za-z_][A-Za-z0-9_]*)\s*\+\+", update_s)
             if m_update:
                 step = "1"
@@ -89,14 +89,14 @@ class ControlConverter:
                 r"([A-Za-z_][A-Za-z0-9_]*)\s*=\s*\1\s*\+\s*(.+)", update_s
             )
             if m_update:
-                step = self._expr(m_update.group(2).strip())
+                step = self._expr(m_update.group(2).strip(), ctx)
             m_update = re.search(r"([A-Za-z_][A-Za-z0-9_]*)\s*-\=\s*(.+)", update_s) or re.search(
                 r"([A-Za-z_][A-Za-z0-9_]*)\s*=\s*\1\s*-\s*(.+)", update_s
             )
             if m_update:
-                step = f"-{self._expr(m_update.group(2).strip())}"
+                step = f"-{self._expr(m_update.group(2).strip(), ctx)}"
             try:
-                if limit and hasattr(self.root, "field_info") and limit in getattr(self.root, "field_info", {}) and not self.root.is_local(limit):
+                if limit and limit in ctx.field_info and not ctx.is_local(limit):
                     limit = f"self.{limit}"
             except Exception:
                 pass
@@ -106,7 +106,7 @@ class ControlConverter:
                 limit = f"({limit}) - 1"
             if var:
                 try:
-                    self.root.add_local(var)
+                    ctx.add_local(var)
                 except Exception:
                     pass
                 range_args = [start, limit] if step == "1" else [start, limit, step]
@@ -117,46 +117,46 @@ class ControlConverter:
             header = f"# for({get_attr(node,'init')}; {cmp_s}; {get_attr(node,'update')})"
         chs = children(node)
         body_stmt = chs[-1] if chs else None
-        body = self._emit_block(body_stmt) if body_stmt else []
+        body = self._emit_block(body_stmt, ctx) if body_stmt else []
         return [header] + self._indent(body)
 
-    def convert_foreach(self, node) -> List[str]:
+    def convert_foreach(self, node, ctx) -> List[Line]:
         var = (get_attr(node, "var") or "").strip()
-        iterable = self._expr((get_attr(node, "iterable") or "").strip())
+        iterable = self._expr((get_attr(node, "iterable") or "").strip(), ctx)
         if var:
             toks = var.replace("(", " ").replace(")", " ").split()
             var = toks[-1] if toks else "item"
         else:
             var = "item"
         try:
-            self.root.add_local(var)
+            ctx.add_local(var)
         except Exception:
             pass
         header = f"for {var} in {iterable}:" if iterable else f"# foreach {node.get('name','')}"
         try:
-            self.root.add_local(var)
+            ctx.add_local(var)
         except Exception:
             pass
         chs = children(node)
         body_stmt = chs[-1] if chs else None
-        body = self._emit_block(body_stmt) if body_stmt else []
+        body = self._emit_block(body_stmt, ctx) if body_stmt else []
         return [header] + self._indent(body)
 
-    def convert_while(self, node) -> List[str]:
-        cond = self._expr(get_attr(node, "condition") or node.get("name", "True"))
+    def convert_while(self, node, ctx) -> List[Line]:
+        cond = self._expr(get_attr(node, "condition") or node.get("name", "True"), ctx)
         chs = children(node)
         body_stmt = chs[-1] if chs else None
-        body = self._emit_block(body_stmt) if body_stmt else []
+        body = self._emit_block(body_stmt, ctx) if body_stmt else []
         return [f"while {cond}:"] + self._indent(body)
 
-    def convert_do(self, node) -> List[str]:
-        cond = self._expr(get_attr(node, "condition") or node.get("name", "False"))
+    def convert_do(self, node, ctx) -> List[Line]:
+        cond = self._expr(get_attr(node, "condition") or node.get("name", "False"), ctx)
         chs = children(node)
         body_stmt = chs[0] if chs else None
-        body = self._emit_block(body_stmt) if body_stmt else []
+        body = self._emit_block(body_stmt, ctx) if body_stmt else []
         lines = ["while True:"] + self._indent(body)
-        lines.append(f"    if not ({cond}):")
-        lines.append("        break")
+        lines.append((1, f"if not ({cond}):"))
+        lines.append((2, "break"))
         return lines
 
     def _extract_catch_type(self, node) -> str:
@@ -169,7 +169,7 @@ class ControlConverter:
             return _map_exc_name(m.group(1))
         return "Exception"
 
-    def convert_try(self, node) -> List[str]:
+    def convert_try(self, node, ctx) -> List[Line]:
         chs = children(node)
         try_body = None
         catchers = []
@@ -185,7 +185,7 @@ class ControlConverter:
                     finally_body = ch
 
         lines = ["try:"]
-        lines += self._indent(self._emit_block(try_body) if try_body else [])
+        lines += self._indent(self._emit_block(try_body, ctx) if try_body else [])
         for c in catchers:
             ex_type = self._extract_catch_type(c)
             lines.append(f"except {ex_type} as ex:")
@@ -195,16 +195,16 @@ class ControlConverter:
                 if cc.get("type") == "BlockStmt":
                     block = cc
                     break
-            lines += self._indent(self._emit_block(block) if block else [])
+            lines += self._indent(self._emit_block(block, ctx) if block else [])
         if finally_body is not None:
             lines.append("finally:")
-            lines += self._indent(self._emit_block(finally_body))
+            lines += self._indent(self._emit_block(finally_body, ctx))
         return lines
 
-    def convert_simple(self, node) -> List[str]:
+    def convert_simple(self, node, ctx) -> List[Line]:
         t = node.get("type")
         if t == "ReturnStmt":
-            expr = self._expr(get_attr(node, "expr") or "")
+            expr = self._expr(get_attr(node, "expr") or "", ctx)
             return [f"return {expr}".rstrip()]
         if t == "BreakStmt":
             return ["break"]
@@ -220,38 +220,38 @@ class ControlConverter:
             return [f"raise {expr or 'Exception()'}"]
         return [f"# control: {t}"]
 
-    def convert_expr_stmt(self, node) -> List[str]:
+    def convert_expr_stmt(self, node, ctx) -> List[Line]:
         code = get_attr(node, "code") or node.get("name") or node.get("value")
         if isinstance(code, str) and code.strip():
-            return self.root.expr_conv.convert({"type": "Inline", "name": code.strip()})
+            return ctx.timed(self.root.expr_conv.convert, {"type": "Inline", "name": code.strip()}, ctx)
         chs = children(node)
-        out: List[str] = []
+        out: List[Line] = []
         for ch in chs:
-            out.extend(self.root.convert_node(ch))
+            out.extend(self.root.convert_node(ch, ctx))
         return out or [f"# expr-stmt"]
 
-    def convert(self, node) -> List[str]:
+    def convert(self, node, ctx) -> List[Line]:
         t = node.get("type", "")
         if t in ("IfStmt", "IfStatement"):
-            return self.convert_if(node)
+            return self.convert_if(node, ctx)
         if t in ("ForStmt", "ForStatement"):
-            return self.convert_for(node)
+            return self.convert_for(node, ctx)
         if t in ("ForEachStmt", "ForeachStmt", "EnhancedFor"):
-            return self.convert_foreach(node)
+            return self.convert_foreach(node, ctx)
         if t in ("WhileStmt", "WhileStatement"):
-            return self.convert_while(node)
+            return self.convert_while(node, ctx)
         if t in ("DoStmt", "DoWhileStatement", "DoStatement"):
-            return self.convert_do(node)
+            return self.convert_do(node, ctx)
         if t in ("TryStmt", "TryStatement"):
-            return self.convert_try(node)
+            return self.convert_try(node, ctx)
         if t in ("SwitchStmt", "SwitchStatement"):
-            return [f"# switch {get_attr(node,'selector') or node.get('name','')}"] + self._indent(self._emit_block(node))
+            return [f"# switch {get_attr(node,'selector') or node.get('name','')}"] + self._indent(self._emit_block(node, ctx))
         if t == "SwitchExpr":
-            return [f"# switch-expr"] + self._indent(self._emit_block(node))
+            return [f"# switch-expr"] + self._indent(self._emit_block(node, ctx))
         if t in ("ReturnStmt", "BreakStmt", "ContinueStmt", "ThrowStmt"):
-            return self.convert_simple(node)
+            return self.convert_simple(node, ctx)
         if t == "ExpressionStmt":
-            return self.convert_expr_stmt(node)
+            return self.convert_expr_stmt(node, ctx)
         if t == "BlockStmt":
-            return self._emit_block(node)
+            return self._emit_block(node, ctx)
         return [f"# control: {t}"]
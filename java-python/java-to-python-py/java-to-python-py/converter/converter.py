@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
-import ast
+import sys
 import time
 import collections
+import contextlib
 from collections import defaultdict
-from typing import List, Dict, Any
+from functools import cached_property
+from typing import List, Dict, Any, Iterator, TYPE_CHECKING
 
 from converter.basic_structure import ProjectConverter, FileConverter, PackageConverter, ImportConverter
 from converter.classes import TopClassConverter
@@ -14,12 +15,25 @@ from converter.methods import MethodConverter
 from converter.exprs import ExprConverter
 from converter.control import ControlConverter
 from converter.literals import LiteralConverter
-from converter.postprocess import model_patch_code
-
-# 为了 IDE 友好（即使未直接使用也无害）
+from converter.mappings import python_node
+from converter.context import ConversionContext
+from converter.emitter import Line, line_text, render_lines
+from converter.node import NodeBase, is_node, is_snapshot, load_ast, object_hook
 from converter.util import children, get_attr, short_base_type
 from converter.exprs import _extract_call_args, _parse_lambda, _rewrite_common_expr
 
+if TYPE_CHECKING:
+    from converter.result import ConversionResult
+
+# 只在 run() / 并行 / 缓存 / 内存统计 / 快照 / 流式读取 / --profile / --rule-stats 路径上用到的模块
+# （concurrent.futures、multiprocessing、ast、pathlib、mmap、tracemalloc 等）在用到时才导入：
+# 服务 worker 与批量小 AST 的冷启动不为它们付费。用 python -m benchmarks startup 与保存的基线比较。
+
+# 与 prune.PRUNED_KEY 相同：覆盖率计数每个节点都要比较，不为一个常量导入 prune
+PRUNED_KEY = "prunedTypes"
+# 与 stream.STREAM_ROOT_TYPES 相同：非流式路径也要判断根类型，不为此导入 stream
+STREAM_ROOT_TYPES = ("Project", "CompilationUnit")
+
 ACTIONABLE_TYPES = {
     "ClassOrInterfaceDeclaration", "EnumDeclaration", "RecordDeclaration", "AnnotationDeclaration",
     "Class", "Interface",
@@ -36,165 +50,220 @@ COMMENT_ONLY_OK = {
     "PackageDeclaration", "ImportDeclaration", "Package", "Import",
 }
 
+
+def _count_types(value, counts, seen=None):
+    """
+    迭代遍历 value 中所有带 type 的节点（dict 或 Node）并计数（不递归，深树也不会爆栈）。
+    给定 seen 时，children 里已经分发过的节点不再进入（它们由分发时的钩子计数），
+    同时把它们从 seen 中移除。加载时剪掉的子树只留下 PRUNED_KEY 下的类型计数，直接累加。
+    """
+    stack = [value]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        n = pop()
+        if isinstance(n, NodeBase):
+            # Node / NodeView：标量字段里没有节点，只看 nested()、已剪计数与 children
+            t = n.type
+            if t:
+                counts[t] += 1
+            pruned = n.prunedTypes
+            if pruned:
+                counts.update(pruned)
+            stack.extend(n.nested())
+            kids = n.children
+            if kids:
+                if seen is None:
+                    stack.extend(kids)
+                else:
+                    for ch in kids:
+                        if seen.pop(id(ch), None) is None:
+                            push(ch)
+        elif isinstance(n, dict):
+            t = n.get("type")
+            if t:
+                counts[t] += 1
+            for k, v in n.items():
+                if k == PRUNED_KEY:
+                    # 加载时剪掉的子树：只剩类型计数
+                    counts.update(v)
+                elif seen is not None and k == "children" and isinstance(v, (list, tuple)):
+                    for ch in v:
+                        if seen.pop(id(ch), None) is None:
+                            push(ch)
+                else:
+                    push(v)
+        elif isinstance(n, (list, tuple)):
+            stack.extend(n)
+
+
+def _is_view(node) -> bool:
+    # NodeView 只可能来自已经导入的 snapshot 模块：没导入就不必为这个判断加载 mmap / struct
+    snapshot = sys.modules.get("converter.snapshot")
+    return snapshot is not None and isinstance(node, snapshot.NodeView)
+
+
+def efficiency_score(stats: Dict[str, Any]) -> float:
+    """转换效率：有效转换（平凡转换按 1/4 计）占可处理节点的比例。"""
+    act = max(1, stats.get("actionable", 0))
+    return (stats.get("converted_ok", 0) + 0.25 * stats.get("converted_trivial", 0)) / act
+
+
+def _ctx_attr(name: str):
+    return property(
+        lambda self: getattr(self.ctx, name),
+        lambda self, value: setattr(self.ctx, name, value),
+    )
+
+# 节点类型 -> (子转换器属性名, 方法名)；属性名为 None 时是 Converter 自身的方法
+DISPATCH: Dict[str, tuple] = {}
+
+
+def _route(types, conv, method="convert"):
+    for tp in types:
+        DISPATCH[tp] = (conv, method)
+
+
+_route(("Project", "CompilationUnit"), "project_conv")
+_route(("File",), "file_conv")
+_route(("Package", "PackageDeclaration"), None, "_convert_package")
+_route(("Import", "ImportDeclaration"), None, "_convert_import")
+_route(("Javadoc", "LineComment", "BlockComment", "OrphanComment"), None, "_convert_comment")
+_route(("ClassOrInterfaceDeclaration", "EnumDeclaration", "RecordDeclaration", "AnnotationDeclaration",
+        "Class", "Interface"), "top_cls_conv")
+_route(("Field", "FieldDeclaration"), "field_conv")
+_route(("Variable", "VariableDeclarator"), None, "_convert_variable")
+_route(("Method", "MethodDeclaration", "Function", "Constructor", "ConstructorDeclaration"), "method_conv")
+_route(("IfStmt", "IfStatement", "ForStmt", "ForStatement", "ForEachStmt", "ForeachStmt", "EnhancedFor",
+        "WhileStmt", "WhileStatement", "DoStmt", "DoWhileStatement", "DoStatement",
+        "TryStmt", "TryStatement", "SwitchStmt", "SwitchStatement", "SwitchExpr", "ReturnStmt",
+        "BreakStmt", "ContinueStmt", "ThrowStmt", "ExpressionStmt", "BlockStmt", "CatchClause"), "ctrl_conv")
+_route(("Block",), None, "_convert_block")
+_route(("StringLiteralExpr", "IntegerLiteralExpr", "BooleanLiteralExpr", "Constant"), "lit_conv")
+
+
 class Converter:
-    """主分发 + 统计 + 符号表 + 语法可运行性检查"""
+    """主分发 + 统计 + 符号表 + 语法可运行性检查
+
+    转换状态保存在 ConversionContext 中并显式传给各处理器；
+    self.ctx 是 run() 使用的默认上下文，symtab/stats 等旧属性都代理到它。
+    子转换器在第一次用到时才构造，处理器在第一次分发到该节点类型时才绑定（见 DISPATCH）。
+    子转换器本身无状态，多线程下偶尔重复构造也无妨。
+    """
+
+    project_conv = cached_property(lambda self: ProjectConverter(self))
+    file_conv = cached_property(lambda self: FileConverter(self))
+    pkg_conv = cached_property(lambda self: PackageConverter())
+    imp_conv = cached_property(lambda self: ImportConverter())
+    top_cls_conv = cached_property(lambda self: TopClassConverter(self))
+    field_conv = cached_property(lambda self: FieldConverter(self))
+    method_conv = cached_property(lambda self: MethodConverter(self))
+    expr_conv = cached_property(lambda self: ExprConverter(self))
+    ctrl_conv = cached_property(lambda self: ControlConverter(self))
+    lit_conv = cached_property(lambda self: LiteralConverter())
 
     def __init__(self, ast):
         self.ast = ast
-        self.project_conv = ProjectConverter(self)
-        self.file_conv = FileConverter(self)
-        self.pkg_conv = PackageConverter()
-        self.imp_conv = ImportConverter()
-        self.top_cls_conv = TopClassConverter(self)
-        self.field_conv = FieldConverter(self)
-        self.method_conv = MethodConverter(self)
-        self.expr_conv = ExprConverter(self)
-        self.ctrl_conv = ControlConverter(self)
-        self.lit_conv = LiteralConverter()
-        self.symtab = {}  # 变量/字段 -> Java 短类型
-        self.field_names = set()  # 仅记录类字段名，用于 self. 注入（兼容旧逻辑）
-        self.field_info = {}  # 字段名 -> 可见性等元数据
-        self.param_alias = {}  # 参数重命名映射（关键字规避）
-        self.required_imports = set()
-        self.pq_keys = {}
-        self.scope_stack = []
-        self.class_stack = []
-        self.nested_class_stack = []
-        self.doc_comment_suppression = 0
-        self.stats = {
-            "actionable": 0,
-            "converted_ok": 0,
-            "converted_trivial": 0,
-            "fallback_lines": 0,
-            "unhandled_by_type": defaultdict(int),
-            "unmapped_methods": defaultdict(int),
-        }
-        self.handlers = self._build_dispatch()
-        self.ast_type_counts = collections.Counter()
+        self.ctx = ConversionContext()
+        self.cache = None  # ConversionCache；为 None 时不缓存
+        self.coverage = True  # False 时不统计节点类型覆盖率
+        self.profile = False  # True 时按处理器/节点类型统计耗时（--profile）
+        self.rule_stats = False  # True 时统计表达式改写规则的命中与耗时（--rule-stats）
+        self.memory = None  # MemoryTracker；为 None 时不记录内存（--memory）
+        self.syntax_cache = None  # 分块语法检查结果缓存（与 cache 同目录）
+        self.compact_nodes = True  # run() 自行加载 AST 时构造 Node 而非 dict（--dict-nodes 关闭）
+        self.prune_ast = True  # run() 自行加载 AST 时按 prune.PRUNE_SPEC 剪枝（--no-prune 关闭）
+        self.shared_ast = True  # 进程池并行时把 AST 放进共享内存，worker 只收句柄（--no-shared-ast 关闭）
+        self.handlers = {}  # 节点类型 -> 已绑定的处理器（_handler_for 按需填充）
 
         self.timing = {
             "elapsed_ms": 0.0,
             "lines": 0,
         }
 
+    # 兼容旧接口：以下属性均代理到默认上下文
+    symtab = _ctx_attr("symtab")
+    field_names = _ctx_attr("field_names")
+    field_info = _ctx_attr("field_info")
+    param_alias = _ctx_attr("param_alias")
+    required_imports = _ctx_attr("required_imports")
+    pq_keys = _ctx_attr("pq_keys")
+    scope_stack = _ctx_attr("scope_stack")
+    class_stack = _ctx_attr("class_stack")
+    nested_class_stack = _ctx_attr("nested_class_stack")
+    doc_comment_suppression = _ctx_attr("doc_comment_suppression")
+    stats = _ctx_attr("stats")
+    ast_type_counts = _ctx_attr("ast_type_counts")
+
     def push_scope(self, names=None):
-        scope = set(names or [])
-        self.scope_stack.append(scope)
-        return scope
+        self.ctx.push_scope(names)
 
     def pop_scope(self):
-        if self.scope_stack:
-            self.scope_stack.pop()
+        self.ctx.pop_scope()
 
     def add_local(self, name: str):
-        if self.scope_stack and name:
-            self.scope_stack[-1].add(name)
+        self.ctx.add_local(name)
 
     def is_local(self, name: str) -> bool:
-        if not name:
-            return False
-        return any(name in scope for scope in reversed(self.scope_stack))
+        return self.ctx.is_local(name)
 
     def is_field_ref(self, name: str) -> bool:
-        if not name:
-            return False
-        return name in getattr(self, "field_names", set()) and not self.is_local(name)
+        return self.ctx.is_field_ref(name)
+
+    def push_class(self, name: str, nested_names=None):
+        self.ctx.push_class(name, nested_names)
+
+    def pop_class(self):
+        self.ctx.pop_class()
 
     # ---------------- Dispatch helpers ----------------
 
-    def _build_dispatch(self):
-        handlers = {}
-
-        def bind(types, fn):
-            for tp in types:
-                handlers[tp] = fn
-
-        bind(("Project", "CompilationUnit"), self.project_conv.convert)
-        bind(("File",), self.file_conv.convert)
-        bind(("Package", "PackageDeclaration"), self._convert_package)
-        bind(("Import", "ImportDeclaration"), self._convert_import)
-        bind(("Javadoc", "LineComment", "BlockComment", "OrphanComment"), self._convert_comment)
-        bind(("ClassOrInterfaceDeclaration", "EnumDeclaration", "RecordDeclaration", "AnnotationDeclaration",
-              "Class", "Interface"), self.top_cls_conv.convert)
-        bind(("Field", "FieldDeclaration"), self.field_conv.convert)
-        bind(("Variable", "VariableDeclarator"), self._convert_variable)
-        bind(("Method", "MethodDeclaration", "Function", "Constructor", "ConstructorDeclaration"), self.method_conv.convert)
-        bind(("IfStmt", "IfStatement", "ForStmt", "ForStatement", "ForEachStmt", "ForeachStmt", "EnhancedFor",
-              "WhileStmt", "WhileStatement", "DoStmt", "DoWhileStatement", "DoStatement",
-              "TryStmt", "TryStatement", "SwitchStmt", "SwitchStatement", "SwitchExpr", "ReturnStmt",
-              "BreakStmt", "ContinueStmt", "ThrowStmt", "ExpressionStmt", "BlockStmt", "CatchClause"),
-             self.ctrl_conv.convert)
-        bind(("Block",), self._convert_block)
-        bind(("StringLiteralExpr", "IntegerLiteralExpr", "BooleanLiteralExpr", "Constant"), self.lit_conv.convert)
-        return handlers
-
-    def _convert_comment(self, node):
+    def _handler_for(self, t: str):
+        """t 的处理器（没有登记时为 None）；第一次查到时构造对应子转换器并缓存绑定方法。"""
+        handler = self.handlers.get(t)
+        if handler is None:
+            route = DISPATCH.get(t)
+            if route is None:
+                return None
+            conv, method = route
+            handler = self.handlers[t] = getattr(self if conv is None else getattr(self, conv), method)
+        return handler
+
+    def _convert_comment(self, node, ctx: ConversionContext):
         if node.get("type") == "Javadoc":
             return []
         content = node.get("value") or node.get("name") or ""
         if not content:
             return []
-        if getattr(self, "doc_comment_suppression", 0):
+        if ctx.doc_comment_suppression:
             stripped = content.strip()
             if stripped.startswith("*") or stripped.startswith("@") or "@param" in stripped or "@return" in stripped:
                 return []
         lines = content.splitlines() or [content]
         return [f"# {ln}" if ln.strip() else "#" for ln in lines]
 
-    def push_scope(self, names=None):
-        scope = set()
-        if names:
-            scope.update(names)
-        self.scope_stack.append(scope)
-
-    def pop_scope(self):
-        if self.scope_stack:
-            self.scope_stack.pop()
-
-    def add_local(self, name: str):
-        if not name:
-            return
-        if not self.scope_stack:
-            self.scope_stack.append(set())
-        self.scope_stack[-1].add(name)
-
-    def is_local(self, name: str) -> bool:
-        if not name:
-            return False
-        return any(name in scope for scope in reversed(self.scope_stack))
-
-    def push_class(self, name: str, nested_names=None):
-        self.class_stack.append(name)
-        self.nested_class_stack.append(set(nested_names or []))
-
-    def pop_class(self):
-        if self.class_stack:
-            self.class_stack.pop()
-        if self.nested_class_stack:
-            self.nested_class_stack.pop()
-
-    def _convert_package(self, node):
+    def _convert_package(self, node, ctx: ConversionContext = None):
         node2 = {"type": "Package", "name": node.get("name", "")}
         return self.pkg_conv.convert(node2)
 
-    def _convert_import(self, node):
+    def _convert_import(self, node, ctx: ConversionContext = None):
         node2 = {"type": "Import", "name": node.get("name", "")}
         return self.imp_conv.convert(node2)
 
-    def _convert_variable(self, node):
+    def _convert_variable(self, node, ctx: ConversionContext):
         name = node.get("name")
         vtype = node.get("value")
         init = get_attr(node, "initializer")
         if name:
             try:
-                self.add_local(name)
+                ctx.add_local(name)
             except Exception:
                 pass
         if name:
             base = short_base_type(vtype) if vtype else None
             if base:
-                self.symtab[name] = base
-            self.add_local(name)
+                ctx.symtab[name] = base
+            ctx.add_local(name)
         if name and init is not None:
             init_str = str(init).strip()
             if vtype and "PriorityQueue" in str(vtype) and "Comparator.comparingInt" in init_str:
@@ -204,19 +273,19 @@ class Converter:
                     lvar, body = _parse_lambda(args.strip())
                     if lvar and body:
                         key_name = f"{name}_key"
-                        self.pq_keys[name] = key_name
-                        self.required_imports.add("import heapq")
+                        ctx.pq_keys[name] = key_name
+                        ctx.required_imports.add("import heapq")
                         body = _rewrite_common_expr(body)
                         return [f"{key_name} = lambda {lvar}: {body}", f"{name} = []"]
-            init_expr = self.expr_conv.convert({"type": "Inline", "name": init_str})
+            init_expr = ctx.timed(self.expr_conv.convert, {"type": "Inline", "name": init_str}, ctx)
             init_val = init_expr[0] if init_expr else init_str
             return [f"{name} = {init_val}"]
         return []
 
-    def _convert_block(self, node):
+    def _convert_block(self, node, ctx: ConversionContext):
         out = []
         for ch in children(node):
-            out.extend(self.convert_node(ch))
+            out.extend(self.convert_node(ch, ctx))
         return out
 
     # ---------------- Conversion (existing) ----------------
@@ -224,60 +293,150 @@ class Converter:
     def _is_actionable_type(self, t: str) -> bool:
         return t in ACTIONABLE_TYPES
 
-    def _record_stats(self, t: str, lines: List[str]):
+    def _record_stats(self, t: str, lines: List[Line], ctx: ConversionContext):
         if not self._is_actionable_type(t):
             return
-        self.stats["actionable"] += 1
-        code_lines = [ln for ln in lines if ln.strip() and not ln.lstrip().startswith("#")]
+        stats = ctx.stats
+        stats["actionable"] += 1
+        code_lines = [ln for ln in map(line_text, lines) if ln.strip() and not ln.lstrip().startswith("#")]
         if code_lines:
             if all(ln.strip() in ("pass", "raise NotImplementedError") for ln in code_lines):
-                self.stats["converted_trivial"] += 1
+                stats["converted_trivial"] += 1
             else:
-                self.stats["converted_ok"] += 1
+                stats["converted_ok"] += 1
         else:
             if t in COMMENT_ONLY_OK and lines:
-                self.stats["converted_trivial"] += 1
+                stats["converted_trivial"] += 1
                 return
             for ln in lines:
-                s = ln.strip()
+                s = line_text(ln).strip()
                 if s.startswith("# Unhandled node type:") or s.startswith("# expr:") or s.startswith("# control:"):
-                    self.stats["fallback_lines"] += 1
-                self.stats["unhandled_by_type"][t] += 1
+                    stats["fallback_lines"] += 1
+                stats["unhandled_by_type"][t] += 1
 
     def _snapshot_stats(self) -> Dict[str, Any]:
-        return {
-            "actionable": self.stats["actionable"],
-            "converted_ok": self.stats["converted_ok"],
-            "converted_trivial": self.stats["converted_trivial"],
-            "fallback_lines": self.stats["fallback_lines"],
-            "unhandled_by_type": dict(self.stats["unhandled_by_type"]),
-            "unmapped_methods": dict(self.stats["unmapped_methods"]),
-        }
+        return self.ctx.snapshot_stats()
+
+    def _merge_stats(self, snapshot: Dict[str, Any]):
+        """把 _snapshot_stats() 格式的统计累加进当前统计（并行/缓存结果合并用）。"""
+        for key in ("actionable", "converted_ok", "converted_trivial", "fallback_lines"):
+            self.stats[key] += snapshot.get(key, 0)
+        for key in ("unhandled_by_type", "unmapped_methods"):
+            for k, v in (snapshot.get(key) or {}).items():
+                self.stats[key][k] += v
+
+    def _merge_file_result(self, res: Dict[str, Any]) -> List[str]:
+        self._merge_stats(res.get("stats") or {})
+        self.required_imports.update(res.get("required_imports") or ())
+        if self.ast_type_counts is not None:
+            self.ast_type_counts.update(res.get("ast_type_counts") or {})
+        if self.memory is not None and res.get("memory"):
+            self.memory.add_file(res["memory"])
+        if self.ctx.profile is not None and res.get("profile"):
+            self.ctx.profile.merge(res["profile"])
+        if self.ctx.rules is not None and res.get("rules"):
+            self.ctx.rules.merge(res["rules"])
+        return res.get("lines") or []
+
+    def _apply_handler(self, t: str, handler, node: dict, ctx: ConversionContext) -> List[Line]:
+        prof = ctx.profile
+        if prof is None:
+            lines = handler(node, ctx)
+        else:
+            from converter.profile import handler_name
 
-    def _apply_handler(self, t: str, handler, node: dict) -> List[str]:
-        lines = handler(node)
-        self._record_stats(t, lines)
+            lines = prof.call(handler_name(handler), t, handler, node, ctx)
+        self._record_stats(t, lines, ctx)
         return lines
 
-    def convert_node(self, node) -> List[str]:
-        if not node or not isinstance(node, dict):
+    def convert_node(self, node, ctx: ConversionContext = None) -> List[Line]:
+        if not node or not is_node(node):
             return []
+        if ctx is None:
+            ctx = self.ctx
+        counts = ctx.ast_type_counts
+        if counts is None or id(node) in ctx.visited:
+            return self._dispatch(node, ctx)
+        # 覆盖率钩子：进入时计自身（含 attrs 等非 children 部分），
+        # 返回时补计处理器没有分发到的子树，整棵树每个节点恰好计一次
+        ctx.visited[id(node)] = node
+        t = node.get("type")
+        if t:
+            counts[t] += 1
+        if isinstance(node, NodeBase):
+            if node.prunedTypes:
+                counts.update(node.prunedTypes)
+            for v in node.nested():
+                _count_types(v, counts)
+        else:
+            for k, v in node.items():
+                if k == PRUNED_KEY:
+                    counts.update(v)
+                elif k != "children":
+                    _count_types(v, counts)
+        ctx.visit_depth += 1
+        try:
+            return self._dispatch(node, ctx)
+        finally:
+            ctx.visit_depth -= 1
+            kids = node.get("children")
+            if kids:
+                _count_types({"children": kids}, counts, ctx.visited)
+            if not ctx.visit_depth:
+                ctx.visited.clear()
+
+    def _dispatch(self, node, ctx: ConversionContext) -> List[Line]:
         t = node.get("type", "")
 
-        handler = self.handlers.get(t)
+        handler = self.handlers.get(t) or self._handler_for(t)
         if handler:
-            return self._apply_handler(t, handler, node)
+            return self._apply_handler(t, handler, node, ctx)
 
         if t.endswith("Expression") or t.endswith("Expr") or t == "Expression":
-            return self._apply_handler(t, self.expr_conv.convert, node)
+            return self._apply_handler(t, self.expr_conv.convert, node, ctx)
 
         lines = [f"# Unhandled node type: {t}"]
-        self._record_stats(t, lines)
+        self._record_stats(t, lines, ctx)
         return lines
 
+    def convert_isolated(self, node, coverage: bool = True, profile: bool = False,
+                         rules: bool = False) -> Dict[str, Any]:
+        """
+        用全新的 ConversionContext 转换一个子树（通常是 File），返回可合并的结果。
+        不修改 Converter 自身，可在多个线程中并发调用。
+        """
+        ctx = ConversionContext(coverage, profile, rules)
+        lines = self.convert_node(node, ctx)
+        return ctx.file_result(render_lines(lines))
+
+    def reset(self, ast=None):
+        """
+        清掉上一次转换留下的全部状态（stats / symtab / required_imports / pq_keys / param_alias /
+        字段暂存等都在 ctx 里），换上新的 ast，以便同一个 Converter 连续转换多个输入。
+        子转换器、已绑定的处理器与映射索引保留复用；coverage / profile 等开关不变。
+        """
+        self.ast = ast
+        self.ctx = ConversionContext(self.coverage, self.profile)
+        self.timing = {
+            "elapsed_ms": 0.0,
+            "lines": 0,
+        }
+
+    def convert_many(self, asts, postprocess: bool = True, coverage: bool = True,
+                     syntax: bool = True) -> Iterator[ConversionResult]:
+        """
+        依次转换多个已加载的 AST（dict / Node / NodeView），每个输入产出一个 ConversionResult（见 convert()）。
+        全程在内存里完成，不读写文件、不打印；每个输入之间 reset()，处理器与映射表复用。
+        syntax=False 时跳过语法检查（结果里 syntax 为 None）。
+        """
+        for ast in asts:
+            yield self.convert(ast, postprocess=postprocess, coverage=coverage, syntax=syntax)
+
+    def _efficiency(self) -> float:
+        return efficiency_score(self.stats)
+
     def _report(self):
-        act = max(1, self.stats["actionable"])
-        score = (self.stats["converted_ok"] + 0.25 * self.stats["converted_trivial"]) / act
+        score = self._efficiency()
         print("------ 转换报告 ------")
         print(f"可处理节点数:            {self.stats['actionable']}")
         print(f"有效转换:                {self.stats['converted_ok']}")
@@ -302,37 +461,43 @@ class Converter:
 
     def _collect_ast_type_counts(self, node):
         counts = collections.Counter()
-
-        def walk(n):
-            if isinstance(n, dict):
-                t = n.get("type")
-                if t:
-                    counts[t] += 1
-                for v in n.values():
-                    walk(v)
-            elif isinstance(n, list):
-                for item in n:
-                    walk(item)
-
-        walk(node)
+        _count_types(node, counts)
         return counts
 
     def _handler_name_for_type(self, t: str) -> str:
-        handler = self.handlers.get(t)
+        from converter.profile import handler_name
+
+        handler = self._handler_for(t)
         if handler:
-            return getattr(handler, "__qualname__", getattr(handler, "__name__", str(handler)))
+            return handler_name(handler)
         if t.endswith("Expression") or t.endswith("Expr") or t == "Expression":
             return "ExprConverter.convert"
         return "UNHANDLED"
 
+    def _ast_type_coverage(self) -> Dict[str, Dict[str, Any]]:
+        """{AST 类型: {count, handler, python}}，按数量降序；python 为映射表.xlsx 里对应的 Python ast 节点。"""
+        return {
+            t: {"count": count, "handler": self._handler_name_for_type(t), "python": python_node(t)}
+            for t, count in sorted((self.ast_type_counts or {}).items(), key=lambda x: (-x[1], x[0]))
+        }
+
     def _report_ast_type_coverage(self):
         if not self.ast_type_counts:
             return
         print("------ AST 节点覆盖率 ------")
         print("说明: UNHANDLED 表示未绑定处理器或未进入表达式兜底规则。")
-        for t, count in sorted(self.ast_type_counts.items(), key=lambda x: (-x[1], x[0])):
-            handler = self._handler_name_for_type(t)
-            print(f"{t}: {count} -> {handler}")
+        for t, info in self._ast_type_coverage().items():
+            print(f"{t}: {info['count']} -> {info['handler']}")
+        print("-------------------------------")
+
+    def _report_profile(self):
+        if self.ctx.profile is None:
+            return
+        from converter.profile import format_profile
+
+        print("------ 处理器耗时(--profile) ------")
+        for line in format_profile(self.ctx.profile.to_dict()):
+            print(line)
         print("-------------------------------")
 
     # ---------------- Syntax check (new) ----------------
@@ -381,7 +546,7 @@ class Converter:
             blocks.append({"name": name, "start_line": start, "code": code})
         return blocks
 
-    def _syntax_check(self, content: str):
+    def _syntax_check(self, content: str, jobs: int = 1, executor: str = "process"):
         """
         返回：
           {
@@ -393,46 +558,53 @@ class Converter:
             'rate': float,
           }
         """
+        from converter.syntax import check_blocks, parse_error
+
         info = {}
         lines = content.splitlines()
 
-        # 1) 模块级
-        try:
-            ast.parse(content)
-            info["module_ok"] = True
-            info["module_error"] = None
-        except SyntaxError as e:
-            info["module_ok"] = False
-            info["module_error"] = {
-                "msg": e.msg,
-                "lineno": e.lineno,
-                "offset": e.offset,
-                "text": (e.text or "").rstrip("\n") if hasattr(e, "text") else ""
-            }
-
-        # 2) 分块
+        # 1) 模块级：结论与分块结果一起缓存（键包在 {"module": ...} 里，不会和内容相同的块撞键）
+        cache = self.syntax_cache
+        key = hit = None
+        if cache is not None:
+            key = cache.key_for({"module": content})
+            hit = cache.get(key)
+        if hit is not None:
+            err = hit.get("error")
+        else:
+            err = parse_error(content)
+            if err is not None:
+                err["text"] = err["text"].rstrip("\n")
+            if key is not None:
+                cache.put(key, {"error": err})
+        info["module_ok"] = err is None
+        info["module_error"] = err
+
+        # 2) 分块：模块整体能解析时各块视为通过，不再逐块重复 parse
         blocks = self._extract_top_blocks(lines)
+        if info["module_ok"]:
+            errors = [None] * len(blocks)
+        else:
+            errors = check_blocks([blk["code"] for blk in blocks], jobs, executor, cache)
         results = []
         ok = 0
-        for blk in blocks:
-            code = blk["code"]
-            try:
-                ast.parse(code)
+        for blk, err in zip(blocks, errors):
+            if err is None:
                 blk["ok"] = True
                 blk["error"] = None
                 ok += 1
-            except SyntaxError as e:
-                glineno = blk["start_line"] + (e.lineno or 1) - 1
+            else:
+                glineno = blk["start_line"] + (err["lineno"] or 1) - 1
                 line_text = ""
                 if 1 <= glineno <= len(lines):
                     line_text = lines[glineno - 1]
                 blk["ok"] = False
                 blk["error"] = {
-                    "msg": e.msg,
+                    "msg": err["msg"],
                     "lineno_global": glineno,
-                    "lineno_local": e.lineno,
-                    "offset": e.offset,
-                    "line": (line_text or (e.text or "")).rstrip("\n"),
+                    "lineno_local": err["lineno"],
+                    "offset": err["offset"],
+                    "line": (line_text or err["text"]).rstrip("\n"),
                 }
             results.append(blk)
 
@@ -515,50 +687,291 @@ class Converter:
 
     # ---------------- Driver ----------------
 
-    def run(self, in_json="ast_Demo.json", out_py="converted.py", postprocess=True):
-        start = time.perf_counter()
-        data = self.ast if isinstance(self.ast, dict) else json.load(open(in_json, encoding="utf-8"))
-        self.ast_type_counts = self._collect_ast_type_counts(data)
-        lines = self.convert_node(data)
-        content = "\n".join(lines).rstrip() + "\n"
-        if self.required_imports:
-            imports = "\n".join(sorted(self.required_imports)) + "\n\n"
-            content = imports + content
-        if postprocess:
-            try:
-                content = model_patch_code(content)
-            except Exception:
-                pass
-        with open(out_py, "w", encoding="utf-8") as f:
-            f.write(content)
+    def _iter_files(self, nodes, jobs: int = 1, executor: str = "process") -> Iterator[List[Line]]:
+        """
+        按原始顺序转换 Project 的子节点，逐个文件产出行列表；jobs > 1 时交给进程池/线程池并合并结果。
+        串行时每个文件同样以独立上下文转换（convert_isolated），文件之间不共享符号表等状态，
+        输出与报告（含未映射方法）不随 --jobs / --cache-dir 变化；启用缓存时结果按子树哈希存取。
+        """
+        if jobs > 1:
+            from converter.parallel import convert_files_parallel
+
+            for res in convert_files_parallel(nodes, jobs, executor=executor, conv=self, cache=self.cache,
+                                              coverage=self.coverage, profile=self.profile,
+                                              rules=self.rule_stats,
+                                              memory=self.memory is not None):
+                yield self._merge_file_result(res)
+            return
+        cache = self.cache
+        for ch in nodes:
+            key = res = None
+            if cache is not None:
+                key = cache.key_for(ch)
+                res = cache.get(key)
+            if res is None:
+                with self._mem_file(ch):
+                    res = self.convert_isolated(ch, self.coverage, self.profile, self.rule_stats)
+                if cache is not None:
+                    cache.put(key, res)
+            ch = None
+            yield self._merge_file_result(res)
+
+    def _mem_phase(self, name: str):
+        return self.memory.phase(name) if self.memory is not None else contextlib.nullcontext()
+
+    def _mem_file(self, node):
+        if self.memory is None:
+            return contextlib.nullcontext()
+        return self.memory.file(node.get("name") or node.get("type", ""))
+
+    def _iter_stream(self, in_json, jobs: int = 1, executor: str = "process") -> Iterator[List[Line]]:
+        """按 File 子树逐个读取并转换，转换完即释放该子树。"""
+        from converter.stream import ProjectStreamReader
+
+        reader = ProjectStreamReader(in_json, object_hook=object_hook(self.compact_nodes, self.prune_ast))
+        deferred = []
+
+        def streamable():
+            for ch in reader:
+                if reader.header.get("type") in STREAM_ROOT_TYPES:
+                    yield ch
+                else:
+                    # 根节点不是 Project：无法逐个转换，退回整体转换
+                    deferred.append(ch)
+
+        yield from self._iter_files(streamable(), jobs, executor)
+        root = dict(reader.header)
+        if root.get("type") in STREAM_ROOT_TYPES and not deferred:
+            if self.ast_type_counts is not None:
+                self.ast_type_counts.update(self._collect_ast_type_counts(root))
+            return
+        root["children"] = deferred
+        yield self.convert_node(root)
+
+    def _use_shared(self, data, jobs: int, executor: str) -> bool:
+        # 共享内存节点表只对进程池有意义；已是快照视图的无需再放，--dict-nodes 时 worker 应拿到 dict
+        return (self.shared_ast and jobs > 1 and executor == "process" and not _is_view(data)
+                and (self.compact_nodes if data is None else isinstance(data, NodeBase)))
+
+    def _iter_converted(self, in_json, stream=False, jobs=1, executor="process") -> Iterator[List[Line]]:
+        self.ast_type_counts = collections.Counter() if self.coverage else None
+        if self.profile:
+            from converter.profile import HandlerProfile
+        if self.rule_stats:
+            from converter.rulestats import RuleStats
+        self.ctx.profile = HandlerProfile() if self.profile else None
+        self.ctx.rules = RuleStats() if self.rule_stats else None
+        snapshot = False
+        if not is_node(self.ast):
+            snapshot = is_snapshot(in_json)
+        if stream and not is_node(self.ast) and not snapshot:
+            yield from self._iter_stream(in_json, jobs, executor)
+            return
+        shared = None
+        if jobs > 1:
+            from converter.sharedast import SharedAST
+        if is_node(self.ast):
+            data = self.ast
+            if self._use_shared(data, jobs, executor):
+                with self._mem_phase("load"):
+                    shared = SharedAST.from_tree(data)
+                data = shared.root
+        elif snapshot:
+            # 二进制快照：mmap 打开即可用，节点按需读取，本身就是流式的
+            from converter.snapshot import open_snapshot
+
+            with self._mem_phase("load"):
+                data = open_snapshot(in_json).root
+        elif self._use_shared(None, jobs, executor):
+            # 按 File 流式读入共享内存节点表，主进程不建 Node 树；worker 按句柄零拷贝读取各自的 File
+            with self._mem_phase("load"):
+                shared = SharedAST.from_json(in_json, self.prune_ast)
+            data = shared.root
+        else:
+            with self._mem_phase("load"), open(in_json, encoding="utf-8") as f:
+                data = load_ast(f, self.compact_nodes, self.prune_ast)
+        try:
+            if data.get("type") in STREAM_ROOT_TYPES:
+                # Project / CompilationUnit 本身只是扁平拼接子节点，逐个 File 转换与整体转换等价
+                if self.coverage:
+                    header = {k: v for k, v in data.items() if k != "children"}
+                    self.ast_type_counts = self._collect_ast_type_counts(header)
+                # 快照根节点逐个产出新视图，转换完的 File 子树随即释放
+                files = data.iter_children() if _is_view(data) else children(data)
+                yield from self._iter_files(files, jobs, executor)
+            else:
+                yield self.convert_node(data)
+        finally:
+            if shared is not None:
+                data = files = None
+                shared.close()
+
+    def convert(self, ast=None, source=None, postprocess=True, stream=False, jobs=1, executor="process",
+                cache_dir=None, coverage=True, profile=False, rule_stats=False, memory=None,
+                syntax=True) -> ConversionResult:
+        """
+        纯内存转换：不写文件、不打印，返回 ConversionResult（代码、统计、语法检查、耗时）。
+        ast 为已加载的 AST（dict / Node / NodeView）；为 None 时用构造时的 ast，
+        仍为 None 时从 source（JSON 或 convert-ast 快照路径）读取（stream / 快照 / 共享内存并行同 run()）。
+        每次调用先 reset()，同一个 Converter 可反复调用。
+        profile / rule_stats / memory / cache_dir / jobs 的含义同 run()；syntax=False 时跳过语法检查。
+        """
+        self.reset(self.ast if ast is None else ast)
+        if self.ast is None and source is None:
+            raise ValueError("需要 ast 或 source")
+        return self._convert(None, "<memory>" if source is None else source, postprocess, stream, jobs, executor,
+                             cache_dir, coverage, profile, rule_stats, memory, syntax)
+
+    def _convert(self, out_py, source, postprocess, stream, jobs, executor, cache_dir, coverage, profile,
+                 rule_stats, memory, syntax) -> ConversionResult:
+        """
+        convert() / run() 的共同实现。out_py 为 None 时 ModuleWriter 全在内存里；
+        否则转换结果流式写进 out_py（见 ModuleWriter），语法检查后把报告注释追加到同一文件。
+        耗时：write_ms 为后处理并写出模块，elapsed_ms 到模块写完为止，report_ms 为报告注释（run() 再加上控制台报告）。
+        """
+        from converter.result import ConversionResult
 
-        elapsed_ms = (time.perf_counter() - start) * 1000
-        self.timing["elapsed_ms"] = elapsed_ms
-        self.timing["lines"] = len(lines)
-        print("✅ 完成 →", out_py)
+        start = time.perf_counter()
+        phases = {}
+        self.coverage = coverage
+        self.profile = profile
+        self.rule_stats = rule_stats
+        own_tracker = memory is True
+        if own_tracker:
+            from converter.memory import MemoryTracker
+
+            memory = MemoryTracker()
+        self.memory = memory or None
+        self.cache = self.syntax_cache = None
+        if cache_dir:
+            from pathlib import Path
+
+            from converter.cache import ConversionCache, converter_fingerprint
+            from converter.syntax import SYNTAX_FINGERPRINT
+
+            # 不统计覆盖率时结果里没有节点计数，不能与统计时的缓存混用
+            fingerprint = converter_fingerprint() + ("" if coverage else ":no-coverage")
+            self.cache = ConversionCache(cache_dir, fingerprint)
+            self.syntax_cache = ConversionCache(Path(cache_dir) / "syntax", SYNTAX_FINGERPRINT)
+        from converter.writer import ModuleWriter
+
+        writer = ModuleWriter(out_py, postprocess)
+        try:
+            with self._mem_phase("convert"):
+                for lines in self._iter_converted(source, stream, jobs, executor):
+                    writer.write_lines(lines)
+                    lines = None
+            rules = self.ctx.rules.to_dict() if self.ctx.rules is not None else None
+            t = time.perf_counter()
+            phases["convert_ms"] = (t - start) * 1000
+            with self._mem_phase("postprocess"):
+                writer.finish(self.required_imports)
+                content = writer.read_code()
+            now = time.perf_counter()
+            phases["write_ms"] = (now - t) * 1000
+            self.timing["elapsed_ms"] = (now - start) * 1000
+            self.timing["lines"] = writer.count
+
+            info = None
+            if syntax:
+                t = time.perf_counter()
+                with self._mem_phase("syntax"):
+                    info = self._syntax_check(content, jobs, executor)
+                phases["syntax_ms"] = (time.perf_counter() - t) * 1000
+            efficiency = self._efficiency()
+            if out_py is not None:
+                t = time.perf_counter()
+                with self._mem_phase("write"):
+                    writer.write_report(self._format_report_comment(efficiency, info))
+                phases["report_ms"] = (time.perf_counter() - t) * 1000
+        finally:
+            writer.close()
+        mem = None
+        if self.memory is not None:
+            mem = self.memory.to_dict()
+            if own_tracker:
+                self.memory.close()
+        phases["total_ms"] = (time.perf_counter() - start) * 1000
+        self.timing["phases"] = phases
+        result = ConversionResult(
+            content=content,
+            stats=self._snapshot_stats(),
+            syntax=info,
+            efficiency=efficiency,
+            timing=dict(self.timing),
+            rules=rules,
+            memory=mem,
+        )
+        if self.ast_type_counts is not None:
+            result.coverage = self._ast_type_coverage()
+        if self.ctx.profile is not None:
+            result.profile = self.ctx.profile.to_dict()
+        if self.cache is not None:
+            result.cache = self.cache.summary()
+            result.cache["syntax"] = self.syntax_cache.summary()
+        return result
+
+    def run(self, in_json="ast_Demo.json", out_py="converted.py", postprocess=True, stream=False, jobs=1,
+            executor="process", cache_dir=None, coverage=True, quiet=False, profile=False, rule_stats=False,
+            memory=None):
+        """
+        转换 in_json 并写出 out_py，返回结果字典（ConversionResult.to_dict()：stats / syntax / efficiency / timing ...）。
+        转换结果边转换边流式写进 out_py，不在内存里拼整份模块；报告注释在语法检查后追加。
+        quiet=True 时不打印任何控制台报告（批处理用 report.write_json_report 等导出结果）。
+        profile=True 时结果里附带 profile：各处理器/节点类型的调用次数与累计、独占耗时。
+        rule_stats=True 时结果里附带 rules：表达式层各改写规则的调用/命中次数与耗时。
+        memory=True（或调用方已建好的 MemoryTracker，可先记录 load 阶段）时结果里附带 memory：
+        各阶段/各 File 的 tracemalloc 峰值与净增，以及每阶段结束时的主要分配位置。
+        """
+        self.reset(self.ast)
+        result = self._convert(out_py, in_json, postprocess, stream, jobs, executor, cache_dir, coverage, profile,
+                               rule_stats, memory, True)
+        if not quiet:
+            t = time.perf_counter()
+            self.report_console(result, out_py)
+            phases = result.timing["phases"]
+            spent = (time.perf_counter() - t) * 1000
+            phases["report_ms"] += spent
+            phases["total_ms"] += spent
+        return result.to_dict()
+
+    def report_console(self, result: ConversionResult, out_py=None):
+        """把 convert() 的结果打印成控制台报告（run() 未加 quiet 时调用）。"""
+        if out_py is not None:
+            print("✅ 完成 →", out_py)
 
         # 原有效率报告
-        score = self._report()
+        self._report()
         self._report_ast_type_coverage()
+        self._report_profile()
+        if result.rules is not None:
+            from converter.rulestats import format_rule_stats
+
+            print("------ 表达式规则(--rule-stats) ------")
+            for line in format_rule_stats(result.rules):
+                print(line)
+            print("-------------------------------")
+        if result.memory is not None:
+            from converter.memory import format_memory
+
+            print("------ 内存(--memory, tracemalloc) ------")
+            for line in format_memory(result.memory):
+                print(line)
+            print("-------------------------------")
 
         # 新增：语法可运行性报告
-        syntax = self._syntax_check(content)
-        self._report_syntax(syntax, content)
+        syntax = result.syntax or {}
+        self._report_syntax(syntax, result.content)
 
         quick_rate = syntax.get("rate", 0.0)
         print(
-            f"概要 → 效率: {score:.3f} | 可解析度: {quick_rate:.3f} | "
-            f"行数: {len(lines)} | 用时: {elapsed_ms:.1f} ms"
+            f"概要 → 效率: {result.efficiency:.3f} | 可解析度: {quick_rate:.3f} | "
+            f"行数: {result.timing['lines']} | 用时: {result.timing['elapsed_ms']:.1f} ms"
         )
+        if self.cache is not None:
+            print(f"缓存 → 命中: {self.cache.hits} | 未命中: {self.cache.misses} | 目录: {self.cache.dir}")
 
-        report_comment = self._format_report_comment(score, syntax)
-        with open(out_py, "a", encoding="utf-8") as f:
-            f.write(report_comment)
 
-        return {
-            "content": content,
-            "stats": self._snapshot_stats(),
-            "syntax": syntax,
-            "efficiency": score,
-            "timing": dict(self.timing),
-        }
+def convert(ast, **options) -> ConversionResult:
+    """库入口：用一个新的 Converter 在内存里转换 ast，返回 ConversionResult（options 同 Converter.convert）。"""
+    return Converter(None).convert(ast, **options)
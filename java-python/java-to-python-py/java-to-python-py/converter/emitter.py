@@ -0,0 +1,70 @@
+"""
+带深度标记的输出行。
+
+处理器返回的行列表里，每个元素是：
+  - str：深度 0 的行（叶子处理器照旧返回普通字符串）
+  - (depth, text)：text 前需要 depth 级缩进
+嵌套时只调整 depth，不复制行文本；缩进前缀按深度缓存，在 render() 时与文本拼接，
+写出时每批行只 join 一次（render_text）。
+"""
+from typing import List, Tuple, Union
+
+INDENT = "    "
+# 各深度的缩进前缀（只读）：渲染时直接取用，不再每行做 INDENT * depth
+_PREFIXES = tuple(INDENT * d for d in range(32))
+
+Line = Union[str, Tuple[int, str]]
+
+# 空白行的处理方式（与各处理器原来的拼接写法一一对应）：
+#   keep  —— "    " + line：空白行也加缩进
+#   empty —— line.strip() 为空时输出 ""
+#   pad   —— line.strip() 为空时只输出缩进本身
+BLANK_KEEP = "keep"
+BLANK_EMPTY = "empty"
+BLANK_PAD = "pad"
+
+
+def line_text(line: Line) -> str:
+    """去掉深度标记后的文本（缩进只有空白，strip 相关判断与渲染后一致）。"""
+    return line[1] if type(line) is tuple else line
+
+
+def indent(lines: List[Line], n: int = 1, blank: str = BLANK_KEEP) -> List[Line]:
+    if blank == BLANK_KEEP:
+        return [(line[0] + n, line[1]) if type(line) is tuple else (n, line) for line in lines]
+    # 空白行全部共用同一个 "" / (n, "")
+    empty = "" if blank == BLANK_EMPTY else (n, "")
+    out: List[Line] = []
+    append = out.append
+    for line in lines:
+        if type(line) is tuple:
+            depth, text = line
+            append((depth + n, text) if text.strip() else empty)
+        else:
+            append((n, line) if line.strip() else empty)
+    return out
+
+
+def indent_block(lines: List[Line], n: int = 1) -> List[Line]:
+    """语句块体：空白行折叠为 ""，空块补 pass。"""
+    return indent(lines, n, BLANK_EMPTY) or [(n, "pass")]
+
+
+def render(line: Line) -> str:
+    if type(line) is tuple:
+        depth, text = line
+        try:
+            return _PREFIXES[depth] + text
+        except IndexError:
+            # 超出缓存的深度现拼，不改共享表（线程池并发渲染时无需加锁）
+            return INDENT * depth + text
+    return line
+
+
+def render_lines(lines: List[Line]) -> List[str]:
+    return list(map(render, lines))
+
+
+def render_text(lines: List[Line]) -> str:
+    """整批行渲染后用 "\n" 连接（一次 join）。"""
+    return "\n".join(map(render, lines))
@@ -0,0 +1,754 @@
+"""
+Java 表达式的单遍词法分析 + Pratt（优先级）解析 + 轻量 IR + Python 生成。
+
+- 词法：一个主正则从左到右扫描一次；括号/花括号的配对在同一遍里用栈求出。
+- 解析：Pratt 解析成小型 IR（_Node），同优先级的二元运算链压平成一个 N 元节点；
+  二元运算的右操作数、前缀运算符/强制转换都用循环和显式栈处理，长链不会加深递归。
+- 生成：未改写的部分按源码原样拼接（保留原有空白），只有命中规则的节点才重写。
+  规则与原正则管线一致：null/true/false/this、泛型擦除、new、List.of、
+  .size()/.isEmpty()/.get()/.contains()、Comparator.comparingInt、逻辑运算、三目。
+
+解析不了的输入（语句块、switch 表达式等）由调用方回退到旧的正则管线。
+整体代价与表达式长度成线性关系；正则管线每条规则都要重扫一遍，长输入上反而慢得多，
+所以超长输入（拼出来的长 get/size 链等）也走这里。
+"""
+import re
+from typing import Callable, List, Optional
+
+from converter.rulestats import rule
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<str>"(?:[^"\\\n]|\\.)*")
+  | (?P<chr>'(?:[^'\\\n]|\\.)*')
+  | (?P<num>\d[\w]*(?:\.\d*)?(?:[eE][+-]?\d+)?[fFdDlL]?|\.\d+(?:[eE][+-]?\d+)?[fFdD]?)
+  | (?P<id>[^\W\d][\w$]*|\$[\w$]*)
+  | (?P<op>>>>=|<<=|>>=|->|::|\+\+|--|&&|\|\||==|!=|<=|>=|\+=|-=|\*=|/=|%=|&=|\|=|\^=|<<
+          |[-+*/%=<>!~?:;,.()\[\]{}&|^@])
+""", re.X)
+
+_BIN_PREC = {
+    "||": 3, "&&": 4, "|": 5, "^": 6, "&": 7,
+    "==": 8, "!=": 8,
+    "<": 9, ">": 9, "<=": 9, ">=": 9, "instanceof": 9,
+    "<<": 10, ">>": 10, ">>>": 10,
+    "+": 11, "-": 11,
+    "*": 12, "/": 12, "%": 12,
+}
+_ASSIGN_OPS = {"=", "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=", "<<=", ">>=", ">>>="}
+_PREFIX_OPS = {"!", "-", "+", "~", "++", "--"}
+_PRIMITIVES = {"int", "long", "short", "byte", "char", "boolean", "float", "double", "void"}
+_LOGICAL = {"&&": "and", "||": "or"}
+_NOT_OPERAND_IDS = {"instanceof"}
+
+
+class ParseError(Exception):
+    pass
+
+
+class _Tok:
+    __slots__ = ("kind", "text", "start", "end", "match")
+
+    def __init__(self, kind, text, start, end):
+        self.kind = kind
+        self.text = text
+        self.start = start
+        self.end = end
+        self.match = -1  # 配对括号的 token 下标
+
+
+class _Node:
+    __slots__ = ("kind", "start", "end", "kids", "data")
+
+    def __init__(self, kind, start, end, kids=None, data=None):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.kids = kids if kids is not None else []
+        self.data = data
+
+
+def tokenize(src: str) -> List[_Tok]:
+    toks: List[_Tok] = []
+    stack = []
+    pos, n = 0, len(src)
+    match = _TOKEN_RE.match
+    while pos < n:
+        m = match(src, pos)
+        if m is None:
+            raise ParseError(f"无法识别的字符: {src[pos]!r}")
+        kind = m.lastgroup
+        end = m.end()
+        if kind != "ws":
+            text = m.group()
+            tok = _Tok(kind, text, pos, end)
+            if kind == "op":
+                if text in "([{":
+                    stack.append((text, len(toks)))
+                elif text in ")]}":
+                    if not stack or "([{"[")]}".index(text)] != stack[-1][0]:
+                        raise ParseError("括号不配对")
+                    _, j = stack.pop()
+                    toks[j].match = len(toks)
+                    tok.match = j
+            toks.append(tok)
+        pos = end
+    if stack:
+        raise ParseError("括号不配对")
+    return toks
+
+
+def strip_generics(s: str) -> str:
+    if "<" not in s:
+        return s
+    out = []
+    depth = 0
+    for ch in s:
+        if ch == "<":
+            depth += 1
+        elif ch == ">":
+            depth = max(0, depth - 1)
+        elif depth == 0:
+            out.append(ch)
+    return "".join(out)
+
+
+class _Parser:
+    def __init__(self, src: str, toks: List[_Tok]):
+        self.src = src
+        self.toks = toks
+        self.i = 0
+
+    # ---------------- token 工具 ----------------
+
+    def _tok(self, k=0) -> Optional[_Tok]:
+        j = self.i + k
+        return self.toks[j] if j < len(self.toks) else None
+
+    def _is(self, text, k=0) -> bool:
+        t = self._tok(k)
+        return t is not None and t.kind == "op" and t.text == text
+
+    def _expect(self, text) -> _Tok:
+        t = self._tok()
+        if t is None or t.kind != "op" or t.text != text:
+            raise ParseError(f"期望 {text!r}")
+        self.i += 1
+        return t
+
+    def _adjacent(self, j) -> bool:
+        """toks[j] 与前一个 token 之间没有空白。"""
+        return j > 0 and self.toks[j - 1].end == self.toks[j].start
+
+    # ---------------- 类型扫描（只前进下标，不建节点） ----------------
+
+    def _scan_type(self, j) -> Optional[int]:
+        toks = self.toks
+        if j >= len(toks) or toks[j].kind != "id":
+            return None
+        j += 1
+        while j < len(toks):
+            t = toks[j]
+            if t.kind == "op" and t.text == "<":
+                j = self._scan_typeargs(j)
+                if j is None:
+                    return None
+            elif (t.kind == "op" and t.text == "." and j + 1 < len(toks)
+                  and toks[j + 1].kind == "id"):
+                j += 2
+            else:
+                break
+        while (j + 1 < len(toks) and toks[j].kind == "op" and toks[j].text == "["
+               and toks[j + 1].kind == "op" and toks[j + 1].text == "]"):
+            j += 2
+        return j
+
+    def _scan_typeargs(self, j) -> Optional[int]:
+        toks = self.toks
+        j += 1
+        if j < len(toks) and toks[j].kind == "op" and toks[j].text == ">":
+            return j + 1
+        while j < len(toks):
+            t = toks[j]
+            if t.kind == "op" and t.text == "?":
+                j += 1
+                if j < len(toks) and toks[j].kind == "id" and toks[j].text in ("extends", "super"):
+                    j = self._scan_type(j + 1)
+            else:
+                j = self._scan_type(j)
+            if j is None or j >= len(toks):
+                return None
+            t = toks[j]
+            if t.kind == "op" and t.text == ",":
+                j += 1
+                continue
+            if t.kind == "op" and t.text == ">":
+                return j + 1
+            return None
+        return None
+
+    def _type_node(self, j_end) -> _Node:
+        start = self.toks[self.i].start
+        end = self.toks[j_end - 1].end
+        self.i = j_end
+        return _Node("type", start, end)
+
+    # ---------------- 语句 / 表达式 ----------------
+
+    def statement(self) -> _Node:
+        node = self.expr()
+        t = self._tok()
+        if t is not None and t.kind == "id" and _is_type_like(node):
+            name = t
+            self.i += 1
+            kids = [node]
+            end = name.end
+            if self._is("="):
+                self.i += 1
+                init = self.expr()
+                kids.append(init)
+                end = init.end
+            node = _Node("decl", node.start, end, kids)
+        if self._is(";"):
+            self.i += 1
+        if self.i != len(self.toks):
+            raise ParseError("表达式后有多余内容")
+        return node
+
+    def expr(self) -> _Node:
+        lhs = self.ternary()
+        t = self._tok()
+        if t is not None and t.kind == "op" and t.text in _ASSIGN_OPS:
+            self.i += 1
+            rhs = self.expr()
+            return _Node("assign", lhs.start, rhs.end, [lhs, rhs], t.text)
+        return lhs
+
+    def ternary(self) -> _Node:
+        cond = self.binary(3)
+        if not self._is("?"):
+            return cond
+        self.i += 1
+        then = self.expr()
+        self._expect(":")
+        other = self.lambda_or(self.ternary)
+        return _Node("ternary", cond.start, other.end, [cond, then, other])
+
+    def lambda_or(self, fn: Callable[[], _Node]) -> _Node:
+        lam = self._try_lambda()
+        return lam if lam is not None else fn()
+
+    def _binop(self):
+        t = self._tok()
+        if t is None:
+            return None, 0
+        if t.kind == "id":
+            return ("instanceof", 1) if t.text == "instanceof" else (None, 0)
+        if t.kind != "op":
+            return None, 0
+        if t.text == ">":
+            if self._is(">", 1) and self._adjacent(self.i + 1):
+                if self._is(">", 2) and self._adjacent(self.i + 2):
+                    return ">>>", 3
+                return ">>", 2
+        if t.text in _BIN_PREC:
+            return t.text, 1
+        return None, 0
+
+    def binary(self, min_prec) -> _Node:
+        # 显式栈代替对右操作数的递归：每帧是 (min_prec, left, chain, 等右操作数的运算符)
+        stack = []
+        left = self.unary()
+        chain = None
+        while True:
+            op, width = self._binop()
+            prec = _BIN_PREC[op] if op is not None else -1
+            if prec < min_prec:
+                if not stack:
+                    return left
+                right = left
+                min_prec, left, chain, pending = stack.pop()
+                left, chain = self._attach(left, chain, pending, right)
+                continue
+            op_tok = self.toks[self.i]
+            op_end = self.toks[self.i + width - 1].end
+            self.i += width
+            if op == "instanceof":
+                j = self._scan_type(self.i)
+                if j is None:
+                    raise ParseError("instanceof 后缺少类型")
+                right = self._type_node(j)
+                t = self._tok()
+                if t is not None and t.kind == "id":  # 模式匹配绑定变量
+                    right = _Node("type", right.start, t.end)
+                    self.i += 1
+                left, chain = self._attach(left, chain, (op, prec, op_tok, op_end), right)
+            else:
+                stack.append((min_prec, left, chain, (op, prec, op_tok, op_end)))
+                min_prec, left, chain = prec + 1, self.unary(), None
+
+    def _attach(self, left, chain, pending, right):
+        """把 right 接到 left 所在的同优先级链上，返回新的 (left, chain)。"""
+        op, prec, op_tok, op_end = pending
+        if chain is None or chain.data != prec:
+            chain = _Node("bin", left.start, left.end, [left], prec)
+            left = chain
+        if op in _LOGICAL:
+            src = self.src
+            pad_l = "" if op_tok.start > 0 and src[op_tok.start - 1].isspace() else " "
+            pad_r = "" if op_end < len(src) and src[op_end].isspace() else " "
+            chain.kids.append(_Node("tok", op_tok.start, op_end, data=pad_l + _LOGICAL[op] + pad_r))
+        chain.kids.append(right)
+        chain.end = right.end
+        return left, chain
+
+    def unary(self) -> _Node:
+        t = self._tok()
+        if t is None:
+            raise ParseError("表达式意外结束")
+        if t.kind != "op":
+            return self.postfix(self.primary())
+        # 前缀运算符与强制转换先收集再由内向外包装，连续的 !!x、(int)(long)x 不会加深递归
+        prefixes = []
+        while t.kind == "op":
+            if t.text in _PREFIX_OPS:
+                self.i += 1
+                prefixes.append(("unary", t.start, t.text))
+            elif t.text == "(":
+                cast = self._cast_prefix()
+                if cast is None:
+                    break
+                prefixes.append(cast)
+            else:
+                break
+            t = self._tok()
+            if t is None:
+                raise ParseError("表达式意外结束")
+        node = self.postfix(self.primary())
+        if not prefixes:
+            return node
+        for kind, start, data in reversed(prefixes):
+            if kind == "unary":
+                node = _Node("unary", start, node.end, [node], data)
+            else:
+                node = _Node("cast", start, node.end, [data, node])
+        return node
+
+    def _cast_prefix(self):
+        """当前 '(' 是强制转换时吃掉 "(Type)"，返回 ("cast", 起点, 类型节点)；否则返回 None。"""
+        lp = self.toks[self.i]
+        j = self._scan_type(self.i + 1)
+        if j is None or j != lp.match:
+            return None
+        nxt = self._tok(j + 1 - self.i)
+        if nxt is None:
+            return None
+        primitive = self.toks[self.i + 1].text in _PRIMITIVES and j == self.i + 2
+        if nxt.kind in ("num", "str", "chr"):
+            ok = True
+        elif nxt.kind == "id":
+            ok = nxt.text not in _NOT_OPERAND_IDS
+        elif nxt.text in ("(", "!", "~"):
+            ok = True
+        else:
+            ok = primitive and nxt.text in ("-", "+", "++", "--")
+        if not ok:
+            return None
+        self.i += 1
+        tnode = self._type_node(j)
+        self.i += 1  # ')'
+        return "cast", lp.start, tnode
+
+    def _try_lambda(self) -> Optional[_Node]:
+        t = self._tok()
+        if t is None:
+            return None
+        if t.kind == "id" and self._is("->", 1):
+            params = _Node("type", t.start, t.end)
+            self.i += 2
+        elif t.kind == "op" and t.text == "(" and t.match + 1 < len(self.toks) \
+                and self.toks[t.match + 1].kind == "op" and self.toks[t.match + 1].text == "->":
+            params = _Node("type", t.start, self.toks[t.match].end)
+            self.i = t.match + 2
+        else:
+            return None
+        if self._is("{"):
+            body = self._raw_block()
+        else:
+            body = self.expr()
+        return _Node("lambda", params.start, body.end, [params, body])
+
+    def _raw_block(self) -> _Node:
+        lb = self.toks[self.i]
+        rb = self.toks[lb.match]
+        self.i = lb.match + 1
+        return _Node("raw", lb.start, rb.end)
+
+    def primary(self) -> _Node:
+        lam = self._try_lambda()
+        if lam is not None:
+            return lam
+        t = self._tok()
+        if t is None:
+            raise ParseError("表达式意外结束")
+        if t.kind in ("num", "str", "chr"):
+            self.i += 1
+            return _Node("lit", t.start, t.end)
+        if t.kind == "id":
+            if t.text == "new":
+                return self._new()
+            if t.text in ("switch", "class", "instanceof"):
+                raise ParseError(f"不支持的关键字: {t.text}")
+            self.i += 1
+            return _Node("atom", t.start, t.end, data=t.text)
+        if t.text == "(":
+            self.i += 1
+            inner = self.expr()
+            rp = self._expect(")")
+            return _Node("paren", t.start, rp.end, [inner])
+        if t.text == "{":
+            return self._raw_block()
+        raise ParseError(f"意外的符号: {t.text!r}")
+
+    def _new(self) -> _Node:
+        new_tok = self.toks[self.i]
+        self.i += 1
+        j = self._scan_type(self.i)
+        if j is None:
+            raise ParseError("new 后缺少类型")
+        # 数组维度由下面单独处理，类型扫描不要吞掉 "[]"
+        while j - 2 >= self.i and self.toks[j - 1].text == "]" and self.toks[j - 2].text == "[":
+            j -= 2
+        tnode = self._type_node(j)
+        if self._is("("):
+            args = self._args()
+            kids = [tnode, args]
+            end = args.end + 1
+            if self._is("{"):
+                body = self._raw_block()
+                kids.append(body)
+                end = body.end
+            return _Node("new", new_tok.start, end, kids)
+        if self._is("["):
+            kids = [tnode]
+            end = tnode.end
+            while self._is("["):
+                lb = self.toks[self.i]
+                self.i += 1
+                if self._is("]"):
+                    dim = _Node("args", lb.end, lb.end)
+                else:
+                    dim = self.expr()
+                rb = self._expect("]")
+                kids.append(_Node("dim", lb.start, rb.end, [dim]))
+                end = rb.end
+            if self._is("{"):
+                init = self._raw_block()
+                kids.append(init)
+                end = init.end
+            return _Node("newarr", new_tok.start, end, kids)
+        raise ParseError("new 表达式不完整")
+
+    def _args(self) -> _Node:
+        lp = self.toks[self.i]
+        rp = self.toks[lp.match]
+        self.i += 1
+        node = _Node("args", lp.end, rp.start)
+        while not self._is(")"):
+            node.kids.append(self.lambda_or(self.expr))
+            if self._is(","):
+                self.i += 1
+            elif not self._is(")"):
+                raise ParseError("参数列表格式错误")
+        self.i += 1
+        return node
+
+    def postfix(self, node: _Node) -> _Node:
+        while True:
+            t = self._tok()
+            if t is None or t.kind != "op":
+                return node
+            tx = t.text
+            if tx == ".":
+                self.i += 1
+                kids = [node]
+                if self._is("<"):
+                    j = self._scan_typeargs(self.i)
+                    if j is None:
+                        raise ParseError("显式泛型参数格式错误")
+                    start = self.toks[self.i].start
+                    self.i = j
+                    kids.append(_Node("tok", start, self.toks[j - 1].end, data=""))
+                name = self._tok()
+                if name is None or name.kind != "id":
+                    raise ParseError("成员访问缺少名称")
+                self.i += 1
+                if name.text == "this":
+                    kids.append(_Node("tok", name.start, name.end, data="self"))
+                if self._is("("):
+                    args = self._args()
+                    kids.append(args)
+                    node = _Node("mcall", node.start, args.end + 1, kids, name.text)
+                else:
+                    node = _Node("member", node.start, name.end, kids, name.text)
+            elif tx == "(":
+                args = self._args()
+                node = _Node("call", node.start, args.end + 1, [node, args])
+            elif tx == "[":
+                if self._is("]", 1):
+                    self.i += 2
+                    node = _Node("arrtype", node.start, t.end + 1, [node])
+                    continue
+                self.i += 1
+                inner = self.expr()
+                rb = self._expect("]")
+                node = _Node("index", node.start, rb.end, [node, inner])
+            elif tx in ("++", "--"):
+                self.i += 1
+                node = _Node("postfix", node.start, t.end, [node], tx)
+            elif tx == "::":
+                self.i += 1
+                name = self._tok()
+                if name is None or name.kind != "id":
+                    raise ParseError("方法引用缺少名称")
+                self.i += 1
+                node = _Node("mref", node.start, name.end, [node])
+            elif tx == "<" and self._adjacent(self.i) and _is_type_like(node):
+                j = self._scan_typeargs(self.i)
+                follower = self.toks[j] if j is not None and j < len(self.toks) else None
+                if j is None or not (
+                    follower is None or follower.kind == "id"
+                    or (follower.kind == "op" and follower.text in ("::", "["))
+                ):
+                    return node  # 不是泛型，按小于号处理
+                self.i = j
+                node = _Node("type", node.start, self.toks[j - 1].end)
+            else:
+                return node
+
+
+def _is_type_like(node: _Node) -> bool:
+    while node.kind in ("arrtype", "member"):
+        node = node.kids[0]
+    return node.kind in ("type", "atom")
+
+
+# ---------------- 生成 ----------------
+#
+# 每个生成结果带一个 Python 侧的结合力（越大越紧）。改写会改变结合力（x.contains(y) → y in x、
+# a ? b : c → b if a else c），所以结果作为更紧的父节点的操作数 / 接收者 / 分支时要补括号。
+
+_BP_LAMBDA, _BP_TERNARY, _BP_NOT, _BP_CMP, _BP_MUL, _BP_UNARY, _BP_ATOM = 0, 1, 4, 5, 11, 12, 14
+# Java 二元优先级（_BP_LAMBDA 之外的 _BIN_PREC 值）→ Python 结合力：== 与 < 同为比较；& ^ | 比比较更紧
+_PY_BP = {3: 2, 4: 3, 5: 6, 6: 7, 7: 8, 8: _BP_CMP, 9: _BP_CMP, 10: 9, 11: 10, 12: _BP_MUL}
+# 原样拼接时：节点自身的结合力、接收者（kids[0]）需要的结合力
+_SPLICE_BP = {
+    "member": (_BP_ATOM, _BP_ATOM), "mcall": (_BP_ATOM, _BP_ATOM), "call": (_BP_ATOM, _BP_ATOM),
+    "index": (_BP_ATOM, _BP_ATOM), "postfix": (_BP_ATOM, _BP_ATOM), "mref": (_BP_ATOM, _BP_ATOM),
+    "unary": (_BP_UNARY, _BP_UNARY), "assign": (_BP_LAMBDA, _BP_LAMBDA), "decl": (_BP_LAMBDA, _BP_LAMBDA),
+    "lambda": (_BP_LAMBDA, _BP_LAMBDA),
+}
+
+
+def _par(item, need: int) -> str:
+    text, bp = item
+    return f"({text.strip()})" if bp < need else text
+
+
+def _splice(node: _Node, texts: List[str], src: str) -> str:
+    out = []
+    pos = node.start
+    for kid, text in zip(node.kids, texts):
+        out.append(src[pos:kid.start])
+        out.append(text)
+        pos = kid.end
+    out.append(src[pos:node.end])
+    return "".join(out)
+
+
+def _emit_atom(node, kids, src, fallback):
+    name = node.data
+    if name == "null":
+        return "None", _BP_ATOM
+    if name == "this":
+        return "self", _BP_ATOM
+    low = name.lower()
+    if low == "true":
+        return "True", _BP_ATOM
+    if low == "false":
+        return "False", _BP_ATOM
+    return name, _BP_ATOM
+
+
+def _emit_unary(node, kids, src, fallback):
+    if node.data == "!":
+        return "not " + _par(kids[0], _BP_NOT).lstrip(), _BP_NOT
+    return None
+
+
+def _emit_bin(node, kids, src, fallback):
+    bp = _PY_BP[node.data]
+    # 比较会连写（a == b < c），同级也要括起来；其余链已压平，子节点本就更紧
+    return _splice(node, [_par(k, bp + 1) for k in kids], src), bp
+
+
+def _emit_cast(node, kids, src, fallback):
+    return _splice(node, [kids[0][0], _par(kids[1], _BP_UNARY)], src), _BP_UNARY
+
+
+def _emit_ternary(node, kids, src, fallback):
+    cond, then, other = kids
+    # then / cond 是 or_test，嵌套三目要括起来；else 分支右结合，可以直接接三目
+    return (f"{_par(then, _BP_TERNARY + 1).strip()} if {_par(cond, _BP_TERNARY + 1).strip()} "
+            f"else {_par(other, _BP_TERNARY).strip()}"), _BP_TERNARY
+
+
+def _lambda_parts(node: _Node, texts: List[str], src: str):
+    params = src[node.kids[0].start:node.kids[0].end].strip().strip("()")
+    return params, texts[1].strip()
+
+
+def _emit_mcall(node, kids, src, fallback):
+    name = node.data
+    recv = kids[0]
+    args_node = node.kids[-1]
+    args = kids[-1][0]
+    if name == "size" and args == "":
+        return f"len({recv[0]})", _BP_ATOM
+    if name == "isEmpty" and args == "":
+        return f"(not {_par(recv, _BP_NOT)})", _BP_ATOM
+    if name == "get":
+        return f"{_par(recv, _BP_ATOM)}[{args}]", _BP_ATOM
+    if name == "contains":
+        if len(args_node.kids) == 1:
+            args = _par(kids[-1], _BP_CMP + 1)
+        return f"{args} in {_par(recv, _BP_CMP + 1)}", _BP_CMP
+    head = node.kids[0]
+    if head.kind == "atom":
+        if name == "of" and head.data == "List":
+            return f"[{args}]", _BP_ATOM
+        if name == "comparingInt" and head.data == "Comparator" and len(args_node.kids) == 1 \
+                and args_node.kids[0].kind == "lambda":
+            lam = args_node.kids[0]
+            var, body = _lambda_parts(lam, [emit(k, src, fallback) for k in lam.kids], src)
+            if var and body:
+                return f"lambda {var}: {body}", _BP_LAMBDA
+    return None
+
+
+def _emit_new(node, kids, src, fallback):
+    cls = kids[0][0]
+    for java_name in ("ArrayList", "PriorityQueue"):
+        if cls.endswith(java_name):
+            cls = cls[:-len(java_name)] + "list"
+            break
+    args = kids[1][0]
+    if cls.endswith("list") and args.strip().startswith("lambda "):
+        args = ""
+    out = f"{cls}({args})"
+    if len(node.kids) > 2:
+        body = node.kids[2]
+        out += src[node.kids[1].end + 1:body.start] + kids[2][0]
+    return out, _BP_ATOM
+
+
+def _emit_newarr(node, kids, src, fallback):
+    dims = [k for k in node.kids if k.kind == "dim"]
+    init = node.kids[-1] if node.kids[-1].kind == "raw" else None
+    if init is not None and all(not d.kids[0].kids and d.kids[0].kind == "args" for d in dims):
+        inner = src[init.start + 1:init.end - 1]
+        return f"[{fallback(inner).strip()}]", _BP_ATOM
+    first = dims[0]
+    rest = _splice(_Node("rest", first.end, node.end, node.kids[2:]), [k[0] for k in kids[2:]], src)
+    text, bp = kids[1]
+    inner = _par((text[1:-1], bp), _BP_MUL + 1).strip()
+    return f"[None] * {inner}{rest}", _BP_MUL
+
+
+def _emit_wrapped(node, kids, src, fallback):
+    # 参数列表 / 数组维度：文本原样拼接，结合力取唯一的那个子表达式（多个参数时不参与比较）
+    return _splice(node, [k[0] for k in kids], src), kids[0][1] if len(kids) == 1 else _BP_ATOM
+
+
+_EMITTERS = {
+    "args": _emit_wrapped,
+    "dim": _emit_wrapped,
+    "atom": _emit_atom,
+    "unary": _emit_unary,
+    "bin": _emit_bin,
+    "cast": _emit_cast,
+    "ternary": _emit_ternary,
+    "mcall": _emit_mcall,
+    "new": _emit_new,
+    "newarr": _emit_newarr,
+}
+
+
+_LEAF_KINDS = frozenset(("lit", "tok", "type", "raw"))
+
+
+def _emit_leaf(node: _Node, src: str, fallback: Callable[[str], str]):
+    kind = node.kind
+    if kind == "lit":
+        return src[node.start:node.end], _BP_ATOM
+    if kind == "tok":
+        return node.data, _BP_ATOM
+    if kind == "type":
+        return strip_generics(src[node.start:node.end]), _BP_ATOM
+    return fallback(src[node.start:node.end]), _BP_ATOM
+
+
+def _emit_node(node: _Node, kids, src: str, fallback: Callable[[str], str]):
+    fn = _EMITTERS.get(node.kind)
+    if fn is not None:
+        out = fn(node, kids, src, fallback)
+        if out is not None:
+            return out
+    bp, need = _SPLICE_BP.get(node.kind, (_BP_ATOM, _BP_LAMBDA))
+    texts = [k[0] for k in kids]
+    if texts and need > _BP_LAMBDA:
+        texts[0] = _par(kids[0], need)
+    return _splice(node, texts, src), bp
+
+
+def _emit(node: _Node, src: str, fallback: Callable[[str], str]):
+    """生成 (文本, 结合力)。后序遍历用显式栈：长调用链是左深树，递归会随链长加深。"""
+    if node.kind in _LEAF_KINDS:
+        return _emit_leaf(node, src, fallback)
+    stack = [(node, [])]  # (节点, 已生成的子节点结果)
+    while True:
+        node, done = stack[-1]
+        kids = node.kids
+        while len(done) < len(kids):
+            kid = kids[len(done)]
+            if kid.kind not in _LEAF_KINDS:
+                stack.append((kid, []))
+                break
+            done.append(_emit_leaf(kid, src, fallback))
+        else:
+            stack.pop()
+            out = _emit_node(node, done, src, fallback)
+            if not stack:
+                return out
+            stack[-1][1].append(out)
+
+
+def emit(node: _Node, src: str, fallback: Callable[[str], str]) -> str:
+    return _emit(node, src, fallback)[0]
+
+
+def parse(src: str) -> _Node:
+    return _Parser(src, tokenize(src)).statement()
+
+
+@rule("exprparse.rewrite", lambda args, out: out is not None)
+def rewrite(src: str, fallback: Callable[[str], str]) -> Optional[str]:
+    """
+    把一条 Java 表达式（或 "Type var = expr" 声明）改写成 Python 形式。
+    无法解析时返回 None；无法解析的子片段（如 lambda 语句块）交给 fallback。
+    """
+    try:
+        tree = parse(src)
+        return emit(tree, src, fallback)
+    except (ParseError, RecursionError):  # 只有括号/实参嵌套上百层才会递归过深
+        return None
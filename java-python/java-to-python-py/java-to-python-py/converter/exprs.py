@@ -1,6 +1,12 @@
 import re
+from functools import lru_cache
+from time import perf_counter
 from typing import List, Optional, Tuple
 from converter.util import get_attr, split_args
+from converter.context import ConversionContext
+from converter.node import is_node
+from converter.mappings import map_method, map_static
+from converter.rulestats import call_rule, matched, recording, rule
 
 def _split_concat(expr: str) -> List[str]:
     parts = []
@@ -43,6 +49,7 @@ def _strip_generics(s: str) -> str:
             out.append(ch)
     return "".join(out)
 
+@rule("_strip_generics_from_types")
 def _strip_generics_from_types(s: str) -> str:
     if "<" not in s:
         return s
@@ -75,6 +82,7 @@ def _strip_generics_from_types(s: str) -> str:
         i += 1
     return "".join(out)
 
+@rule("_map_new_full")
 def _map_new_full(rhs: str) -> str:
     """把右侧形如 'new X<Y>(args)' 转成 'X(args)'，常见集合转 python 等价。"""
     s = rhs.strip().rstrip(";")
@@ -96,9 +104,11 @@ def _map_new_full(rhs: str) -> str:
     cls_simple = _strip_generics(cls)
     return f"{cls_simple}({args})"
 
+@rule("_map_this")
 def _map_this(s: str) -> str:
     return s.replace("this.", "self.")
 
+@rule("_map_instanceof")
 def _map_instanceof(s: str) -> str:
     m = re.match(r"^(.*)\s+instanceof\s+([A-Za-z0-9_.<>]+)\s*;?$", s)
     if m:
@@ -107,6 +117,7 @@ def _map_instanceof(s: str) -> str:
         return f"isinstance({expr}, {t})"
     return s
 
+@rule("_map_incdec")
 def _map_incdec(s: str) -> str:
     s_strip = s.strip().rstrip(";")
     m = re.match(r"^([A-Za-z_][A-Za-z0-9_.]*)\s*(\+\+|--)\s*$", s_strip)
@@ -116,12 +127,14 @@ def _map_incdec(s: str) -> str:
         return f"{var} += 1" if op == "++" else f"{var} -= 1"
     return s
 
+@rule("_map_logical_ops")
 def _map_logical_ops(s: str) -> str:
     out = s
     out = out.replace("&&", "and").replace("||", "or")
     out = re.sub(r"!\s*(?!=)", "not ", out)
     return out
 
+@rule("_map_ternary", matched)
 def _map_ternary(s: str) -> Optional[str]:
     if "?" not in s or ":" not in s:
         return None
@@ -129,6 +142,7 @@ def _map_ternary(s: str) -> Optional[str]:
     tpart, fpart = rest.split(":", 1)
     return f"{tpart.strip()} if {head.strip()} else {fpart.strip()}"
 
+@rule("_replace_get_calls")
 def _replace_get_calls(s: str) -> str:
     out = s
     idx = 0
@@ -155,6 +169,7 @@ def _replace_get_calls(s: str) -> str:
             break
     return out
 
+@rule("_replace_contains_calls")
 def _replace_contains_calls(s: str) -> str:
     out = s
     idx = 0
@@ -206,7 +221,17 @@ def _extract_call_args(s: str, marker: str) -> Optional[Tuple[str, int, int]]:
         i += 1
     return None
 
+@lru_cache(maxsize=8192)
+@rule("_rewrite_common_expr")
 def _rewrite_common_expr(s: str) -> str:
+    """单遍解析成 IR 后改写；解析不了的输入回退到正则管线。"""
+    from converter import exprparse  # 只在缓存未命中时执行，不放在导入路径上
+
+    out = exprparse.rewrite(s, _rewrite_common_expr_regex)
+    return out if out is not None else _rewrite_common_expr_regex(s)
+
+@rule("_rewrite_common_expr_regex")
+def _rewrite_common_expr_regex(s: str) -> str:
     out = s
     out = re.sub(r"\bnull\b", "None", out)
     out = re.sub(r"\btrue\b", "True", out, flags=re.IGNORECASE)
@@ -231,7 +256,7 @@ def _rewrite_common_expr(s: str) -> str:
             args, idx, end = extracted
             var, body = _parse_lambda(args.strip())
             if var and body:
-                body = _rewrite_common_expr(body)
+                body = _rewrite_common_expr_regex(body)
                 out = out[:idx] + f"lambda {var}: {body}" + out[end + 1:]
     if "list(" in out:
         extracted = _extract_call_args(out, "list(")
@@ -243,6 +268,7 @@ def _rewrite_common_expr(s: str) -> str:
     tern = _map_ternary(out)
     return tern if tern else out
 
+@rule("_map_method_chain_basic", matched)
 def _map_method_chain_basic(s: str, is_field_ref=None) -> Optional[str]:
     base, chain = _parse_method_chain(s)
     if not base or not chain:
@@ -279,34 +305,40 @@ def _map_method_chain_basic(s: str, is_field_ref=None) -> Optional[str]:
 def _is_class_like(name: str) -> bool:
     return bool(name) and name[0].isupper()
 
+_CHAIN_FIRST_RE = re.compile(r"\.[A-Za-z_][A-Za-z0-9_]*\s*\(")
+_CHAIN_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+@lru_cache(maxsize=4096)
 def _parse_method_chain(s: str):
-    first = re.search(r"\.[A-Za-z_][A-Za-z0-9_]*\s*\(", s)
+    """拆成 (base, ((name, args), ...))；同一字符串会被多处反复拆分，结果只读并缓存。"""
+    first = _CHAIN_FIRST_RE.search(s)
     if not first:
-        return None, []
+        return None, ()
     base = s[:first.start()].strip()
     if not base:
-        return None, []
+        return None, ()
     idx = first.start()
     chain = []
-    while idx < len(s):
+    n = len(s)
+    while idx < n:
         if s[idx] != ".":
             break
         idx += 1
-        m = re.match(r"[A-Za-z_][A-Za-z0-9_]*", s[idx:])
+        m = _CHAIN_NAME_RE.match(s, idx)
         if not m:
             break
         name = m.group(0)
-        idx += len(name)
-        while idx < len(s) and s[idx].isspace():
+        idx = m.end()
+        while idx < n and s[idx].isspace():
             idx += 1
-        if idx >= len(s) or s[idx] != "(":
+        if idx >= n or s[idx] != "(":
             break
         depth = 0
         arg_start = idx + 1
         idx += 1
         in_sq = in_dq = False
         escaped = False
-        while idx < len(s):
+        while idx < n:
             ch = s[idx]
             if ch == "\\" and not escaped:
                 escaped = True
@@ -325,12 +357,12 @@ def _parse_method_chain(s: str):
                     depth -= 1
             escaped = False
             idx += 1
-        if idx >= len(s) or s[idx] != ")":
+        if idx >= n or s[idx] != ")":
             break
         args = s[arg_start:idx]
         chain.append((name, args))
         idx += 1
-    return base, chain
+    return base, tuple(chain)
 
 def _parse_lambda(expr: str) -> Tuple[Optional[str], Optional[str]]:
     if "->" not in expr:
@@ -368,6 +400,7 @@ def _map_method_ref_to_lambda_body(owner: str, method: str, var: str) -> Optiona
         return f"len({var})"
     return None
 
+@rule("_map_stream_chain", matched)
 def _map_stream_chain(expr: str) -> Optional[str]:
     s = expr.strip().rstrip(";")
     if ".stream()" not in s:
@@ -484,55 +517,56 @@ def _map_stream_chain(expr: str) -> Optional[str]:
     return None
 
 class ExprConverter:
-    """表达式转换（加强：声明+赋值优先；println 自带 self.；getMessage() -> str(ex) 等）"""
+    """表达式转换（加强：声明+赋值优先；println 自带 self.；getMessage() -> str(ex) 等）
+
+    本身无状态：符号表/字段/导入等都读写调用方传入的 ConversionContext。
+    """
     def __init__(self, root=None):
         self.root = root
 
-    def _is_field(self, name: str) -> bool:
+    def _is_field(self, name: str, ctx) -> bool:
         if not name:
             return False
         try:
-            if self.root and self.root.is_local(name):
+            if ctx.is_local(name):
                 return False
         except Exception:
             pass
         try:
-            return name in getattr(self.root, "field_info", {}) or name in getattr(self.root, "field_names", set())
+            return name in ctx.field_info or name in ctx.field_names
         except Exception:
             return False
 
-    def _maybe_prefix_field(self, name: str) -> str:
-        if _is_simple_ident(name) and self._is_field(name):
+    def _maybe_prefix_field(self, name: str, ctx) -> str:
+        if _is_simple_ident(name) and self._is_field(name, ctx):
             return f"self.{name}"
         return name
 
-    def _track_required_imports(self, expr: str) -> None:
-        if not expr or not self.root:
+    def _track_required_imports(self, expr: str, ctx) -> None:
+        if not expr:
             return
         try:
             if "collections.deque" in expr:
-                self.root.required_imports.add("import collections")
+                ctx.required_imports.add("import collections")
             if "random." in expr:
-                self.root.required_imports.add("import random")
+                ctx.required_imports.add("import random")
             if "datetime." in expr:
-                self.root.required_imports.add("import datetime")
+                ctx.required_imports.add("import datetime")
             if "math." in expr:
-                self.root.required_imports.add("import math")
+                ctx.required_imports.add("import math")
             if "itertools." in expr:
-                self.root.required_imports.add("import itertools")
+                ctx.required_imports.add("import itertools")
         except Exception:
             pass
 
-    def _rewrite_expr(self, expr: str) -> str:
+    def _rewrite_expr(self, expr: str, ctx) -> str:
         out = _rewrite_common_expr(expr)
-        return self._qualify_nested_class_call(out)
+        return self._qualify_nested_class_call(out, ctx)
 
-    def _qualify_nested_class_call(self, expr: str) -> str:
-        if not self.root:
-            return expr
+    def _qualify_nested_class_call(self, expr: str, ctx) -> str:
         try:
-            class_stack = list(getattr(self.root, "class_stack", []))
-            nested_stack = list(getattr(self.root, "nested_class_stack", []))
+            class_stack = list(ctx.class_stack)
+            nested_stack = list(ctx.nested_class_stack)
         except Exception:
             return expr
         if not class_stack or not nested_stack:
@@ -552,7 +586,7 @@ class ExprConverter:
         return re.sub(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*\(", replace, expr)
 
     # --------- 工具：在 f-string 中把字段名补 self.，并把 getMessage() -> str(obj) ----------
-    def _normalize_nonliteral_expr(self, p: str) -> str:
+    def _normalize_nonliteral_expr(self, p: str, ctx) -> str:
         s = p.strip()
         # owner.getMessage() -> str(owner)
         s = re.sub(r"\b([A-Za-z_]\w*)\.getMessage\(\)", r"str(\1)", s)
@@ -560,12 +594,12 @@ class ExprConverter:
         try:
             # 仅对类字段加 self.，避免局部变量被误判
             if _is_simple_ident(s):
-                return self._maybe_prefix_field(s)
+                return self._maybe_prefix_field(s, ctx)
         except Exception:
             pass
         return s
 
-    def _fstring_from_concat(self, parts: List[str]) -> str:
+    def _fstring_from_concat(self, parts: List[str], ctx) -> str:
         out = []
         for p in parts:
             p = p.strip()
@@ -575,49 +609,50 @@ class ExprConverter:
             if m:
                 out.append(p)
             else:
-                expr = self._normalize_nonliteral_expr(p)
+                expr = self._normalize_nonliteral_expr(p, ctx)
                 out.append(f"str({expr})")
         return " + ".join(out) if out else '""'
 
-    def _print_from_inner(self, inner: str, newline: bool) -> str:
+    def _print_from_inner(self, inner: str, newline: bool, ctx) -> str:
         suffix = "" if newline else ", end=\"\""
         if "+" in inner:
             parts = _split_concat(inner)
-            fstr = self._fstring_from_concat(parts)
+            fstr = self._fstring_from_concat(parts, ctx)
             return f"print({fstr}{suffix})"
         return f"print({inner}{suffix})"
 
-    def _expr_from_child(self, node) -> str:
-        lines = self.convert(node)
+    def _expr_from_child(self, node, ctx) -> str:
+        lines = self.convert(node, ctx)
         return lines[0] if lines else ""
 
     # --------- 方法/静态调用 ----------
-    def _map_method_call(self, owner: str, method: str, argstr: str) -> str:
+    @call_rule("method_call")
+    def _map_method_call(self, owner: str, method: str, argstr: str, ctx) -> str:
         owner_py = owner.replace("this.", "self.")
         if _is_simple_ident(owner_py):
-            owner_py = self._maybe_prefix_field(owner_py)
+            owner_py = self._maybe_prefix_field(owner_py, ctx)
         owner_var = owner_py.split(".")[-1]
         args = split_args(argstr)
         pq_key = None
         try:
-            pq_key = self.root.pq_keys.get(owner_var)
+            pq_key = ctx.pq_keys.get(owner_var)
         except Exception:
             pq_key = None
         if pq_key and method in ("add", "offer") and len(args) >= 1:
             try:
-                self.root.required_imports.add("import heapq")
+                ctx.required_imports.add("import heapq")
             except Exception:
                 pass
-            item = self._rewrite_expr(args[0])
+            item = self._rewrite_expr(args[0], ctx)
             try:
-                for original, alias in getattr(self.root, "param_alias", {}).items():
+                for original, alias in ctx.param_alias.items():
                     item = re.sub(rf"\b{re.escape(original)}\b", alias, item)
             except Exception:
                 pass
             return f"heapq.heappush({owner_py}, ({pq_key}({item}), {item}))"
         if pq_key and method == "poll" and len(args) == 0:
             try:
-                self.root.required_imports.add("import heapq")
+                ctx.required_imports.add("import heapq")
             except Exception:
                 pass
             return f"heapq.heappop({owner_py})[1]"
@@ -626,7 +661,7 @@ class ExprConverter:
 
         owner_base = None
         try:
-            owner_base = self.root.symtab.get(owner_var)
+            owner_base = ctx.symtab.get(owner_var)
         except Exception:
             pass
 
@@ -647,7 +682,6 @@ class ExprConverter:
             else:
                 return f"{owner_py}.extend({args[0]})"
 
-        from converter.mappings import map_method
         if owner_base:
             mapped, _ = map_method(owner_base, method)
             if mapped:
@@ -679,13 +713,14 @@ class ExprConverter:
                     return f"len({owner_py})"
                 return f"{owner_py}.{mapped}({', '.join(args)})"
             try:
-                self.root.stats["unmapped_methods"][f"{owner_base}.{method}"] += 1
+                ctx.stats["unmapped_methods"][f"{owner_base}.{method}"] += 1
             except Exception:
                 pass
 
         return f"{owner_py}.{method}({argstr})"
 
-    def _map_static_call(self, cls: str, method: str, argstr: str) -> str:
+    @call_rule("static_call")
+    def _map_static_call(self, cls: str, method: str, argstr: str, ctx) -> str:
         args = split_args(argstr)
         if cls in ("Math", "java.lang.Math"):
             if method in ("max", "min", "abs") and len(args) >= 1:
@@ -694,7 +729,7 @@ class ExprConverter:
                 return f"pow({', '.join(args[:2])})"
             if method in ("sqrt", "ceil", "floor"):
                 try:
-                    self.root.required_imports.add("import math")
+                    ctx.required_imports.add("import math")
                 except Exception:
                     pass
                 return f"math.{method}({', '.join(args)})"
@@ -712,7 +747,7 @@ class ExprConverter:
                 return f"{args[0]}.reverse()"
             if method == "shuffle" and len(args) >= 1:
                 try:
-                    self.root.required_imports.add("import random")
+                    ctx.required_imports.add("import random")
                 except Exception:
                     pass
                 return f"random.shuffle({args[0]})"
@@ -728,13 +763,13 @@ class ExprConverter:
                 return f"{method}({', '.join(args)})"
             if method in ("sqrt", "ceil", "floor") and len(args) >= 1:
                 try:
-                    self.root.required_imports.add("import math")
+                    ctx.required_imports.add("import math")
                 except Exception:
                     pass
                 return f"math.{method}({', '.join(args)})"
             if method == "random":
                 try:
-                    self.root.required_imports.add("import random")
+                    ctx.required_imports.add("import random")
                 except Exception:
                     pass
                 return "random.random()"
@@ -744,73 +779,84 @@ class ExprConverter:
         if cls in ("UUID", "java.util.UUID"):
             if method == "randomUUID" and len(args) == 0:
                 try:
-                    self.root.required_imports.add("import uuid")
+                    ctx.required_imports.add("import uuid")
                 except Exception:
                     pass
                 return "uuid.uuid4()"
             if method == "fromString" and len(args) == 1:
                 try:
-                    self.root.required_imports.add("import uuid")
+                    ctx.required_imports.add("import uuid")
                 except Exception:
                     pass
                 return f"uuid.UUID('{args[0]}')"
         if cls in ("Instant", "java.time.Instant"):
             if method == "now" and len(args) == 0:
                 try:
-                    self.root.required_imports.add("import datetime")
+                    ctx.required_imports.add("import datetime")
                 except Exception:
                     pass
                 return "datetime.datetime.now()"
 
-        from converter.mappings import map_static
         templ, _ = map_static(cls, method)
         if templ:
             rendered = templ.replace("{args}", ", ".join(args))
-            self._track_required_imports(rendered)
+            self._track_required_imports(rendered, ctx)
             return rendered
         return f"{cls}.{method}({argstr})"
 
     # --------- 主入口 ----------
-    def convert(self, node) -> List[str]:
-        if not node or not isinstance(node, dict):
+    def convert(self, node, ctx: ConversionContext) -> List[str]:
+        if not node or not is_node(node):
             return []
+        stats = ctx.rules
+        if stats is None:
+            return self._convert(node, ctx)[1]
+        # --rule-stats：整次转换的耗时记到最终生效的那条规则上；期间模块级规则函数也记到 ctx.rules
+        with recording(stats):
+            start = perf_counter()
+            label, lines = self._convert(node, ctx)
+            stats.record(f"convert:{label}", label != "fallback", perf_counter() - start)
+        return lines
+
+    def _convert(self, node, ctx) -> Tuple[str, List[str]]:
+        """按规则顺序转换，返回 (命中的规则名, 行)；规则名供 rulestats 统计。"""
         s = (node.get("name") or node.get("value") or get_attr(node, "expr") or get_attr(node, "code") or "").strip()
         t = node.get("type", "")
 
         if "\n" in s:
-            return [f"# {ln}" if ln.strip() else "#" for ln in s.splitlines()]
+            return "multiline_comment", [f"# {ln}" if ln.strip() else "#" for ln in s.splitlines()]
 
         if re.match(r"^-?\d+(\.\d+)?$", s):
-            return [s]
+            return "numeric", [s]
 
         raw_s = s
         pq_call = re.match(r"^([A-Za-z_][A-Za-z0-9_]*)\.(add|offer|poll|peek)\((.*)\)\s*;?$", s)
         if pq_call:
             owner, method, argstr = pq_call.group(1), pq_call.group(2), pq_call.group(3)
             try:
-                if owner in getattr(self.root, "pq_keys", {}):
-                    return [self._map_method_call(owner, method, argstr)]
+                if owner in ctx.pq_keys:
+                    return "pq_call", [self._map_method_call(owner, method, argstr, ctx)]
             except Exception:
                 pass
 
         base, _ = _parse_method_chain(s)
-        if base and _is_simple_ident(base) and self._is_field(base):
+        if base and _is_simple_ident(base) and self._is_field(base, ctx):
             s = re.sub(rf"^{re.escape(base)}\b", f"self.{base}", s)
 
         chain_mapped = _map_method_chain_basic(s)
         if chain_mapped:
             try:
-                for original, alias in getattr(self.root, "param_alias", {}).items():
+                for original, alias in ctx.param_alias.items():
                     chain_mapped = re.sub(rf"\b{re.escape(original)}\b", alias, chain_mapped)
             except Exception:
                 pass
-            chain_mapped = self._qualify_nested_class_call(chain_mapped)
-            return [chain_mapped]
+            chain_mapped = self._qualify_nested_class_call(chain_mapped, ctx)
+            return "chain_basic", [chain_mapped]
 
         s = _rewrite_common_expr(s)
-        s = self._qualify_nested_class_call(s)
+        s = self._qualify_nested_class_call(s, ctx)
         try:
-            for original, alias in getattr(self.root, "param_alias", {}).items():
+            for original, alias in ctx.param_alias.items():
                 s = re.sub(rf"\b{re.escape(original)}\b", alias, s)
         except Exception:
             pass
@@ -820,22 +866,22 @@ class ExprConverter:
             if t == "BinaryExpr":
                 chs = node.get("children", []) or []
                 if len(chs) >= 2:
-                    left = self._expr_from_child(chs[0])
-                    right = self._expr_from_child(chs[1])
+                    left = self._expr_from_child(chs[0], ctx)
+                    right = self._expr_from_child(chs[1], ctx)
                     if left and right:
-                        return [f"{left} + {right}"]
+                        return "empty_binary", [f"{left} + {right}"]
             code = get_attr(node, "code")
             if isinstance(code, str) and code.strip():
-                return [code.strip()]
-            return []
+                return "empty_code", [code.strip()]
+            return "empty", []
         if t in ("NameExpr", "SimpleName"):
             rewritten = _rewrite_common_expr(s)
-            return [self._maybe_prefix_field(rewritten)] if rewritten else []
+            return "name_expr", [self._maybe_prefix_field(rewritten, ctx)] if rewritten else []
         if _is_simple_ident(s):
             rewritten = _rewrite_common_expr(s)
-            return [self._maybe_prefix_field(rewritten)]
+            return "ident", [self._maybe_prefix_field(rewritten, ctx)]
         if t == "ThisExpr":
-            return ["self"]
+            return "this", ["self"]
         if t == "FieldAccessExpr":
             owner = None
             for ch in node.get("children", []) or []:
@@ -848,30 +894,30 @@ class ExprConverter:
                     break
             if owner and node.get("name"):
                 if _is_simple_ident(owner):
-                    owner = self._maybe_prefix_field(owner)
-                return [f"{owner}.{node['name']}"]
-            return [node.get("name", "")] if node.get("name") else []
+                    owner = self._maybe_prefix_field(owner, ctx)
+                return "field_access", [f"{owner}.{node['name']}"]
+            return "field_access_name", [node.get("name", "")] if node.get("name") else []
 
         # 1) println/print（自带 self. / getMessage() 修复）
         if s.startswith("System.out.println"):
             i1, i2 = s.find("("), s.rfind(")")
             inner = s[i1+1:i2] if (i1 != -1 and i2 != -1 and i2 > i1) else ""
-            return [self._print_from_inner(inner, newline=True)]
+            return "println", [self._print_from_inner(inner, newline=True, ctx=ctx)]
         if s.startswith("System.out.print"):
             i1, i2 = s.find("("), s.rfind(")")
             inner = s[i1+1:i2] if (i1 != -1 and i2 != -1 and i2 > i1) else ""
-            return [self._print_from_inner(inner, newline=False)]
+            return "print", [self._print_from_inner(inner, newline=False, ctx=ctx)]
 
         # 1.5) stream 链式调用（map/filter/collect）
         stream_mapped = _map_stream_chain(s)
         if stream_mapped:
-            self._track_required_imports(stream_mapped)
-            return [stream_mapped]
+            self._track_required_imports(stream_mapped, ctx)
+            return "stream_chain", [stream_mapped]
 
-        chain_mapped = _map_method_chain_basic(s, self.root.is_field_ref)
+        chain_mapped = _map_method_chain_basic(s, ctx.is_field_ref)
         if chain_mapped:
-            chain_mapped = self._qualify_nested_class_call(chain_mapped)
-            return [chain_mapped]
+            chain_mapped = self._qualify_nested_class_call(chain_mapped, ctx)
+            return "chain_basic_field", [chain_mapped]
 
         # 2) 变量声明赋值优先：Type var = rhs;
         mdecl = re.match(r"^([A-Za-z0-9_<>.\[\]]+)\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.+)\s*;?$", s)
@@ -881,13 +927,12 @@ class ExprConverter:
             base = jtype.split(".")[-1]
             if "<" in base: base = base.split("<",1)[0]
             try:
-                if hasattr(self.root, "symtab"):
-                    self.root.symtab[var] = base
-                self.root.add_local(var)
+                ctx.symtab[var] = base
+                ctx.add_local(var)
             except Exception:
                 pass
             try:
-                self.root.add_local(var)
+                ctx.add_local(var)
             except Exception:
                 pass
             # 右值：new -> Python 等价；字段名 -> self.<field>
@@ -903,18 +948,18 @@ class ExprConverter:
                     lvar, body = _parse_lambda(args.strip())
                     if lvar and body:
                         key_name = f"{var}_key"
-                        self.root.pq_keys[var] = key_name
+                        ctx.pq_keys[var] = key_name
                         try:
-                            self.root.required_imports.add("import heapq")
+                            ctx.required_imports.add("import heapq")
                         except Exception:
                             pass
                         body = _rewrite_common_expr(body)
-                        return [f"{key_name} = lambda {lvar}: {body}", f"{var} = []"]
+                        return "pq_comparator_decl", [f"{key_name} = lambda {lvar}: {body}", f"{var} = []"]
             rhs_conv = _map_new_full(rhs) if rhs.strip().startswith("new ") else rhs.strip()
-            self._track_required_imports(rhs_conv)
+            self._track_required_imports(rhs_conv, ctx)
             if _is_simple_ident(rhs_conv):
-                rhs_conv = self._maybe_prefix_field(rhs_conv)
-            return [f"{var} = {rhs_conv}"]
+                rhs_conv = self._maybe_prefix_field(rhs_conv, ctx)
+            return "decl", [f"{var} = {rhs_conv}"]
 
         # 3) 赋值 + new（剩余情况）
         if " = new " in s or s.startswith("new "):
@@ -922,11 +967,11 @@ class ExprConverter:
             if " = new " in s:
                 left, _, rhs = s.partition("=")
                 rhs_conv = _map_new_full(rhs)
-                self._track_required_imports(rhs_conv)
-                return [f"{left.strip()} = {rhs_conv}"]
+                self._track_required_imports(rhs_conv, ctx)
+                return "assign_new", [f"{left.strip()} = {rhs_conv}"]
             rhs_conv = _map_new_full(s)
-            self._track_required_imports(rhs_conv)
-            return [rhs_conv]
+            self._track_required_imports(rhs_conv, ctx)
+            return "new", [rhs_conv]
 
         # 4) this. -> self.
         if "this." in s:
@@ -934,59 +979,59 @@ class ExprConverter:
 
         # 5) instanceof
         if " instanceof " in s:
-            return [_map_instanceof(s)]
+            return "instanceof", [_map_instanceof(s)]
 
         # 6) ++ / --
         incdec = _map_incdec(s)
         if incdec != s:
-            return [incdec]
+            return "incdec", [incdec]
 
         # 7) obj.method(args) / Class.static(args)
         m = re.match(r"^([A-Za-z_][A-Za-z0-9_\.]*)\.(\w+)\((.*)\)\s*;?$", s)
         if m:
             owner, method, argstr = m.group(1), m.group(2), m.group(3)
-            if _is_class_like(owner) and (owner.split(".")[-1] not in getattr(self.root, "symtab", {})):
-                return [self._map_static_call(owner, method, argstr)]
-            return [self._map_method_call(owner, method, argstr)]
+            if _is_class_like(owner) and (owner.split(".")[-1] not in ctx.symtab):
+                return "static_call", [self._map_static_call(owner, method, argstr, ctx)]
+            return "method_call", [self._map_method_call(owner, method, argstr, ctx)]
 
         # 8) 裸字符串拼接 -> print(f"...")
         if "+" in s and "System.out." not in s and "(" not in s:
             parts = _split_concat(s)
             if len(parts) > 1:
-                fstr = self._fstring_from_concat(parts)
-                return [f"print({fstr})"]
+                fstr = self._fstring_from_concat(parts, ctx)
+                return "concat_print", [f"print({fstr})"]
 
         # 9) 赋值优先处理 RHS
         if "=" in s and "==" not in s and "!=" not in s:
             left, right = s.split("=", 1)
             rhs = right.strip().rstrip(";")
-            rhs = self._rewrite_expr(rhs)
+            rhs = self._rewrite_expr(rhs, ctx)
             try:
-                for original, alias in getattr(self.root, "param_alias", {}).items():
+                for original, alias in ctx.param_alias.items():
                     rhs = re.sub(rf"\b{re.escape(original)}\b", alias, rhs)
             except Exception:
                 pass
             if left.strip().startswith("self.") and _is_simple_ident(left.strip()[5:]):
                 field_name = left.strip()[5:]
                 try:
-                    self.root.field_names.add(field_name)
-                    self.root.field_info.setdefault(field_name, {"visibility": "unknown"})
+                    ctx.field_names.add(field_name)
+                    ctx.field_info.setdefault(field_name, {"visibility": "unknown"})
                 except Exception:
                     pass
             m = re.match(r"^([A-Za-z_][A-Za-z0-9_\.]*)\.(\w+)\((.*)\)\s*$", rhs)
             if m:
                 owner, method, argstr = m.group(1), m.group(2), m.group(3)
-                rhs = self._map_method_call(owner, method, argstr)
-            return [f"{left.strip()} = {rhs}"]
+                rhs = self._map_method_call(owner, method, argstr, ctx)
+            return "assign", [f"{left.strip()} = {rhs}"]
         # 10) 普通调用/条件/索引原样
         if s.endswith(")"):
-            return [s.rstrip(";")]
+            return "passthrough_call", [s.rstrip(";")]
         if "[" in s or "]" in s:
-            return [s.rstrip(";")]
+            return "passthrough_index", [s.rstrip(";")]
         if re.search(r"\b(and|or|not)\b|[<>!=]=|[<>]", s):
-            return [s.rstrip(";")]
+            return "passthrough_cond", [s.rstrip(";")]
         if "=" in s:
-            return [s.rstrip(";")]
+            return "passthrough_assign", [s.rstrip(";")]
 
         # 10) 兜底
-        return [f"# expr: {s}"]
+        return "fallback", [f"# expr: {s}"]
@@ -1,5 +1,5 @@
 # converter/fields.py
-from typing import List, Tuple, Optional
+from typing import List
 from converter.mappings import map_type                 # ✅ 正确：从 mappings 导入
 from converter.util import children, get_attr, has_modifier, short_base_type, get_modifiers
 
@@ -8,21 +8,20 @@ class FieldConverter:
     处理 FieldDeclaration：
       - static 字段 -> 直接类变量赋值
       - 非 static 字段 -> 累积；若类内无构造器，最后合成 __init__
-      - 同时更新 root.symtab 用于后续表达式映射（list.add / map.put 等）
+      - 同时更新 ctx.symtab 用于后续表达式映射（list.add / map.put 等）
+    待合成的字段与“类内是否有构造器”记录在 ctx 上（pending_fields / class_has_ctor）。
     """
     def __init__(self, root):
         self.root = root
-        self._pending: List[Tuple[str, Optional[str], Optional[str]]] = []
-        self._class_has_ctor: bool = False
 
-    def reset_for_class(self):
-        self._pending.clear()
-        self._class_has_ctor = False
+    def reset_for_class(self, ctx):
+        ctx.pending_fields = []
+        ctx.class_has_ctor = False
 
-    def mark_has_ctor(self):
-        self._class_has_ctor = True
+    def mark_has_ctor(self, ctx):
+        ctx.class_has_ctor = True
 
-    def convert(self, node) -> List[str]:
+    def convert(self, node, ctx) -> List[str]:
         out: List[str] = []
         is_static = has_modifier(node, "static")
         modifiers = set(get_modifiers(node))
@@ -42,7 +41,7 @@ class FieldConverter:
             if is_static:
                 out.append(f"{name} = None  # static field")
             else:
-                self._pending.append((name or "field", map_type(field_type) if field_type else None, None))
+                ctx.pending_fields.append((name or "field", map_type(field_type) if field_type else None, None))
             return out
 
         for v in vars:
@@ -55,7 +54,7 @@ class FieldConverter:
             try:
                 base = short_base_type(vtype)
                 if base:
-                    self.root.symtab[vname] = base
+                    ctx.symtab[vname] = base
             except Exception:
                 pass
 
@@ -68,18 +67,18 @@ class FieldConverter:
                     out.append(f"{vname} = {init}")
             else:
                 try:
-                    self.root.field_names.add(vname)
-                    self.root.field_info[vname] = {"visibility": visibility}
+                    ctx.field_names.add(vname)
+                    ctx.field_info[vname] = {"visibility": visibility}
                 except Exception:
                     pass
-                self._pending.append((vname, py_t, init))
+                ctx.pending_fields.append((vname, py_t, init))
         return out
 
-    def emit_init_if_needed(self) -> List[str]:
-        if self._class_has_ctor or not self._pending:
+    def emit_init_if_needed(self, ctx) -> List[str]:
+        if ctx.class_has_ctor or not ctx.pending_fields:
             return []
         lines = ["def __init__(self):"]
-        for (name, _py_t, init) in self._pending:
+        for (name, _py_t, init) in ctx.pending_fields:
             rhs = init if init is not None else "None"
             lines.append(f"    self.{name} = {rhs}")
         return lines
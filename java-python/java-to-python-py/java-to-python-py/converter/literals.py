@@ -2,7 +2,7 @@ from typing import List
 
 class LiteralConverter:
     """Convert literal-like nodes to python literal strings."""
-    def convert(self, node) -> List[str]:
+    def convert(self, node, ctx=None) -> List[str]:
         val = node.get("name")
         if val is None:
             return ["None"]
@@ -1,3 +1,5 @@
+import json
+import os
 from typing import Dict, Optional, Tuple, Any
 
 API_MAP: Dict[str, Dict[str, Any]] = {
@@ -281,74 +283,167 @@ def map_type(java_type: Optional[str]) -> Optional[str]:
         return basic[jt]
     return jt
 
+# 任何类都适用的通用方法映射（map_method 的兜底）
+COMMON_METHODS: Dict[str, str] = {
+    "add": "append",
+    "addAll": "extend",
+    "remove": "remove",
+    "get": "__getitem__",
+    "put": "update_put",
+    "containsAll": "contains_all",
+    "size": "len",
+    "isEmpty": "not",
+    "contains": "__contains__",
+    "iterator": "iter",
+    "forEach": "for_each",
+    "println": "print",
+    "toString": "str",
+    "equals": "==",
+    "hashCode": "hash",
+    "length": "len"
+}
+
+# API_MAP 里没有的静态调用模板（map_static 的兜底），{args} 处填实参
+STATIC_FALLBACK: Dict[Tuple[str, str], str] = {
+    ("Collections", "sort"): "sorted({args})",
+    ("Collections", "reverse"): "list(reversed({args}))",
+    ("Arrays", "asList"): "list({args})",
+}
+
+ADDITIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mappings_additions.json")
+
+
+def load_additions(path=ADDITIONS_PATH) -> Dict[str, Dict[str, Any]]:
+    """mappings_additions.json：FQN（类或 类.方法）-> {py, category, notes}。读不到时为空。"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {k: v for k, v in data.items() if isinstance(v, dict)}
+    except Exception:
+        return {}
+
+
+class MappingIndex:
+    """
+    API_MAP 与 mappings_additions.json 预编译成的查找表，导入时建一次，调用路径上每次查找都是一次 dict 命中：
+      - by_fqn：FQN -> API_MAP 条目（同一 FQN 取 API_MAP 里第一个）；by_short：短类名 -> 条目
+      - methods：(短类名, 方法) -> (映射, 说明)，实例方法优先于 static
+      - statics_by_short / statics_by_fqn：(短类名 | FQN, 方法) -> (模板, 说明)
+      - owners：方法名 -> {短类名: 映射}（find_methods_by_name）
+      - hints：additions 的 FQN -> 条目。additions 里的 py 是给人看的写法提示（如 "list(src)[:new_len]"），
+        不是可直接套用的模板，所以只供查询，不参与代码生成，API_MAP 里的映射始终优先
+      - nodes：映射表.xlsx 的节点类型（小写）-> {java, python, notes, ...}（见 bundle.parse_node_table）
+    """
+
+    def __init__(self, api_map: Dict[str, Dict[str, Any]], additions: Optional[Dict[str, Dict[str, Any]]] = None,
+                 nodes: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.by_short = api_map
+        self.by_fqn: Dict[str, Dict[str, Any]] = {}
+        self.fqn_by_short: Dict[str, Optional[str]] = {}
+        self.methods: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.statics_by_short: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.statics_by_fqn: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.owners: Dict[str, Dict[str, str]] = {}
+        for short, entry in api_map.items():
+            fqn = entry.get("fqn")
+            self.fqn_by_short[short] = fqn
+            if fqn:
+                self.by_fqn.setdefault(fqn, entry)
+            methods = entry.get("methods", {})
+            static = entry.get("static", {})
+            for m, py in static.items():
+                self.methods[(short, m)] = (py, f"mapped static {short}.{m}")
+                self.statics_by_short[(short, m)] = (py, f"static {short}.{m}")
+                if fqn:
+                    self.statics_by_fqn.setdefault((fqn, m), (py, f"static {fqn}.{m}"))
+            for m, py in methods.items():
+                self.methods[(short, m)] = (py, f"mapped {short}.{m}")
+                self.owners.setdefault(m, {})[short] = py
+        self.common = {m: (py, "fallback") for m, py in COMMON_METHODS.items()}
+        self.static_fallback = {k: (v, "fallback") for k, v in STATIC_FALLBACK.items()}
+        self.hints: Dict[str, Dict[str, Any]] = dict(additions or {})
+        self.nodes: Dict[str, Dict[str, Any]] = dict(nodes or {})
+
+
+_index: Optional[MappingIndex] = None
+_NONE = (None, None)
+
+
+def get_index() -> MappingIndex:
+    """
+    首次查找时才加载索引：优先读 bundle.py 编译好的映射包（run_converter.py build-mappings），
+    包不存在或任一来源改过时现场编译并写回（见 bundle.load_or_build）。
+    """
+    global _index
+    if _index is None:
+        from converter.bundle import load_or_build
+
+        _index = load_or_build()["index"]
+    return _index
+
+
+def __getattr__(name):
+    # INDEX 保留为模块属性，按需加载
+    if name == "INDEX":
+        return get_index()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def rebuild_index(additions: Optional[Dict[str, Dict[str, Any]]] = None) -> MappingIndex:
+    """修改 API_MAP 后重建索引（默认重新读取 mappings_additions.json；节点映射沿用当前索引）。"""
+    global _index
+    nodes = get_index().nodes
+    _index = MappingIndex(API_MAP, load_additions() if additions is None else additions, nodes)
+    return _index
+
+
 def map_fqn(shortname: str) -> Optional[str]:
-    entry = API_MAP.get(shortname)
-    if entry:
-        return entry.get("fqn")
-    return None
+    return (_index or get_index()).fqn_by_short.get(shortname)
+
+
+def entry_for_fqn(fqn: str) -> Optional[Dict[str, Any]]:
+    return (_index or get_index()).by_fqn.get(fqn)
+
+
+def mapping_hint(fqn: str) -> Optional[Dict[str, Any]]:
+    """mappings_additions.json 里 FQN（类或 类.方法）的写法提示 {py, category, notes}。"""
+    return (_index or get_index()).hints.get(fqn)
+
+
+def node_mapping(java_type: str) -> Optional[Dict[str, Any]]:
+    """映射表.xlsx 里 JavaParser 节点类型（不区分大小写）对应的 Python ast 节点 {java, python, notes, ...}。"""
+    return (_index or get_index()).nodes.get((java_type or "").lower())
+
+
+def python_node(java_type: str) -> Optional[str]:
+    entry = node_mapping(java_type)
+    return entry["python"] if entry else None
+
 
 def map_method(owner: Optional[str], method: str):
     m = method or ""
+    index = _index or get_index()
     if owner:
-        own = owner.split(".")[-1] if "." in owner else owner
-        if own in API_MAP:
-            methods = API_MAP[own].get("methods", {})
-            if m in methods:
-                return methods[m], f"mapped {own}.{m}"
-            static = API_MAP[own].get("static", {})
-            if m in static:
-                return static[m], f"mapped static {own}.{m}"
-    common_map = {
-        "add": "append",
-        "addAll": "extend",
-        "remove": "remove",
-        "get": "__getitem__",
-        "put": "update_put",
-        "containsAll": "contains_all",
-        "size": "len",
-        "isEmpty": "not",
-        "contains": "__contains__",
-        "iterator": "iter",
-        "forEach": "for_each",
-        "println": "print",
-        "toString": "str",
-        "equals": "==",
-        "hashCode": "hash",
-        "length": "len"
-    }
-    if m in common_map:
-        return common_map[m], "fallback"
-    return None, None
+        own = owner.rpartition(".")[2]
+        hit = index.methods.get((own, m))
+        if hit is not None:
+            return hit
+    return index.common.get(m, _NONE)
+
 
 def map_static(fqcn: str, method: str):
     if not fqcn:
-        return None, None
-    short = fqcn.split(".")[-1]
-    entry = API_MAP.get(short)
-    if entry:
-        static = entry.get("static", {})
-        if method in static:
-            return static[method], f"static {short}.{method}"
-    for key, val in API_MAP.items():
-        if val.get("fqn") == fqcn and "static" in val:
-            if method in val["static"]:
-                return val["static"][method], f"static {fqcn}.{method}"
-    fallback = {
-        ("Collections", "sort"): "sorted({args})",
-        ("Collections", "reverse"): "list(reversed({args}))",
-        ("Arrays", "asList"): "list({args})",
-    }
-    if (short, method) in fallback:
-        return fallback[(short, method)], "fallback"
-    return None, None
+        return _NONE
+    index = _index or get_index()
+    short = fqcn.rpartition(".")[2]
+    hit = index.statics_by_short.get((short, method)) or index.statics_by_fqn.get((fqcn, method))
+    if hit is not None:
+        return hit
+    return index.static_fallback.get((short, method), _NONE)
+
 
 def find_methods_by_name(method_name: str) -> Dict[str, str]:
-    results = {}
-    for cls, info in API_MAP.items():
-        methods = info.get("methods", {})
-        if method_name in methods:
-            results[cls] = methods[method_name]
-    return results
+    return dict((_index or get_index()).owners.get(method_name, {}))
 
 def summarize_api_map() -> str:
     class_count = len(API_MAP)
@@ -356,6 +451,7 @@ def summarize_api_map() -> str:
     return f"API_MAP classes: {class_count}, total method/static mappings: {method_count}"
 
 __all__ = [
-    "API_MAP", "TYPE_ALIASES", "map_type", "map_method", "map_static",
-    "map_fqn", "find_methods_by_name", "summarize_api_map"
+    "API_MAP", "TYPE_ALIASES", "INDEX", "MappingIndex", "map_type", "map_method", "map_static",
+    "map_fqn", "entry_for_fqn", "mapping_hint", "node_mapping", "python_node", "find_methods_by_name", "get_index",
+    "rebuild_index", "summarize_api_map"
 ]
@@ -0,0 +1,127 @@
+import contextlib
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+_KB = 1024
+
+# 统计分配位置时排除的帧（tracemalloc 与本模块自身、导入机制）
+_SITE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, contextlib.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryTracker:
+    """
+    基于 tracemalloc 的内存记录（--memory）：
+      - phase(name)：阶段内的峰值、相对进入时的峰值增量、阶段结束后的净增（retained）
+      - file(name)：同上，按 File 节点记录
+      - 每个阶段结束时记下占用最多的分配位置（Top N，按行号聚合）
+    峰值用 tracemalloc.reset_peak() 逐段重置，嵌套的段会把峰值并回外层。只统计 Python 堆上的分配。
+    """
+
+    def __init__(self, frames: int = 1, top: int = 10):
+        self.top = top
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.files: List[Dict[str, Any]] = []
+        self.sites: Dict[str, List[Dict[str, Any]]] = {}
+        self._stack: List[int] = []  # 各嵌套层目前为止的峰值
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(frames)
+
+    def _measure(self, name: str, body):
+        # 可嵌套（文件嵌在 convert 阶段里）：reset_peak 前把已有峰值记到外层，退出时再并回外层
+        before, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1] = max(self._stack[-1], peak)
+        tracemalloc.reset_peak()
+        self._stack.append(before)
+        try:
+            yield
+        finally:
+            after, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._stack.pop())
+            if self._stack:
+                self._stack[-1] = max(self._stack[-1], peak)
+            body({
+                "name": name,
+                "peak_kb": peak / _KB,
+                "peak_delta_kb": (peak - before) / _KB,
+                "retained_kb": (after - before) / _KB,
+            })
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        def done(row):
+            self.phases[name] = {k: v for k, v in row.items() if k != "name"}
+            self.sites[name] = self.top_sites()
+        yield from self._measure(name, done)
+
+    @contextlib.contextmanager
+    def file(self, name: str):
+        yield from self._measure(name, self.files.append)
+
+    def add_file(self, row: Optional[Dict[str, Any]]):
+        # 进程池 worker 测得的单文件结果
+        if row:
+            self.files.append(row)
+
+    def top_sites(self) -> List[Dict[str, Any]]:
+        if not self.top:
+            return []
+        stats = tracemalloc.take_snapshot().filter_traces(_SITE_FILTERS).statistics("lineno")
+        return [
+            {"site": f"{st.traceback[0].filename}:{st.traceback[0].lineno}", "size_kb": st.size / _KB,
+             "count": st.count}
+            for st in stats[:self.top]
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        files = sorted(self.files, key=lambda r: -r["peak_delta_kb"])
+        return {"phases": self.phases, "files": files, "top_sites": self.sites}
+
+    def close(self):
+        if self._started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started = False
+
+
+def measure_file(name: str, fn, *args):
+    """进程池 worker 用：在 tracemalloc 下执行 fn(*args)，返回 (结果, 该文件的内存记录)。"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    res = fn(*args)
+    after, peak = tracemalloc.get_traced_memory()
+    return res, {
+        "name": name,
+        "peak_kb": peak / _KB,
+        "peak_delta_kb": (peak - before) / _KB,
+        "retained_kb": (after - before) / _KB,
+    }
+
+
+def format_memory(data: Dict[str, Any], top_files: int = 5) -> List[str]:
+    lines = ["阶段:  峰值KB  峰值增量KB  净增KB"]
+    for name, r in data.get("phases", {}).items():
+        lines.append(f"  {name}: {r['peak_kb']:.0f}  {r['peak_delta_kb']:.0f}  {r['retained_kb']:.0f}")
+    files = data.get("files") or []
+    if files:
+        lines.append(f"文件(按峰值增量 Top{top_files}):")
+        for r in files[:top_files]:
+            lines.append(f"  {r['name']}: {r['peak_kb']:.0f}  {r['peak_delta_kb']:.0f}  {r['retained_kb']:.0f}")
+    phases = data.get("phases", {})
+    if phases:
+        worst = max(phases, key=lambda k: phases[k]["peak_kb"])
+        sites = (data.get("top_sites") or {}).get(worst) or []
+        if sites:
+            lines.append(f"分配位置({worst} 结束时, Top{len(sites)}):")
+            for st in sites:
+                lines.append(f"  {st['site']}: {st['size_kb']:.0f} KB / {st['count']}")
+    return lines
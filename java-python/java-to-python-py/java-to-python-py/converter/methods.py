@@ -1,6 +1,7 @@
 import keyword
 from typing import List
 from converter.util import children, get_modifiers, collect_doc
+from converter.emitter import BLANK_EMPTY, BLANK_PAD, Line, indent, line_text
 
 _IGNORE_IN_BODY = {
     "Parameter", "Modifier", "SimpleName", "VoidType", "PrimitiveType",
@@ -15,17 +16,17 @@ class MethodConverter:
     def _is_static(self, node):
         return "static" in get_modifiers(node)
 
-    def _collect_parameters(self, node):
+    def _collect_parameters(self, node, ctx):
         names = [p.get("name") for p in children(node) if p.get("type") == "Parameter"]
-        return [self._sanitize_param(n) for n in names if n]
+        return [self._sanitize_param(n, ctx) for n in names if n]
 
-    def _sanitize_param(self, name: str) -> str:
+    def _sanitize_param(self, name: str, ctx) -> str:
         if not name:
             return name
         if keyword.iskeyword(name):
             alias = f"{name}_"
             try:
-                self.root.param_alias[name] = alias
+                ctx.param_alias[name] = alias
             except Exception:
                 pass
             return alias
@@ -41,15 +42,15 @@ class MethodConverter:
         safe = doc.replace('"""', '\\"""')
         return ['"""' + safe + '"""']
 
-    def _uses_self(self, body: List[str]) -> bool:
-        return any("self." in ln for ln in body if ln)
+    def _uses_self(self, body: List[Line]) -> bool:
+        return any("self." in line_text(ln) for ln in body if ln)
 
-    def _toggle_doc_comment_suppression(self, enabled: bool):
+    def _toggle_doc_comment_suppression(self, ctx, enabled: bool):
         try:
             if enabled:
-                self.root.doc_comment_suppression += 1
+                ctx.doc_comment_suppression += 1
             else:
-                self.root.doc_comment_suppression = max(0, self.root.doc_comment_suppression - 1)
+                ctx.doc_comment_suppression = max(0, ctx.doc_comment_suppression - 1)
         except Exception:
             pass
 
@@ -65,30 +66,30 @@ class MethodConverter:
     def _method_condition(self, params, all_params):
         return self._ctor_condition(params, all_params)
 
-    def convert_overloads(self, nodes) -> List[str]:
+    def convert_overloads(self, nodes, ctx) -> List[Line]:
         if not nodes:
             return []
         if len(nodes) == 1:
-            return self.convert(nodes[0])
+            return self.convert(nodes[0], ctx)
 
         name = nodes[0].get("name", "<method>")
         static = self._is_static(nodes[0])
         all_params = []
         overload_infos = []
         for mnode in nodes:
-            params = self._collect_parameters(mnode)
+            params = self._collect_parameters(mnode, ctx)
             for p in params:
                 if p not in all_params:
                     all_params.append(p)
             body = []
             try:
-                self.root.push_scope(params)
+                ctx.push_scope(params)
             except Exception:
                 pass
             for ch in self._collect_body_children(mnode):
-                body.extend(self.root.convert_node(ch))
+                body.extend(self.root.convert_node(ch, ctx))
             try:
-                self.root.pop_scope()
+                ctx.pop_scope()
             except Exception:
                 pass
             overload_infos.append((params, body))
@@ -104,14 +105,14 @@ class MethodConverter:
             head = []
         lines = head + [sig]
         doc_lines = self._maybe_doc(nodes[0])
-        lines.extend(["    " + l for l in doc_lines])
+        lines.extend(indent(doc_lines))
 
         if static and name == "main" and all_params:
             guard_var = all_params[0]
-            lines.append(f"    if {guard_var} is None:")
-            lines.append(f"        {guard_var} = []")
+            lines.append((1, f"if {guard_var} is None:"))
+            lines.append((2, f"{guard_var} = []"))
 
-        self._toggle_doc_comment_suppression(bool(doc_lines))
+        self._toggle_doc_comment_suppression(ctx, bool(doc_lines))
         for idx, (params, body) in enumerate(overload_infos):
             cond = self._method_condition(params, all_params)
             if idx == 0:
@@ -120,34 +121,33 @@ class MethodConverter:
                 branch = "else:"
             else:
                 branch = f"elif {cond}:" if cond else "else:"
-            lines.append("    " + branch)
-            body = body or ["pass"]
-            lines.extend(["        " + l if l.strip() else "        " for l in body])
-        self._toggle_doc_comment_suppression(False)
+            lines.append((1, branch))
+            lines.extend(indent(body or ["pass"], 2, BLANK_PAD))
+        self._toggle_doc_comment_suppression(ctx, False)
         return lines
 
-    def convert_constructors(self, nodes) -> List[str]:
+    def convert_constructors(self, nodes, ctx) -> List[Line]:
         if not nodes:
             return []
         if len(nodes) == 1:
-            return self.convert(nodes[0])
+            return self.convert(nodes[0], ctx)
 
         all_params = []
         ctor_infos = []
         for ct in nodes:
-            params = self._collect_parameters(ct)
+            params = self._collect_parameters(ct, ctx)
             for p in params:
                 if p not in all_params:
                     all_params.append(p)
             body = []
             try:
-                self.root.push_scope(params)
+                ctx.push_scope(params)
             except Exception:
                 pass
             for ch in self._collect_body_children(ct):
-                body.extend(self.root.convert_node(ch))
+                body.extend(self.root.convert_node(ch, ctx))
             try:
-                self.root.pop_scope()
+                ctx.pop_scope()
             except Exception:
                 pass
             ctor_infos.append((params, body))
@@ -155,7 +155,7 @@ class MethodConverter:
         sig_params = [f"{p}=None" for p in all_params]
         sig = f"def __init__(self{', ' + ', '.join(sig_params) if sig_params else ''}):"
         lines = [sig]
-        lines.extend(["    " + l for l in self._maybe_doc(nodes[0])])
+        lines.extend(indent(self._maybe_doc(nodes[0])))
 
         for idx, (params, body) in enumerate(ctor_infos):
             cond = self._ctor_condition(params, all_params)
@@ -165,48 +165,47 @@ class MethodConverter:
                 branch = "else:"
             else:
                 branch = f"elif {cond}:" if cond else "else:"
-            lines.append("    " + branch)
-            body = body or ["pass"]
-            lines.extend(["        " + l if l.strip() else "        " for l in body])
+            lines.append((1, branch))
+            lines.extend(indent(body or ["pass"], 2, BLANK_PAD))
 
         try:
-            self.root.field_conv.mark_has_ctor()
+            self.root.field_conv.mark_has_ctor(ctx)
         except Exception:
             pass
         return lines
 
-    def convert(self, node) -> List[str]:
+    def convert(self, node, ctx) -> List[Line]:
         t = node.get("type", "")
         name = node.get("name", "<method>")
 
         if t in ("Constructor", "ConstructorDeclaration"):
-            params = self._collect_parameters(node)
+            params = self._collect_parameters(node, ctx)
             sig = f"def __init__(self{', ' + ', '.join(params) if params else ''}):"
             body = []
             doc_lines = self._maybe_doc(node)
             body.extend(doc_lines)
             try:
-                self.root.push_scope(params)
+                ctx.push_scope(params)
             except Exception:
                 pass
             for ch in self._collect_body_children(node):
-                body.extend(self.root.convert_node(ch))
+                body.extend(self.root.convert_node(ch, ctx))
             try:
-                self.root.pop_scope()
+                ctx.pop_scope()
             except Exception:
                 pass
-            self._toggle_doc_comment_suppression(bool(doc_lines))
-            body = ["    " + l if l.strip() else "" for l in (body or ["pass"])]
-            self._toggle_doc_comment_suppression(False)
+            self._toggle_doc_comment_suppression(ctx, bool(doc_lines))
+            body = indent(body or ["pass"], 1, BLANK_EMPTY)
+            self._toggle_doc_comment_suppression(ctx, False)
             try:
-                self.root.field_conv.mark_has_ctor()
+                self.root.field_conv.mark_has_ctor(ctx)
             except Exception:
                 pass
             return [sig] + body
 
         if t in ("Method", "MethodDeclaration", "Function"):
             static = self._is_static(node)
-            params = self._collect_parameters(node)
+            params = self._collect_parameters(node, ctx)
             head = []
             if static:
                 head.append("@staticmethod")
@@ -223,18 +222,18 @@ class MethodConverter:
             if static and name == "main" and params:
                 guard_var = params[0]
                 body.append(f"if {guard_var} is None:")
-                body.append(f"    {guard_var} = []")
+                body.append((1, f"{guard_var} = []"))
             try:
-                self.root.push_scope(params)
+                ctx.push_scope(params)
             except Exception:
                 pass
             for ch in self._collect_body_children(node):
-                body.extend(self.root.convert_node(ch))
+                body.extend(self.root.convert_node(ch, ctx))
             try:
-                self.root.pop_scope()
+                ctx.pop_scope()
             except Exception:
                 pass
-            self._toggle_doc_comment_suppression(bool(doc_lines))
+            self._toggle_doc_comment_suppression(ctx, bool(doc_lines))
             if static and self._uses_self(body):
                 static = False
             if static:
@@ -243,8 +242,8 @@ class MethodConverter:
             else:
                 head = []
                 sig = f"def {name}(self{', ' + ', '.join(params) if params else ''}):"
-            body = ["    " + l if l.strip() else "" for l in (body or ["pass"])]
-            self._toggle_doc_comment_suppression(False)
+            body = indent(body or ["pass"], 1, BLANK_EMPTY)
+            self._toggle_doc_comment_suppression(ctx, False)
             return head + [sig] + body
 
         return [f"# method: unhandled {t}"]
@@ -0,0 +1,241 @@
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Main.java 导出的节点字段与加载时剪枝留下的类型计数（prune.PRUNED_KEY）；不在其中的键放进 extra
+FIELDS = ("type", "name", "value", "line", "column", "endLine", "endColumn", "attrs", "children", "prunedTypes")
+_FIELD_SET = frozenset(FIELDS)
+_SCALAR_FIELDS = ("type", "name", "value", "line", "column", "endLine", "endColumn")
+
+_EMPTY: Tuple = ()  # 所有叶子共用同一个空 children
+_MISSING = object()  # util.get_attr 查 lookup 用的哨兵
+_INTERN_MAX = 64  # 超过此长度的字符串（代码片段、Javadoc）不驻留
+_intern = sys.intern
+
+
+class NodeBase:
+    """
+    节点的 dict 兼容只读接口（get / [] / in / items / to_dict）。
+    子类提供 get() 以及 FIELDS 与 extra 同名属性（缺失为 None）：Node 用 __slots__，snapshot.NodeView 从 mmap 读。
+    """
+
+    __slots__ = ()
+
+    def get(self, key: str, default=None):
+        raise NotImplementedError
+
+    def __getitem__(self, key: str):
+        v = self.get(key)
+        if v is None:
+            raise KeyError(key)
+        return v
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for k in FIELDS:
+            v = getattr(self, k)
+            if v is not None:
+                yield k, v
+        if self.extra:
+            yield from self.extra.items()
+
+    def nested(self) -> List[Any]:
+        """children 以外可能含有节点的值（attrs、extra 与非标量字段），供覆盖率统计遍历。"""
+        out = []
+        for k in _SCALAR_FIELDS:
+            v = getattr(self, k)
+            if v is not None and v.__class__ is not str and v.__class__ is not int:
+                out.append(v)
+        if self.attrs:
+            out.append(self.attrs)
+        if self.extra:
+            out.append(self.extra)
+        return out
+
+    def keys(self) -> Iterator[str]:
+        return (k for k, _ in self.items())
+
+    __iter__ = keys
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.items())
+
+    def __bool__(self) -> bool:
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """还原成普通 dict（子节点递归还原），用于 JSON 输出与规范化哈希。"""
+        out = {}
+        for k, v in self.items():
+            if k == "children":
+                v = [to_plain(ch) for ch in v]
+            out[k] = v
+        return out
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.type!r}, {self.name!r}, children={len(self.children or ())})"
+
+
+class Node(NodeBase):
+    """
+    紧凑的 AST 节点：__slots__ 存固定字段，type / name 与较短的 attrs 字符串驻留（sys.intern），
+    叶子共用空 children。提供与 dict 一致的只读接口（get / [] / in / items），处理器不用区分两种形式。
+    缺失字段存为 None（导出的 AST 不含显式 null）。
+    lookup 是构造时合并好的 get_attr 查找表（attrs 优先、顶层多余键兜底；只有一方时直接共用那个 dict），
+    不属于节点内容：不参与 items / to_dict / 序列化。
+    """
+
+    __slots__ = FIELDS + ("extra", "lookup")
+
+    def __init__(self, type=None, name=None, value=None, line=None, column=None, endLine=None, endColumn=None,
+                 attrs=None, children=None, prunedTypes=None, extra=None):
+        self.type = type
+        self.name = name
+        self.value = value
+        self.line = line
+        self.column = column
+        self.endLine = endLine
+        self.endColumn = endColumn
+        self.attrs = attrs
+        self.children = children
+        self.prunedTypes = prunedTypes
+        self.extra = extra
+        self._merge_lookup()
+
+    def _merge_lookup(self):
+        attrs, extra = self.attrs, self.extra
+        if extra:
+            self.lookup = {**extra, **attrs} if attrs else extra
+        else:
+            self.lookup = attrs
+
+    def get(self, key: str, default=None):
+        if key in _FIELD_SET:
+            v = getattr(self, key)
+            return default if v is None else v
+        extra = self.extra
+        return extra.get(key, default) if extra else default
+
+    def __setitem__(self, key: str, value):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+            if key != "attrs":
+                return
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+        self._merge_lookup()
+
+    def __reduce__(self):
+        # 按位置参数序列化：比默认的 slots 状态字典小，进程池传子树更省（lookup 由构造函数重建）
+        return Node, tuple(getattr(self, k) for k in _INIT_ARGS)
+
+
+_INIT_ARGS = FIELDS + ("extra",)
+
+
+def is_node(obj) -> bool:
+    return isinstance(obj, (dict, NodeBase))
+
+
+def to_plain(obj):
+    """Node / NodeView → dict；其余原样返回。也可作为 json.dumps 的 default。"""
+    if isinstance(obj, NodeBase):
+        return obj.to_dict()
+    return obj
+
+
+def _build(d: Dict[str, Any]) -> Node:
+    # 含 FIELDS 以外键的节点：逐键放入，多余的进 extra
+    n = Node()
+    extra = None
+    for k, v in d.items():
+        if k in _FIELD_SET:
+            setattr(n, k, v)
+        else:
+            if extra is None:
+                extra = {}
+            extra[k] = v
+    n.extra = extra
+    n._merge_lookup()
+    return n
+
+
+def node_hook(d: Dict[str, Any]):
+    """
+    json object_hook：带 type 且含非字符串值（行号、children）的对象构造成 Node。
+    attrs 的值全是字符串（Parameter 的 attrs 里也有 type 键），保持 dict，只驻留短字符串。
+    """
+    if "type" in d and (d.get("line") is not None or d.get("children").__class__ is list
+                        or not all(v.__class__ is str for v in d.values())):
+        try:
+            n = _build(d) if "extra" in d else Node(**d)
+        except TypeError:
+            n = _build(d)
+        n.type = _intern(n.type) if n.type.__class__ is str else n.type
+        name = n.name
+        if name.__class__ is str and len(name) <= _INTERN_MAX:
+            n.name = _intern(name)
+        kids = n.children
+        if kids == []:
+            n.children = _EMPTY
+        elif kids:
+            # 只有字符串字段的子节点（如 lambda 参数的 UnknownType）进 hook 时无法与 attrs 区分，在父节点这里补建
+            for i, ch in enumerate(kids):
+                if ch.__class__ is dict:
+                    kids[i] = _build(ch)
+        return n
+    return {_intern(k): (_intern(v) if v.__class__ is str and len(v) <= _INTERN_MAX else v) for k, v in d.items()}
+
+
+def object_hook(compact: bool = True, pruned: bool = True):
+    """
+    按加载选项选择 json object_hook（ProjectStreamReader 等也用它）。
+    pruned=True 时附带加载时剪枝（prune.PRUNE_SPEC）：子节点在父节点之前构造，剪枝自底向上完成。
+    """
+    if not pruned:
+        return node_hook if compact else None
+    from converter.prune import has_rule, prune  # 只在加载时剪枝用到，不放在导入路径上
+
+    if not compact:
+        def pruning_dict_hook(d: Dict[str, Any]):
+            if "type" in d and d.get("children"):
+                prune(d)
+            return d
+        return pruning_dict_hook
+
+    def pruning_node_hook(d: Dict[str, Any]):
+        n = node_hook(d)
+        if n.__class__ is Node and n.children and has_rule(n.type):
+            prune(n)
+            if not n.children:
+                n.children = _EMPTY
+        return n
+    return pruning_node_hook
+
+
+def loads_ast(text, compact: bool = True, pruned: bool = True):
+    return json.loads(text, object_hook=object_hook(compact, pruned))
+
+
+def load_ast(fp, compact: bool = True, pruned: bool = True):
+    """
+    从文件对象读取 AST：compact=True 时构造 Node 树，否则为普通 dict；
+    pruned=True 时按 prune.PRUNE_SPEC 剪掉处理器不读取的子树（类型计数保留在父节点上）。
+    """
+    return json.load(fp, object_hook=object_hook(compact, pruned))
+
+
+# 二进制快照（snapshot.py）的文件头：判断输入格式只读 8 个字节，不为此导入 snapshot（mmap / struct / array）
+SNAPSHOT_MAGIC = b"J2PAST\0\0"
+
+
+def is_snapshot(path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+    except Exception:
+        return False
@@ -0,0 +1,91 @@
+import collections
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+EXECUTORS = ("process", "thread")
+
+_worker_conv = None
+
+
+def convert_file(node: Dict, coverage: bool = True, profile: bool = False, rules: bool = False,
+                 memory: bool = False) -> Dict[str, Any]:
+    """
+    在工作进程里转换单个 File 子树，返回可合并的结果：
+      {lines, stats(_snapshot_stats 格式), required_imports, ast_type_counts}
+    每个进程复用一个只读 Converter，每个文件使用独立的 ConversionContext。
+    """
+    global _worker_conv
+    if _worker_conv is None:
+        from converter.converter import Converter
+        _worker_conv = Converter(None)
+    if memory:
+        from converter.memory import measure_file
+        res, res_memory = measure_file(node.get("name") or node.get("type", ""), _worker_conv.convert_isolated,
+                                       node, coverage, profile, rules)
+        res["memory"] = res_memory
+    else:
+        res = _worker_conv.convert_isolated(node, coverage, profile, rules)
+    return res
+
+
+def convert_files_parallel(
+    nodes: Iterable[Dict],
+    jobs: int,
+    window: Optional[int] = None,
+    executor: str = "process",
+    conv=None,
+    cache=None,
+    coverage: bool = True,
+    profile: bool = False,
+    rules: bool = False,
+    memory: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    并行转换 File 子树，按输入顺序产出结果。
+      - executor="process"：进程池，子树经 pickle 发给工作进程
+      - executor="thread"：线程池，所有线程共享同一个只读 Converter（conv），
+        适合 free-threaded CPython
+    同时在途的任务数不超过 window（默认 jobs * 2），配合流式读取时内存仍然有界。
+    给定 cache（ConversionCache）时，命中的文件不再提交，未命中的结果回写缓存。
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"未知的 executor: {executor}")
+    window = max(1, window or jobs * 2)
+    if executor == "thread":
+        if conv is None:
+            from converter.converter import Converter
+            conv = Converter(None)
+        pool = ThreadPoolExecutor(max_workers=jobs)
+        # tracemalloc 是进程级的，并发线程的分配无法归到单个文件，线程模式只记阶段
+        fn = lambda node, coverage, profile, rules, memory: conv.convert_isolated(node, coverage, profile, rules)
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        fn = convert_file
+
+    def finish(item):
+        key, fut = item
+        res = fut.result()
+        if key is not None:
+            cache.put(key, res)
+        return res
+
+    with pool as ex:
+        pending = collections.deque()
+        for node in nodes:
+            key = None
+            hit = None
+            if cache is not None:
+                key = cache.key_for(node)
+                hit = cache.get(key)
+            if hit is not None:
+                fut = Future()
+                fut.set_result(hit)
+                key = None
+            else:
+                fut = ex.submit(fn, node, coverage, profile, rules, memory)
+            pending.append((key, fut))
+            node = None
+            if len(pending) >= window:
+                yield finish(pending.popleft())
+        while pending:
+            yield finish(pending.popleft())
@@ -10,29 +10,6 @@ def _remove_adjacent_duplicate_lines(lines: List[str]) -> List[str]:
         out.append(ln); prev = s
     return out
 
-def _extract_method_block(lines: List[str], start_idx: int):
-    def is_deco(i): return i >= 0 and re.match(r"^\s{4}@", lines[i]) is not None
-    deco_start = start_idx
-    while is_deco(deco_start - 1):
-        deco_start -= 1
-
-    def_line = lines[start_idx]
-    m = re.match(r"^(\s*)def\s+\w+\s*\(.*\)\s*:", def_line)
-    if not m:
-        return start_idx, [], start_idx
-    base_indent = len(m.group(1))
-    block = lines[deco_start:start_idx+1]
-    i = start_idx + 1
-    while i < len(lines):
-        ln = lines[i]
-        if ln.strip() == "":
-            block.append(ln); i += 1; continue
-        indent = len(ln) - len(ln.lstrip(' '))
-        if indent <= base_indent - 1:
-            break
-        block.append(ln); i += 1
-    return i - 1, block, deco_start
-
 def _unindent_block(block: List[str], remove_spaces: int) -> List[str]:
     out = []
     for ln in block:
@@ -43,45 +20,103 @@ def _unindent_block(block: List[str], remove_spaces: int) -> List[str]:
         out.append(ln[cut:])
     return out
 
-def model_patch_code(code: str) -> str:
-    lines = code.splitlines(keepends=True)
-    i = 0
-    new_lines = []
-    extracted_main = None
+_MAIN_DEF_RE = re.compile(r"^\s{4}def\s+main\s*\(")
+_DECO_RE = re.compile(r"^\s{4}@")
+_DEF_SIG_RE = re.compile(r"^(\s*)def\s+\w+\s*\(.*\)\s*:")
+_GUARD = "if __name__ == \"__main__\""
 
-    while i < len(lines):
-        ln = lines[i]
-        if re.match(r"^\s{4}def\s+main\s*\(", ln) or (
-            re.match(r"^\s{4}@", ln) and i+1 < len(lines) and re.match(r"^\s{4}def\s+main\s*\(", lines[i+1])
-        ):
-            def_idx = i if re.match(r"^\s{4}def\s+main", ln) else i+1
-            end_idx, block, block_start = _extract_method_block(lines, def_idx)
-            block = _remove_adjacent_duplicate_lines(block)
-            unindented = _unindent_block(block, 4)
 
-            # 去掉装饰器（如 @staticmethod）
-            unindented = [l for l in unindented if not l.lstrip().startswith("@")]
+class MainPatcher:
+    """
+    model_patch_code 的流式版本：逐行 feed()，处理结果经 write 回调写出。
+      - 类内的 main（含装饰器）整块提取，改成模块级函数放到文件末尾
+      - 相邻重复行去重
+      - 末尾补 __main__ 守卫
+    只在内存里保留当前 main 块与文件末尾的空白行，其余行即时写出。
+    main 的签名行无法识别时抛 ValueError（与整体处理时的失败行为一致）。
+    """
 
-            # 签名改造
-            sig = unindented[0]
-            sig_new = re.sub(r"def\s+main\s*\(\s*self\s*,?", "def main(", sig)
-            sig_new = re.sub(r"def\s+main\s*\(\s*\)", "def main(args=None)", sig_new)
-            unindented[0] = sig_new
+    def __init__(self, write):
+        self._write = write
+        self._prev = None
+        self._held: List[str] = []  # 最后一个非空行及其后的空白行（收尾时可能要 rstrip）
+        self._deco = None
+        self._block = None
+        self._main = None
+        self._has_guard = False
 
-            body = "".join(unindented).replace("self.", "instance.")
-            extracted_main = body
-            i = end_idx + 1
-            continue
+    def feed(self, ln: str):
+        if self._block is not None:
+            if ln.strip() == "" or len(ln) - len(ln.lstrip(" ")) >= 4:
+                self._block.append(ln)
+                return
+            self._close_block()
+        if self._deco is not None:
+            deco, self._deco = self._deco, None
+            if _MAIN_DEF_RE.match(ln):
+                self._block = [deco, ln]
+                return
+            self._emit(deco)
+        if _MAIN_DEF_RE.match(ln):
+            self._block = [ln]
+        elif _DECO_RE.match(ln):
+            self._deco = ln
         else:
-            new_lines.append(ln); i += 1
+            self._emit(ln)
 
-    out = "".join(new_lines)
-    out_lines = _remove_adjacent_duplicate_lines(out.splitlines(keepends=True))
-    out = "".join(out_lines)
+    def close(self):
+        if self._deco is not None:
+            self._emit(self._deco)
+            self._deco = None
+        if self._block is not None:
+            self._close_block()
+        held = "".join(self._held)
+        if self._main:
+            self._write(held.rstrip() + "\n\n" + self._main.rstrip() + "\n\nif __name__ == \"__main__\":\n    main()\n")
+        elif not self._has_guard:
+            self._write(held.rstrip() + "\n\nif __name__ == \"__main__\":\n    pass\n")
+        else:
+            self._write(held)
+        self._held = []
 
-    if extracted_main:
-        out = out.rstrip() + "\n\n" + extracted_main.rstrip() + "\n\nif __name__ == \"__main__\":\n    main()\n"
-    else:
-        if "if __name__ == \"__main__\"" not in out:
-            out = out.rstrip() + "\n\nif __name__ == \"__main__\":\n    pass\n"
-    return out
+    def _emit(self, ln: str):
+        s = ln.rstrip("\n")
+        if self._prev is not None and s == self._prev:
+            return
+        self._prev = s
+        if _GUARD in ln:
+            self._has_guard = True
+        if ln.strip() == "":
+            self._held.append(ln)
+            return
+        if self._held:
+            self._write("".join(self._held))
+        self._held = [ln]
+
+    def _close_block(self):
+        block, self._block = self._block, None
+        def_line = block[1] if _DECO_RE.match(block[0]) and len(block) > 1 else block[0]
+        if not _DEF_SIG_RE.match(def_line):
+            raise ValueError(f"无法识别 main 的签名: {def_line.strip()}")
+        block = _remove_adjacent_duplicate_lines(block)
+        unindented = _unindent_block(block, 4)
+
+        # 去掉装饰器（如 @staticmethod）
+        unindented = [l for l in unindented if not l.lstrip().startswith("@")]
+
+        # 签名改造
+        sig = unindented[0]
+        sig_new = re.sub(r"def\s+main\s*\(\s*self\s*,?", "def main(", sig)
+        sig_new = re.sub(r"def\s+main\s*\(\s*\)", "def main(args=None)", sig_new)
+        unindented[0] = sig_new
+
+        self._main = "".join(unindented).replace("self.", "instance.")
+
+
+def model_patch_code(code: str) -> str:
+    out: List[str] = []
+    patcher = MainPatcher(out.append)
+    for ln in code.splitlines(keepends=True):
+        patcher.feed(ln)
+    patcher.close()
+    return "".join(out)
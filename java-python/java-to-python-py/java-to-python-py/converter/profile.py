@@ -0,0 +1,71 @@
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+
+def handler_name(fn) -> str:
+    return getattr(fn, "__qualname__", getattr(fn, "__name__", str(fn)))
+
+
+class HandlerProfile:
+    """
+    按处理器 / 节点类型累计调用次数与耗时（--profile）：
+      - inclusive：处理器自身加其递归分发的子节点
+      - exclusive：扣除嵌套在内的已计时调用，即处理器自己的开销
+    每个 ConversionContext 持有一份，单文件结果里随 file_result 返回，由主进程合并。
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, List[float]] = {}  # 名称 -> [calls, inclusive_s, exclusive_s]
+        self.types: Dict[str, List[float]] = {}
+        self._child = [0.0]  # 每层已计时子调用的耗时合计
+
+    def call(self, name: str, t: Optional[str], fn, *args):
+        self._child.append(0.0)
+        start = perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            dt = perf_counter() - start
+            excl = dt - self._child.pop()
+            self._child[-1] += dt
+            self._add(self.handlers, name, 1, dt, excl)
+            if t:
+                self._add(self.types, t, 1, dt, excl)
+
+    @staticmethod
+    def _add(table, key, calls, incl, excl):
+        row = table.get(key)
+        if row is None:
+            table[key] = [calls, incl, excl]
+        else:
+            row[0] += calls
+            row[1] += incl
+            row[2] += excl
+
+    def merge(self, data: Dict[str, Any]):
+        """累加 to_dict() 格式的结果（并行 worker 返回的）。"""
+        for section, table in (("handlers", self.handlers), ("types", self.types)):
+            for key, row in (data.get(section) or {}).items():
+                self._add(table, key, row["calls"], row["inclusive_ms"] / 1000, row["exclusive_ms"] / 1000)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """{handlers: {名称: {calls, inclusive_ms, exclusive_ms}}, types: {...}}，按 exclusive 降序。"""
+        def table(rows):
+            ordered = sorted(rows.items(), key=lambda x: (-x[1][2], x[0]))
+            return {
+                k: {"calls": int(c), "inclusive_ms": incl * 1000, "exclusive_ms": excl * 1000}
+                for k, (c, incl, excl) in ordered
+            }
+        return {"handlers": table(self.handlers), "types": table(self.types)}
+
+
+def format_profile(data: Dict[str, Any], top: int = 15) -> List[str]:
+    lines = []
+    for section, title in (("handlers", "处理器"), ("types", "节点类型")):
+        rows = list((data.get(section) or {}).items())[:top]
+        if not rows:
+            continue
+        lines.append(f"{title}(按独占耗时 Top{top}):  调用  独占ms  累计ms")
+        for k, r in rows:
+            lines.append(f"  {k}: {r['calls']}  {r['exclusive_ms']:.2f}  {r['inclusive_ms']:.2f}")
+    return lines
@@ -0,0 +1,137 @@
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from converter.util import get_attr
+
+# 被剪子树的节点类型计数记在父节点的这个键下，覆盖率统计照常计入
+PRUNED_KEY = "prunedTypes"
+
+# 加载时的剪枝规则，按顺序取第一条 parents 匹配的（模式只有三种写法：完整类型名、"*"、"*后缀"）：
+#   drop：剪掉的子节点类型（连同整棵子树）
+#   requires：这些字段里第一个非空值须是非空白字符串才剪（为空时处理器会退回读子节点）
+# 只收录处理器从不读取的子节点，且不破坏按位置取子节点的处理器（如 IfStmt 的 chs[1] / chs[2]）
+PRUNE_SPEC = (
+    # 这几类会读子节点：不剪
+    {"parents": ("BinaryExpr",), "drop": ()},  # 表达式文本为空时按左右子节点拼接
+    {"parents": ("FieldAccessExpr",), "drop": ()},  # 按 ThisExpr / NameExpr 子节点判定 owner
+    {"parents": ("SwitchExpr",), "drop": ()},  # ControlConverter 逐个分发子节点
+    # 其余表达式只用自身的 name / value / attrs
+    {"parents": ("*Expr", "*Expression"), "drop": ("*",)},
+    {"parents": ("ExpressionStmt",), "drop": ("*",), "requires": ("code", "name", "value")},
+    {"parents": ("ReturnStmt", "ThrowStmt", "BreakStmt", "ContinueStmt"), "drop": ("*",)},
+    # 循环头取自 attrs，循环体是最后一个（do-while 为第一个）子节点
+    {"parents": ("ForStmt", "ForEachStmt", "WhileStmt", "DoStmt"), "drop": ("*Expr",)},
+    {"parents": ("PackageDeclaration", "ImportDeclaration", "Parameter", "VariableDeclarator"), "drop": ("*",)},
+    # 与 methods._IGNORE_IN_BODY 一致（Parameter 除外：参数名取自 Parameter 子节点）
+    {"parents": ("MethodDeclaration", "ConstructorDeclaration"),
+     "drop": ("Modifier", "SimpleName", "VoidType", "PrimitiveType", "ClassOrInterfaceType", "TypeParameter",
+              "ReferenceType", "Name", "ReturnType")},
+    {"parents": ("FieldDeclaration",), "drop": ("Modifier", "PrimitiveType", "ClassOrInterfaceType", "ArrayType")},
+    {"parents": ("ClassOrInterfaceDeclaration",),
+     "drop": ("Modifier", "SimpleName", "ClassOrInterfaceType", "TypeParameter")},
+    {"parents": ("CatchClause",), "drop": ("Parameter",)},
+    # 没有处理器的类型节点
+    {"parents": ("*Type", "Name", "SimpleName", "Modifier"), "drop": ("*",)},
+)
+
+
+def _match(t: str, pattern: str) -> bool:
+    # fnmatch 的子集：每个模式第一次用时要编译成正则，冷启动时几十个模式都得编译一遍
+    if pattern[:1] == "*":
+        return t.endswith(pattern[1:])
+    return t == pattern
+
+
+@lru_cache(maxsize=None)
+def _rule_for(t: str) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    for rule in PRUNE_SPEC:
+        if any(_match(t, p) for p in rule["parents"]):
+            drop = tuple(rule["drop"])
+            return (drop, tuple(rule.get("requires") or ())) if drop else None
+    return None
+
+
+def has_rule(t) -> bool:
+    return t.__class__ is str and _rule_for(t) is not None
+
+
+_shared: Dict[Tuple, Dict[str, int]] = {}
+
+
+def _share(counts: Dict[str, int]) -> Dict[str, int]:
+    # 相同的计数（如 {"MethodCallExpr": 1}）大量重复，共用一个 dict；加载后只读
+    key = tuple(sorted(counts.items()))
+    return _shared.setdefault(key, counts)
+
+
+@lru_cache(maxsize=None)
+def _drops(drop: Tuple[str, ...], t: str) -> bool:
+    return any(_match(t, p) for p in drop)
+
+
+def _add(counts: Dict[str, int], pruned: Dict[str, int]):
+    for t, c in pruned.items():
+        counts[t] = counts.get(t, 0) + c
+
+
+def count_subtree(node, counts: Dict[str, int]):
+    """
+    把 node 整棵子树按类型计入 counts，口径与覆盖率统计（converter._count_types）一致：
+    所有带 type 的 dict / Node 都计（含 attrs），已剪掉部分的计数直接累加。
+    """
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, (list, tuple)):
+            stack.extend(n)
+        elif isinstance(n, dict):
+            t = n.get("type")
+            if t:
+                counts[t] = counts.get(t, 0) + 1
+            for k, v in n.items():
+                if k == PRUNED_KEY:
+                    _add(counts, v)
+                elif v.__class__ is not str:
+                    stack.append(v)
+        elif hasattr(n, "nested"):
+            # Node / NodeView：标量字段里没有节点，只需看 nested()（attrs / extra 等）、children 与已剪计数
+            t = n.type
+            if t:
+                counts[t] = counts.get(t, 0) + 1
+            pruned = n.prunedTypes
+            if pruned:
+                _add(counts, pruned)
+            stack.extend(n.nested())
+            kids = n.children
+            if kids:
+                stack.extend(kids)
+
+
+def prune(node):
+    """按 PRUNE_SPEC 剪掉 node 的子节点（dict 或 Node 均可，原地修改），返回 node。"""
+    kids = node.get("children")
+    t = node.get("type")
+    if not kids or not t:
+        return node
+    rule = _rule_for(t)
+    if rule is None:
+        return node
+    drop, requires = rule
+    if requires:
+        val = next((v for v in (get_attr(node, f) for f in requires) if v), None)
+        if not (isinstance(val, str) and val.strip()):
+            return node
+    keep = []
+    counts = None
+    for ch in kids:
+        ct = ch.get("type") if hasattr(ch, "get") else None
+        if ct and _drops(drop, ct):
+            if counts is None:
+                counts = dict(node.get(PRUNED_KEY) or {})
+            count_subtree(ch, counts)
+        else:
+            keep.append(ch)
+    if counts is not None:
+        node["children"] = keep
+        node[PRUNED_KEY] = _share(counts)
+    return node
@@ -0,0 +1,99 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+METRIC_PREFIX = "java2py"
+
+
+def report_payload(result: Dict[str, Any], out_py=None) -> Dict[str, Any]:
+    """
+    run() 返回值的可序列化视图：去掉整份代码 content（已写在 out_py 里），
+    其余字段（stats / syntax / efficiency / timing / coverage / cache）原样保留。
+    """
+    payload = {k: v for k, v in result.items() if k != "content"}
+    if out_py is not None:
+        payload["out_py"] = str(out_py)
+    return payload
+
+
+def _write_atomic(path, text: str):
+    # 先写同目录临时文件再 rename：读方（CI、node_exporter textfile collector）不会读到半个文件
+    path = Path(path)
+    if path.parent != Path(""):
+        path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def write_json_report(result: Dict[str, Any], path, out_py=None):
+    text = json.dumps(report_payload(result, out_py), ensure_ascii=False, indent=2, sort_keys=True)
+    _write_atomic(path, text + "\n")
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def prometheus_lines(result: Dict[str, Any]) -> List[str]:
+    """把 run() 的结果转成 Prometheus 文本格式（textfile collector 可直接读取）。"""
+    out: List[str] = []
+
+    def metric(name, kind, help_text, samples):
+        full = f"{METRIC_PREFIX}_{name}"
+        out.append(f"# HELP {full} {help_text}")
+        out.append(f"# TYPE {full} {kind}")
+        for labels, value in samples:
+            if labels:
+                inner = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+                out.append(f"{full}{{{inner}}} {_num(value)}")
+            else:
+                out.append(f"{full} {_num(value)}")
+
+    stats = result.get("stats") or {}
+    syntax = result.get("syntax") or {}
+    timing = result.get("timing") or {}
+
+    metric("efficiency", "gauge", "Share of actionable nodes converted to real code.",
+           [({}, float(result.get("efficiency", 0.0)))])
+    metric("nodes", "gauge", "Actionable node outcomes.",
+           [({"outcome": k}, stats.get(k, 0)) for k in ("actionable", "converted_ok", "converted_trivial")])
+    metric("fallback_lines", "gauge", "Fallback comment lines emitted.", [({}, stats.get("fallback_lines", 0))])
+    metric("unhandled_nodes", "gauge", "Actionable nodes without a real conversion, by AST type.",
+           [({"type": k}, v) for k, v in sorted((stats.get("unhandled_by_type") or {}).items())])
+    metric("unmapped_methods", "gauge", "Calls with no Python mapping, by method.",
+           [({"method": k}, v) for k, v in sorted((stats.get("unmapped_methods") or {}).items())])
+    metric("syntax_module_ok", "gauge", "1 if the generated module parses.",
+           [({}, 1 if syntax.get("module_ok") else 0)])
+    metric("syntax_blocks", "gauge", "Top-level blocks checked with ast.parse.",
+           [({"status": "total"}, syntax.get("blocks_total", 0)), ({"status": "ok"}, syntax.get("blocks_ok", 0))])
+    metric("syntax_rate", "gauge", "Share of top-level blocks that parse.", [({}, float(syntax.get("rate", 0.0)))])
+    metric("lines", "gauge", "Converted lines before post-processing.", [({}, timing.get("lines", 0))])
+    metric("elapsed_seconds", "gauge", "Conversion wall time (convert + write).",
+           [({}, timing.get("elapsed_ms", 0.0) / 1000)])
+    metric("phase_seconds", "gauge", "Wall time per run() phase.",
+           [({"phase": k}, v / 1000) for k, v in sorted((timing.get("phases") or {}).items())])
+    cache = result.get("cache")
+    if cache:
+        samples = [({"cache": "file", "result": "hit"}, cache.get("hits", 0)),
+                   ({"cache": "file", "result": "miss"}, cache.get("misses", 0))]
+        syn = cache.get("syntax") or {}
+        if syn:
+            samples += [({"cache": "syntax", "result": "hit"}, syn.get("hits", 0)),
+                        ({"cache": "syntax", "result": "miss"}, syn.get("misses", 0))]
+        metric("cache_lookups", "gauge", "Cache lookups in this run.", samples)
+    return out
+
+
+def write_prometheus(result: Dict[str, Any], path):
+    _write_atomic(path, "\n".join(prometheus_lines(result)) + "\n")
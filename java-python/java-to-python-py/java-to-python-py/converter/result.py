@@ -0,0 +1,48 @@
+from typing import Any, Dict, Optional
+
+
+class ConversionResult:
+    """
+    Converter.convert() 的结果，纯内存、不含任何文件路径：
+      - content：生成的 Python 代码（不含报告注释）
+      - stats / efficiency：转换统计与效率；syntax：语法检查（convert(syntax=False) 时为 None）
+      - timing：{elapsed_ms, lines, phases}
+      - coverage / profile / rules / memory / cache：对应开关打开时才有
+    to_dict() 是 run() 的返回值与 --report-json 使用的 dict 格式。
+    普通类而非 dataclass：run() 每次都构造它，不为 dataclasses（会带入 inspect 等）拖慢冷启动。
+    """
+
+    __slots__ = ("content", "stats", "syntax", "efficiency", "timing", "coverage", "profile", "rules", "memory",
+                 "cache")
+
+    def __init__(self, content: str, stats: Dict[str, Any], syntax: Optional[Dict[str, Any]], efficiency: float,
+                 timing: Dict[str, Any], coverage: Optional[Dict[str, Dict[str, Any]]] = None,
+                 profile: Optional[Dict[str, Any]] = None, rules: Optional[Dict[str, Any]] = None,
+                 memory: Optional[Dict[str, Any]] = None, cache: Optional[Dict[str, Any]] = None):
+        self.content = content
+        self.stats = stats
+        self.syntax = syntax
+        self.efficiency = efficiency
+        self.timing = timing
+        self.coverage = coverage
+        self.profile = profile
+        self.rules = rules
+        self.memory = memory
+        self.cache = cache
+
+    def __repr__(self):
+        return f"ConversionResult(lines={self.timing.get('lines')}, efficiency={self.efficiency:.3f})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {
+            "content": self.content,
+            "stats": self.stats,
+            "syntax": self.syntax,
+            "efficiency": self.efficiency,
+            "timing": self.timing,
+        }
+        for key in ("coverage", "profile", "rules", "memory", "cache"):
+            value = getattr(self, key)
+            if value is not None:
+                out[key] = value
+        return out
@@ -0,0 +1,115 @@
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+
+class RuleStats:
+    """表达式层各改写规则的调用次数、命中次数与耗时（--rule-stats）。"""
+
+    def __init__(self):
+        import threading  # 只有开了 --rule-stats 才需要；本模块本身在 exprs 的导入路径上
+
+        self.rows: Dict[str, List[float]] = {}  # 规则 -> [calls, hits, seconds]
+        self._lock = threading.Lock()
+
+    def record(self, rule: str, hit: bool, dt: float, calls: int = 1):
+        with self._lock:
+            row = self.rows.get(rule)
+            if row is None:
+                self.rows[rule] = [calls, int(hit), dt]
+            else:
+                row[0] += calls
+                row[1] += int(hit)
+                row[2] += dt
+
+    def merge(self, data: Dict[str, Any]):
+        for rule, r in (data or {}).items():
+            with self._lock:
+                row = self.rows.setdefault(rule, [0, 0, 0.0])
+                row[0] += r["calls"]
+                row[1] += r["hits"]
+                row[2] += r["total_ms"] / 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """{规则: {calls, hits, total_ms, avg_us}}，按总耗时降序。"""
+        with self._lock:
+            ordered = sorted(self.rows.items(), key=lambda x: (-x[1][2], x[0]))
+        return {
+            rule: {"calls": int(c), "hits": int(h), "total_ms": sec * 1000, "avg_us": sec * 1e6 / c if c else 0.0}
+            for rule, (c, h, sec) in ordered
+        }
+
+
+# 当前线程正在记录的统计：ExprConverter.convert 在 ctx.rules 不为 None 时设置，
+# 供不带 ctx 的模块级规则函数使用；为 None 时规则函数直接调用、不计时
+_current: ContextVar[Optional[RuleStats]] = ContextVar("rule_stats", default=None)
+
+
+@contextmanager
+def recording(stats: RuleStats):
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def changed(args, out) -> bool:
+    """改写函数：输出与输入不同即算命中。"""
+    return out != args[0]
+
+
+def matched(args, out) -> bool:
+    """匹配函数：返回非空即算命中。"""
+    return bool(out)
+
+
+def rule(name: str, is_hit=changed):
+    """
+    标记模块级规则函数：当前线程有统计时记录调用 / 命中 / 耗时。
+    放在 lru_cache 之内，缓存命中不会走到这里，调用次数是实际执行次数。
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats = _current.get()
+            if stats is None:
+                return fn(*args, **kwargs)
+            start = perf_counter()
+            out = fn(*args, **kwargs)
+            stats.record(name, is_hit(args, out), perf_counter() - start)
+            return out
+        return wrapper
+    return deco
+
+
+def call_rule(kind: str):
+    """
+    标记 ExprConverter._map_method_call / _map_static_call：直接看 ctx.rules，按方法名归类，
+    没有走到任何映射分支（原样输出）不算命中。
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(self, owner, method, argstr, ctx):
+            stats = ctx.rules
+            if stats is None:
+                return fn(self, owner, method, argstr, ctx)
+            start = perf_counter()
+            out = fn(self, owner, method, argstr, ctx)
+            name = f"{owner}.{method}" if kind == "static_call" else method
+            stats.record(f"{kind}:{name}", not out.endswith(f".{method}({argstr})"), perf_counter() - start)
+            return out
+        return wrapper
+    return deco
+
+
+def format_rule_stats(data: Dict[str, Any], top: int = 20) -> List[str]:
+    lines = [f"规则(按总耗时 Top{top}):  调用  命中  总ms  均us"]
+    for rule, r in list(data.items())[:top]:
+        lines.append(f"  {rule}: {r['calls']}  {r['hits']}  {r['total_ms']:.2f}  {r['avg_us']:.1f}")
+    dead = [rule for rule, r in data.items() if not r["hits"]]
+    if dead:
+        lines.append(f"从未命中: {', '.join(sorted(dead))}")
+    return lines
@@ -0,0 +1,271 @@
+import asyncio
+import json
+import os
+import stat
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from converter.parallel import EXECUTORS
+
+# 单行请求/响应的上限（整个 Project AST 可能放在一行里）
+LINE_LIMIT = 1 << 30
+# 请求 options 允许的键（含义同 run_converter.py 的同名参数）
+OPTIONS = ("coverage", "profile", "cache_dir", "prune", "postprocess", "content")
+CONTROL_OPS = ("ping", "stats", "shutdown")
+
+
+def warm_up():
+    """
+    worker 启动时预热：导入转换器各模块（含 mappings 的大表），算好缓存指纹，
+    再转换一个小 AST，让正则与表达式层的 lru_cache 先填上。
+    """
+    from converter.cache import converter_fingerprint
+    from converter.converter import Converter
+
+    converter_fingerprint()
+    sample = {"type": "Project", "children": [{"type": "File", "name": "Warm.java", "children": [
+        {"type": "ClassOrInterfaceDeclaration", "name": "Warm", "line": 1, "children": [
+            {"type": "MethodDeclaration", "name": "main", "line": 2, "attrs": {"static": "true"}, "children": [
+                {"type": "BlockStmt", "line": 2, "children": [
+                    {"type": "ExpressionStmt", "line": 3, "attrs": {"code": "System.out.println(\"warm\")"}}]}]}]}]}]}
+    conv = Converter(sample)
+    conv.coverage = False
+    for _ in conv._iter_converted("<warm-up>"):
+        pass
+
+
+def _init_worker():
+    # stdio 模式下 stdout 是协议通道：转换过程中的 print 一律改到 stderr
+    sys.stdout = sys.stderr
+    try:
+        warm_up()
+    except Exception:
+        pass
+
+
+def handle_request(req: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    在 worker 里处理一个转换请求（已解析的 JSON 对象）：
+      {"ast": {...}} 或 {"path": "in.json" | "in.j2pa"}，可选 "out"（写出 .py 文件，同命令行）与 "options"
+    返回 {"ok": true, "result": run() 的结果（同 --report-json）, "content": 生成的代码}。
+    未给 out 时走 Converter.convert()，不落盘，只通过 content 返回。
+    """
+    from converter.converter import Converter
+    from converter.node import is_snapshot, load_ast
+    from converter.report import report_payload
+
+    opts = req.get("options") or {}
+    unknown = sorted(set(opts) - set(OPTIONS))
+    if unknown:
+        raise ValueError(f"未知的 options: {', '.join(unknown)}")
+    prune = opts.get("prune", True)
+    if req.get("ast") is not None:
+        ast = req["ast"]
+        in_json = req.get("name") or "<payload>"
+    elif req.get("path"):
+        in_json = req["path"]
+        if is_snapshot(in_json):
+            from converter.snapshot import open_snapshot
+
+            ast = open_snapshot(in_json).root
+        else:
+            with open(in_json, encoding="utf-8") as f:
+                ast = load_ast(f, pruned=prune)
+    else:
+        raise ValueError("请求里需要 ast 或 path")
+    out = req.get("out")
+    kwargs = dict(postprocess=opts.get("postprocess", True), cache_dir=opts.get("cache_dir"),
+                  coverage=opts.get("coverage", True), profile=opts.get("profile", False))
+    conv = Converter(ast)
+    if out:
+        result = conv.run(in_json, out, quiet=True, **kwargs)
+    else:
+        result = conv.convert(source=in_json, **kwargs).to_dict()
+    resp = {"ok": True, "result": report_payload(result, out)}
+    if opts.get("content", out is None):
+        resp["content"] = result["content"]
+    return resp
+
+
+def _run_request(req: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return handle_request(req)
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()}
+
+
+class ConversionServer:
+    """
+    常驻转换服务：asyncio 读 JSON-lines 请求，交给 worker 池并发转换，按完成顺序写回（以 id 对应）。
+    worker 常驻，导入的模块、映射表与各级 memo 缓存在请求之间保持热。
+      - 转换请求：见 handle_request
+      - 控制请求：{"op": "ping" | "stats" | "shutdown"}（shutdown 等已收到的请求都回复后再停）
+    传输层：Unix socket（serve_unix，可多连接）或 stdin/stdout（serve_stdio，编辑器插件用）。
+    """
+
+    def __init__(self, jobs: int = 0, executor: str = "process"):
+        if executor not in EXECUTORS:
+            raise ValueError(f"未知的 executor: {executor}")
+        self.jobs = jobs or os.cpu_count() or 1
+        self.executor = executor
+        self.pool: Optional[Executor] = None
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.active = 0
+        self._inflight = set()  # 所有连接上尚未回复的请求
+        self._stop: Optional[asyncio.Event] = None
+
+    def _open_pool(self):
+        if self.executor == "thread":
+            # 线程共享本进程的模块与缓存：在这里预热一次
+            warm_up()
+            self.pool = ThreadPoolExecutor(max_workers=self.jobs)
+        else:
+            self.pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker)
+            # 在任何后台线程（stdio 的读线程）启动之前把 worker 全部起好：fork 出的子进程启动时会
+            # sys.stdin.close()，若此时读线程正阻塞在 stdin.read1 里持有缓冲区锁，子进程会死锁
+            for fut in [self.pool.submit(os.getpid) for _ in range(self.jobs)]:
+                fut.result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "executor": self.executor,
+            "jobs": self.jobs,
+            "uptime_s": round(time.time() - self.started, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "active": self.active,
+        }
+
+    async def _dispatch(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        op = req.get("op")
+        if op is not None:
+            if op not in CONTROL_OPS:
+                return {"ok": False, "error": f"未知的 op: {op}"}
+            return {"ok": True, "stats": self.stats()} if op == "stats" else {"ok": True}
+        self.requests += 1
+        self.active += 1
+        try:
+            resp = await asyncio.get_running_loop().run_in_executor(self.pool, _run_request, req)
+        finally:
+            self.active -= 1
+        if not resp.get("ok"):
+            self.errors += 1
+        return resp
+
+    async def _handle_line(self, line: bytes, write):
+        rid = None
+        shutdown = False
+        try:
+            req = json.loads(line)
+            if not isinstance(req, dict):
+                raise ValueError("请求须是 JSON 对象")
+            rid = req.get("id")
+            shutdown = req.get("op") == "shutdown"
+            if shutdown:
+                # 先把之前收到的请求都答完再停
+                me = asyncio.current_task()
+                await asyncio.gather(*(t for t in self._inflight if t is not me), return_exceptions=True)
+            resp = await self._dispatch(req)
+        except Exception as e:
+            self.errors += 1
+            resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        if rid is not None:
+            resp["id"] = rid
+        await write(json.dumps(resp, ensure_ascii=False).encode("utf-8") + b"\n")
+        if shutdown:
+            self._stop.set()
+
+    async def _serve_stream(self, reader: asyncio.StreamReader, write):
+        # 每行一个请求；各请求并发执行，连接关闭时等在途请求写完
+        tasks = set()
+        while not self._stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.ensure_future(self._handle_line(line, write))
+            tasks.add(task)
+            self._inflight.add(task)
+            task.add_done_callback(tasks.discard)
+            task.add_done_callback(self._inflight.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def serve_unix(self, path: str):
+        """在 Unix socket 上服务，直到收到 shutdown。socket 文件仅属主可读写。"""
+        self._stop = asyncio.Event()
+        self._open_pool()
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)  # 上次异常退出留下的 socket
+
+        async def client(reader, writer):
+            lock = asyncio.Lock()
+
+            async def write(data: bytes):
+                async with lock:
+                    writer.write(data)
+                    await writer.drain()
+
+            try:
+                await self._serve_stream(reader, write)
+            finally:
+                writer.close()
+
+        old_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(client, path=path, limit=LINE_LIMIT)
+        finally:
+            os.umask(old_umask)
+        try:
+            async with server:
+                await self._stop.wait()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    async def serve_stdio(self):
+        """从 stdin 读请求、向 stdout 写响应，直到 stdin 关闭或收到 shutdown。"""
+        self._stop = asyncio.Event()
+        out = sys.stdout.buffer
+        sys.stdout = sys.stderr  # 协议之外的输出不能混进 stdout
+        self._open_pool()  # 必须在读线程启动之前（见 _open_pool）
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=LINE_LIMIT)
+
+        def pump(src=sys.stdin.buffer):
+            # stdin 可能是管道、普通文件或终端（管道传输不支持后两者）：由后台线程逐块读入 reader
+            try:
+                while True:
+                    data = src.read1(1 << 16)
+                    if not data:
+                        break
+                    loop.call_soon_threadsafe(reader.feed_data, data)
+            finally:
+                loop.call_soon_threadsafe(reader.feed_eof)
+
+        threading.Thread(target=pump, name="j2p-serve-stdin", daemon=True).start()
+
+        async def write(data: bytes):
+            out.write(data)
+            out.flush()
+
+        try:
+            stream = asyncio.ensure_future(self._serve_stream(reader, write))
+            stop = asyncio.ensure_future(self._stop.wait())
+            await asyncio.wait({stream, stop}, return_when=asyncio.FIRST_COMPLETED)
+            if not stream.done():
+                stream.cancel()
+            stop.cancel()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
@@ -0,0 +1,102 @@
+from multiprocessing import util
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional, Tuple
+
+from converter.node import load_ast
+from converter.snapshot import NodeView, Snapshot, SnapshotWriter, checked_view
+
+
+class SharedAST:
+    """
+    放在 multiprocessing.shared_memory 里的 AST 节点表（与快照文件同一格式，见 snapshot.py）。
+    主进程构建一次；其中的 NodeView pickle 成 (段名, 子树首行, 行数) 句柄，
+    进程池 worker 按段名映射同一块内存后零拷贝读取，不再逐个 pickle File 子树。
+    由创建者 close()：关闭映射并删除共享内存段。
+    """
+
+    def __init__(self, writer: SnapshotWriter):
+        size = writer.size()
+        self.shm = SharedMemory(create=True, size=size)
+        try:
+            writer.dump(self.shm.buf)
+            self.snapshot = Snapshot(self.shm.name, buf=self.shm.buf, opener=attach_shared)
+        except Exception:
+            self.shm.close()
+            self.shm.unlink()
+            raise
+        self.name = self.shm.name
+        self.nodes = writer.nodes
+        self.bytes = size
+        _owned[self.name] = self
+
+    @classmethod
+    def from_json(cls, in_json, pruned: bool = True) -> "SharedAST":
+        """
+        从 Project JSON 构建：整体加载后写入节点表，Node 树随即释放。
+        （snapshot.build_snapshot 按 File 流式读取，内存更省但增量扫描慢得多，这里取加载速度）
+        """
+        with open(in_json, encoding="utf-8") as f:
+            tree = load_ast(f, pruned=pruned)
+        return cls.from_tree(tree)
+
+    @classmethod
+    def from_tree(cls, node) -> "SharedAST":
+        """从已加载的 AST（Node 或 dict）构建。"""
+        w = SnapshotWriter()
+        w.add_tree(node)
+        return cls(w)
+
+    @property
+    def root(self) -> NodeView:
+        return self.snapshot.root
+
+    def close(self):
+        _owned.pop(self.name, None)
+        try:
+            self.snapshot.close()
+            self.shm.close()
+        except Exception:
+            pass
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 本进程创建的段：段名 -> SharedAST
+_owned: Dict[str, SharedAST] = {}
+# worker 进程里已映射的段：段名 -> (SharedMemory, Snapshot)
+_attached: Dict[str, Tuple[SharedMemory, Snapshot]] = {}
+
+
+def attach_shared(name: str, i: int, rows: Optional[int] = None) -> NodeView:
+    """NodeView 反序列化入口：按段名映射共享内存（每个进程每段一次），返回下标 i 的视图。"""
+    seg = _attached.get(name)
+    if seg is None:
+        owned = _owned.get(name)
+        if owned is not None:
+            # 本进程创建的段（如线程池或同进程反序列化）：直接用已有映射
+            return checked_view(owned.snapshot, i, rows)
+        # 进程池 worker 与主进程共用同一个 resource_tracker，登记是幂等的；段由创建者 unlink
+        shm = SharedMemory(name=name)
+        if not _attached:
+            # worker 退出时先释放各段上的 memoryview 再关闭映射（否则 SharedMemory.__del__ 报 BufferError）
+            util.Finalize(None, _detach_all, exitpriority=10)
+        seg = _attached[name] = (shm, Snapshot(name, buf=shm.buf, opener=attach_shared))
+    return checked_view(seg[1], i, rows)
+
+
+def _detach_all():
+    while _attached:
+        _, (shm, snap) = _attached.popitem()
+        snap.close()
+        try:
+            shm.close()
+        except Exception:
+            pass
@@ -0,0 +1,482 @@
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from converter.node import FIELDS, SNAPSHOT_MAGIC, NodeBase, is_snapshot, load_ast, object_hook
+from converter.prune import has_rule
+from converter.stream import STREAM_ROOT_TYPES, ProjectStreamReader
+
+MAGIC = SNAPSHOT_MAGIC
+VERSION = 1
+NONE = -(1 << 31)  # 缺失的整数字段 / 字符串下标
+
+# 节点表：每列一个 int32 数组，行号即节点下标（前序编号，根为 0）
+NODE_COLUMNS = (
+    "type", "name", "value", "line", "column", "endLine", "endColumn",
+    "parent", "firstChild", "nextSibling", "childCount",
+    "attrStart", "attrCount", "prunedStart", "prunedCount", "extra", "flags",
+)
+SECTIONS = ("strOffsets", "strData") + NODE_COLUMNS + ("attrKeys", "attrValues", "prunedTypes", "prunedCounts")
+
+# magic, version, 字节序(0 小端 / 1 大端), 节点数, 字符串数, attrs 条数, 剪枝计数条数
+_HEADER = struct.Struct("<8sIIqqqq")
+_TABLE = struct.Struct(f"<{2 * len(SECTIONS)}q")  # 各段 (偏移, 字节数)
+_ALIGN = 8
+
+_F_CHILDREN = 1  # 有 children 键（可能为空）
+_F_ATTRS = 2  # 有 attrs 键（可能为空）
+
+_STR_FIELDS = ("type", "name", "value")
+_INT_FIELDS = ("line", "column", "endLine", "endColumn")
+_INT_MIN, _INT_MAX = NONE + 1, (1 << 31) - 1
+_INTERN_MAX = 64
+_EMPTY: Tuple = ()
+
+
+# ---------------- 写入 ----------------
+
+class SnapshotWriter:
+    """
+    把 AST（Node 或 dict）按前序编号写成列式快照：
+      - 节点表：type/name/value 存字符串下标，行列号存整数，parent / firstChild / nextSibling / childCount 连接树
+      - 字符串表去重（UTF-8 + 偏移数组），attrs 与剪枝计数存为 (键, 值) 下标对
+      - 放不进列的值（非字符串的 name、嵌套 attrs、未知键）整体存为 extra 列里的一段 JSON
+    """
+
+    def __init__(self):
+        self.cols = {name: array.array("i") for name in NODE_COLUMNS}
+        self.attr_keys = array.array("i")
+        self.attr_values = array.array("i")
+        self.pruned_types = array.array("i")
+        self.pruned_counts = array.array("i")
+        self.str_offsets = array.array("q", [0])
+        self.str_chunks: List[bytes] = []
+        self._strings: Dict[str, int] = {}
+        self._open: Dict[int, List[int]] = {}  # 父节点 -> [上一个子节点, 剩余子节点数]
+
+    @property
+    def nodes(self) -> int:
+        return len(self.cols["type"])
+
+    def _str(self, s: str) -> int:
+        idx = self._strings.get(s)
+        if idx is None:
+            idx = self._strings[s] = len(self._strings)
+            data = s.encode("utf-8", "surrogatepass")
+            self.str_chunks.append(data)
+            self.str_offsets.append(self.str_offsets[-1] + len(data))
+        return idx
+
+    def _row(self, node) -> Tuple[Dict[str, int], int]:
+        # 返回 (数据列的值, 子节点数)；parent / firstChild / nextSibling 由 _append 填
+        row = dict.fromkeys(("type", "name", "value", "line", "column", "endLine", "endColumn",
+                             "attrStart", "attrCount", "prunedStart", "prunedCount", "extra"), NONE)
+        row["attrCount"] = row["prunedCount"] = 0
+        flags = 0
+        kids = 0
+        extra = {}
+        for k, v in node.items():
+            if k in _STR_FIELDS and v.__class__ is str:
+                row[k] = self._str(v)
+            elif k in _INT_FIELDS and v.__class__ is int and _INT_MIN <= v <= _INT_MAX:
+                row[k] = v
+            elif k == "children" and isinstance(v, (list, tuple)):
+                flags |= _F_CHILDREN
+                kids = len(v)
+            elif k == "attrs" and isinstance(v, dict) and all(
+                    a.__class__ is str and b.__class__ is str for a, b in v.items()):
+                flags |= _F_ATTRS
+                row["attrStart"], row["attrCount"] = len(self.attr_keys), len(v)
+                for a, b in v.items():
+                    self.attr_keys.append(self._str(a))
+                    self.attr_values.append(self._str(b))
+            elif k == "prunedTypes" and isinstance(v, dict):
+                row["prunedStart"], row["prunedCount"] = len(self.pruned_types), len(v)
+                for a, b in v.items():
+                    self.pruned_types.append(self._str(a))
+                    self.pruned_counts.append(b)
+            else:
+                extra[k] = v
+        if extra:
+            row["extra"] = self._str(json.dumps(extra, ensure_ascii=False, separators=(",", ":")))
+        row["flags"] = flags
+        row["childCount"] = kids
+        return row, kids
+
+    def _append(self, node, parent: int) -> Tuple[int, int]:
+        i = self.nodes
+        row, kids = self._row(node)
+        cols = self.cols
+        for name in NODE_COLUMNS:
+            cols[name].append(row.get(name, NONE))
+        if parent >= 0:
+            cols["parent"][i] = parent
+            slot = self._open.get(parent)
+            if slot is None:
+                # 流式写入的根：子节点数事先未知，不会减到 0
+                slot = self._open[parent] = [-1, -1]
+            if slot[0] < 0:
+                cols["firstChild"][parent] = i
+            else:
+                cols["nextSibling"][slot[0]] = i
+            slot[0] = i
+            slot[1] -= 1
+            if not slot[1]:
+                del self._open[parent]
+        if kids:
+            self._open[i] = [-1, kids]
+        return i, kids
+
+    def add_tree(self, node, parent: int = -1) -> int:
+        """前序追加一棵子树（迭代，深树不爆栈），返回其根的下标。"""
+        root = None
+        stack = [(node, parent)]
+        while stack:
+            n, p = stack.pop()
+            if not hasattr(n, "items"):
+                raise ValueError(f"children 里有非节点的值: {n!r}")
+            i, kids = self._append(n, p)
+            if root is None:
+                root = i
+            if kids:
+                stack.extend((ch, i) for ch in reversed(n.get("children")))
+        return root
+
+    def set_root(self, header: Dict[str, Any], kids: int, has_children: bool):
+        # 流式写入时根节点先占位，读完 children 后再补上 header 里的字段
+        row, _ = self._row(header)
+        for name, v in row.items():
+            if name != "childCount":
+                self.cols[name][0] = v
+        self.cols["childCount"][0] = kids
+        if has_children or kids:
+            self.cols["flags"][0] |= _F_CHILDREN
+
+    def _layout(self) -> Tuple[List[Tuple[int, bytes]], int]:
+        # 返回 [(偏移, 字节)] 与总长度；各段按 _ALIGN 对齐
+        if array.array("i").itemsize != 4 or array.array("q").itemsize != 8:
+            raise RuntimeError("本平台 array('i') / array('q') 宽度不是 4 / 8 字节")
+        blobs = {
+            "strOffsets": self.str_offsets.tobytes(),
+            "strData": b"".join(self.str_chunks),
+            "attrKeys": self.attr_keys.tobytes(),
+            "attrValues": self.attr_values.tobytes(),
+            "prunedTypes": self.pruned_types.tobytes(),
+            "prunedCounts": self.pruned_counts.tobytes(),
+        }
+        for name in NODE_COLUMNS:
+            blobs[name] = self.cols[name].tobytes()
+        header = _HEADER.pack(MAGIC, VERSION, 0 if sys.byteorder == "little" else 1, self.nodes,
+                              len(self._strings), len(self.attr_keys), len(self.pruned_types))
+        pos = _align(len(header) + _TABLE.size)
+        table = []
+        parts = []
+        for name in SECTIONS:
+            table += [pos, len(blobs[name])]
+            parts.append((pos, blobs[name]))
+            pos = _align(pos + len(blobs[name]))
+        return [(0, header + _TABLE.pack(*table))] + parts, pos
+
+    def dump(self, buf) -> int:
+        """写进可写缓冲区（如 SharedMemory.buf），长度至少为 size()；返回写入的字节数。"""
+        parts, size = self._layout()
+        buf = memoryview(buf)
+        for offset, data in parts:
+            buf[offset:offset + len(data)] = data
+        return size
+
+    def size(self) -> int:
+        return self._layout()[1]
+
+    def write(self, path):
+        parts, _ = self._layout()
+        path = os.fspath(path)
+        tmp = os.path.join(os.path.dirname(path) or ".", f".{os.path.basename(path)}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                for offset, data in parts:
+                    f.write(b"\0" * (offset - f.tell()))
+                    f.write(data)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def build_snapshot(in_json, pruned: bool = True) -> SnapshotWriter:
+    """
+    读取 Project JSON 填充 SnapshotWriter：Project / CompilationUnit 按 File 子树流式读取（内存里只有当前一个 File），
+    其余根节点整体加载。pruned=True 时按 prune.PRUNE_SPEC 剪枝。
+    """
+    w = SnapshotWriter()
+    reader = ProjectStreamReader(in_json, object_hook=object_hook(True, pruned))
+    w.add_tree({})  # 根节点占位，字段要等 children 读完（header 可能排在 children 之后）
+    count = 0
+    for ch in reader:
+        w.add_tree(ch, 0)
+        count += 1
+    root_type = reader.header.get("type")
+    if root_type not in STREAM_ROOT_TYPES and pruned and has_rule(root_type):
+        # 根节点自己的子节点也要剪：整体加载后重写
+        w = SnapshotWriter()
+        with open(in_json, encoding="utf-8") as f:
+            w.add_tree(load_ast(f, pruned=pruned))
+    else:
+        w.set_root(reader.header, count, reader.has_children)
+    return w
+
+
+def write_snapshot(in_json, out_path, pruned: bool = True) -> Dict[str, Any]:
+    """Project JSON → 快照文件（convert-ast 子命令）。返回 {nodes, strings, bytes, elapsed_ms}。"""
+    start = time.perf_counter()
+    w = build_snapshot(in_json, pruned)
+    w.write(out_path)
+    return {
+        "nodes": w.nodes,
+        "strings": len(w._strings),
+        "bytes": os.path.getsize(out_path),
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+# ---------------- 读取 ----------------
+
+class Snapshot:
+    """
+    以只读 mmap 打开快照：各段经 memoryview.cast 直接当数组用，不拷贝、不解析，
+    打开耗时与文件大小无关；多个进程打开同一文件时共用页缓存里的同一批物理页。
+    节点按需包装成 NodeView，字符串按需解码并缓存。
+    """
+
+    def __init__(self, path, buf=None, opener=None):
+        """
+        path 为快照文件；给定 buf（如 SharedMemory.buf）时直接在其上读取，path 只作标识。
+        opener(path, 下标, 行数) 是 NodeView pickle 后在另一个进程里重建视图的入口，默认 attach。
+        """
+        self._mm = None
+        if buf is None:
+            self.path = os.path.abspath(os.fspath(path))
+            with open(self.path, "rb") as f:
+                self._mm = buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.path = path
+        self.opener = opener or attach
+        magic, version, order, self.nodes, self.strings, _, _ = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是 AST 快照: {self.path}")
+        if version != VERSION:
+            raise ValueError(f"快照版本 {version} 与当前版本 {VERSION} 不符，请用 convert-ast 重新生成: {self.path}")
+        if order != (0 if sys.byteorder == "little" else 1):
+            raise ValueError(f"快照字节序与本机不同，请在本机重新生成: {self.path}")
+        table = _TABLE.unpack_from(buf, _HEADER.size)
+        buf = self._buf = memoryview(buf)
+        sec = {}
+        for idx, name in enumerate(SECTIONS):
+            view = buf[table[2 * idx]:table[2 * idx] + table[2 * idx + 1]]
+            sec[name] = view if name == "strData" else view.cast("q" if name == "strOffsets" else "i")
+        self._sec = sec
+        self.str_offsets, self.str_data = sec["strOffsets"], sec["strData"]
+        (self.c_type, self.c_name, self.c_value, self.c_line, self.c_column, self.c_end_line, self.c_end_column,
+         self.c_parent, self.c_first_child, self.c_next_sibling, self.c_child_count, self.c_attr_start,
+         self.c_attr_count, self.c_pruned_start, self.c_pruned_count, self.c_extra, self.c_flags) = (
+            sec[name] for name in NODE_COLUMNS)
+        self.attr_keys, self.attr_values = sec["attrKeys"], sec["attrValues"]
+        self.pruned_types, self.pruned_counts = sec["prunedTypes"], sec["prunedCounts"]
+        self._strs: Dict[int, str] = {}
+        self._root: Optional["NodeView"] = None
+
+    def string(self, i: int) -> Optional[str]:
+        if i == NONE:
+            return None
+        s = self._strs.get(i)
+        if s is None:
+            o = self.str_offsets
+            s = str(self.str_data[o[i]:o[i + 1]], "utf-8", "surrogatepass")
+            if len(s) <= _INTERN_MAX:
+                s = sys.intern(s)
+            self._strs[i] = s
+        return s
+
+    def view(self, i: int) -> "NodeView":
+        return NodeView(self, i)
+
+    def subtree_rows(self, i: int) -> int:
+        """以 i 为根的子树占的行数：前序编号下子树是连续的一段，止于 i 或其最近祖先的下一个兄弟。"""
+        j = i
+        while j != NONE:
+            nxt = self.c_next_sibling[j]
+            if nxt != NONE:
+                return nxt - i
+            j = self.c_parent[j]
+        return self.nodes - i
+
+    @property
+    def root(self) -> "NodeView":
+        if self._root is None:
+            self._root = NodeView(self, 0)
+        return self._root
+
+    def close(self):
+        self._root = None
+        self._strs = {}
+        try:
+            for view in self._sec.values():
+                view.release()
+            self._buf.release()
+            if self._mm is not None:
+                self._mm.close()
+        except Exception:
+            pass
+
+
+class NodeView(NodeBase):
+    """
+    快照里一个节点的惰性视图：字段在访问时才从列里读，子节点列表与 attrs 首次访问后缓存
+    （同一父节点多次取 children 得到同一批对象，覆盖率钩子按 id 去重依赖这一点）。
+    pickle 成 (快照路径, 下标)：进程池 worker 自己 mmap 同一文件，不传子树内容。
+    """
+
+    __slots__ = ("_s", "_i", "_type", "_kids", "_attrs")
+
+    def __init__(self, snap: Snapshot, i: int):
+        self._s = snap
+        self._i = i
+        self._type = snap.string(snap.c_type[i])  # 分发、统计都先读 type，建视图时直接取出
+        self._kids = None
+        self._attrs = None
+
+    @property
+    def index(self) -> int:
+        return self._i
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def name(self):
+        return self._s.string(self._s.c_name[self._i])
+
+    @property
+    def value(self):
+        return self._s.string(self._s.c_value[self._i])
+
+    @property
+    def line(self):
+        v = self._s.c_line[self._i]
+        return None if v == NONE else v
+
+    @property
+    def column(self):
+        v = self._s.c_column[self._i]
+        return None if v == NONE else v
+
+    @property
+    def endLine(self):
+        v = self._s.c_end_line[self._i]
+        return None if v == NONE else v
+
+    @property
+    def endColumn(self):
+        v = self._s.c_end_column[self._i]
+        return None if v == NONE else v
+
+    @property
+    def attrs(self):
+        a = self._attrs
+        if a is None:
+            s, i = self._s, self._i
+            if not s.c_flags[i] & _F_ATTRS:
+                return None
+            start = s.c_attr_start[i]
+            keys, values, string = s.attr_keys, s.attr_values, s.string
+            a = self._attrs = {string(keys[j]): string(values[j]) for j in range(start, start + s.c_attr_count[i])}
+        return a
+
+    @property
+    def children(self):
+        kids = self._kids
+        if kids is None:
+            s, i = self._s, self._i
+            if not s.c_flags[i] & _F_CHILDREN:
+                return None
+            kids = self._kids = tuple(self.iter_children()) or _EMPTY
+        return kids
+
+    def iter_children(self) -> Iterator["NodeView"]:
+        """按顺序产出子节点的新视图（不缓存：逐个转换 File 时，转换完的子树可以随即释放）。"""
+        s = self._s
+        nxt = s.c_next_sibling
+        j = s.c_first_child[self._i] if s.c_child_count[self._i] else NONE
+        while j != NONE:
+            yield NodeView(s, j)
+            j = nxt[j]
+
+    @property
+    def prunedTypes(self):
+        s, i = self._s, self._i
+        n = s.c_pruned_count[i]
+        if not n:
+            return None
+        start = s.c_pruned_start[i]
+        return {s.string(s.pruned_types[j]): s.pruned_counts[j] for j in range(start, start + n)}
+
+    @property
+    def extra(self):
+        j = self._s.c_extra[self._i]
+        return None if j == NONE else json.loads(self._s.string(j))
+
+    def nested(self) -> List[Any]:
+        # 列里只有字符串与整数，非标量值都在 extra 里
+        return [v for v in (self.attrs, self.extra) if v]
+
+    def get(self, key: str, default=None):
+        if self._s.c_extra[self._i] != NONE:
+            extra = self.extra
+            if key in extra:
+                return extra[key]
+        getter = _GETTERS.get(key)
+        v = getter(self) if getter is not None else None
+        return default if v is None else v
+
+    def __reduce__(self):
+        # 句柄：(快照标识, 子树首行, 行数)，接收方按标识重新映射，不传子树内容
+        s = self._s
+        return s.opener, (s.path, self._i, s.subtree_rows(self._i))
+
+
+_GETTERS = {name: getattr(NodeView, name).fget for name in FIELDS}
+
+_opened: Dict[Tuple[str, int, int], Snapshot] = {}
+
+
+def open_snapshot(path) -> Snapshot:
+    """打开快照；同一进程内对同一文件（路径 + mtime + 大小）复用已有的映射。"""
+    path = os.path.abspath(os.fspath(path))
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    snap = _opened.get(key)
+    if snap is None:
+        snap = _opened[key] = Snapshot(path)
+    return snap
+
+
+def attach(path: str, i: int, rows: Optional[int] = None) -> NodeView:
+    """NodeView 反序列化入口（进程池 worker 里重新打开同一快照）。"""
+    return checked_view(open_snapshot(path), i, rows)
+
+
+def checked_view(snap: Snapshot, i: int, rows: Optional[int] = None) -> NodeView:
+    # 句柄里的行范围与快照对不上，说明快照已被改写或换了一个
+    if not 0 <= i < snap.nodes or (rows is not None and snap.subtree_rows(i) != rows):
+        raise ValueError(f"节点句柄 ({i}, {rows}) 与快照 {snap.path} 不符")
+    return snap.view(i)
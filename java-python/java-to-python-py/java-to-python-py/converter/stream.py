@@ -0,0 +1,180 @@
+import json
+import re
+from typing import Any, Dict, Iterator
+
+_WS = " \t\r\n"
+_STRUCT_RE = re.compile(r'[{}\[\]"]')
+_STR_RE = re.compile(r'["\\]')
+_SCALAR_END_RE = re.compile(r'[,}\]\s]')
+
+STREAM_ROOT_TYPES = ("Project", "CompilationUnit")
+
+
+class ProjectStreamReader:
+    """
+    Project JSON 增量读取器（仅标准库）：
+      - 顶层对象里除 children 外的键解析进 self.header
+      - children[] 的每个元素（通常是 File 子树）逐个 json.loads 后产出
+        （给定 object_hook 时用它构造节点，如 node.node_hook）
+    峰值内存只取决于最大的单个子树，而不是整个语料。
+    """
+
+    def __init__(self, path, chunk_size: int = 1 << 20, object_hook=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.object_hook = object_hook
+        self.header: Dict[str, Any] = {}
+        self.has_children = False  # 顶层对象里出现过 children 键（可能为空数组）
+        self._fp = None
+        self._buf = ""
+        self._pos = 0
+
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.path, encoding="utf-8") as fp:
+            self._fp = fp
+            self._buf = ""
+            self._pos = 0
+            self.header = {}
+            self.has_children = False
+            try:
+                if self._next_nonws() != "{":
+                    raise ValueError(f"顶层不是 JSON 对象: {self.path}")
+                if self._peek_nonws() == "}":
+                    return
+                while True:
+                    key = json.loads(self._read_value())
+                    if self._next_nonws() != ":":
+                        raise ValueError(f"JSON 格式错误（缺少 ':'）: {self.path}")
+                    if key == "children" and self._peek_nonws() == "[":
+                        self._pos += 1
+                        self.has_children = True
+                        yield from self._iter_array()
+                    else:
+                        self.header[key] = json.loads(self._read_value())
+                    c = self._next_nonws()
+                    if c == "}":
+                        break
+                    if c != ",":
+                        raise ValueError(f"JSON 格式错误（意外字符 {c!r}）: {self.path}")
+            finally:
+                self._fp = None
+                self._buf = ""
+                self._pos = 0
+
+    # ---------------- 内部：缓冲区 ----------------
+
+    def _fill(self) -> bool:
+        chunk = self._fp.read(self.chunk_size)
+        if not chunk:
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek_nonws(self) -> str:
+        while True:
+            buf, n = self._buf, len(self._buf)
+            j = self._pos
+            while j < n and buf[j] in _WS:
+                j += 1
+            self._pos = j
+            if j < n:
+                return buf[j]
+            if not self._fill():
+                raise ValueError(f"JSON 意外结束: {self.path}")
+
+    def _next_nonws(self) -> str:
+        c = self._peek_nonws()
+        self._pos += 1
+        return c
+
+    def _read_value(self) -> str:
+        """返回下一个完整 JSON 值的原始文本（跨块扫描，仅在块边界拼接一次）。"""
+        self._peek_nonws()
+        buf, j = self._buf, self._pos
+        start = j
+        parts = []
+
+        if buf[j] not in '{["':
+            while True:
+                m = _SCALAR_END_RE.search(buf, j)
+                if m:
+                    parts.append(buf[start:m.start()])
+                    self._buf, self._pos = buf, m.start()
+                    return "".join(parts)
+                parts.append(buf[start:])
+                buf = self._fp.read(self.chunk_size)
+                if not buf:
+                    self._buf, self._pos = "", 0
+                    return "".join(parts)
+                start = j = 0
+
+        depth = 0
+        in_str = False
+        escaped = False
+        while True:
+            n = len(buf)
+            while j < n:
+                if escaped:
+                    escaped = False
+                    j += 1
+                    continue
+                if in_str:
+                    m = _STR_RE.search(buf, j)
+                    if m is None:
+                        j = n
+                        break
+                    k = m.start()
+                    j = k + 1
+                    if buf[k] == "\\":
+                        escaped = True
+                        continue
+                    in_str = False
+                    if depth == 0:
+                        parts.append(buf[start:j])
+                        self._buf, self._pos = buf, j
+                        return "".join(parts)
+                    continue
+                m = _STRUCT_RE.search(buf, j)
+                if m is None:
+                    j = n
+                    break
+                k = m.start()
+                j = k + 1
+                c = buf[k]
+                if c == '"':
+                    in_str = True
+                elif c in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        parts.append(buf[start:j])
+                        self._buf, self._pos = buf, j
+                        return "".join(parts)
+            parts.append(buf[start:])
+            buf = self._fp.read(self.chunk_size)
+            if not buf:
+                raise ValueError(f"JSON 意外结束: {self.path}")
+            start = j = 0
+
+    def _iter_array(self) -> Iterator[Dict]:
+        if self._peek_nonws() == "]":
+            self._pos += 1
+            return
+        while True:
+            text = self._read_value()
+            item = json.loads(text, object_hook=self.object_hook)
+            del text
+            yield item
+            del item
+            c = self._next_nonws()
+            if c == "]":
+                return
+            if c != ",":
+                raise ValueError(f"JSON 格式错误（数组内意外字符 {c!r}）: {self.path}")
+
+
+def iter_project_files(path, chunk_size: int = 1 << 20) -> Iterator[Dict]:
+    """逐个产出 Project.children[]（File 子树）。"""
+    return iter(ProjectStreamReader(path, chunk_size))
@@ -0,0 +1,55 @@
+import ast
+import sys
+from typing import Any, Dict, List, Optional
+
+# 语法检查结果只取决于代码文本与 Python 语法版本
+SYNTAX_FINGERPRINT = f"syntax:py{sys.version_info[0]}.{sys.version_info[1]}"
+
+
+def parse_error(code: str) -> Optional[Dict[str, Any]]:
+    """ast.parse 一段代码；通过返回 None，否则返回 {msg, lineno, offset, text}。"""
+    try:
+        ast.parse(code)
+        return None
+    except SyntaxError as e:
+        return {
+            "msg": e.msg,
+            "lineno": e.lineno,
+            "offset": e.offset,
+            "text": e.text or "",
+        }
+
+
+def check_blocks(codes: List[str], jobs: int = 1, executor: str = "process", cache=None) -> List[Optional[Dict]]:
+    """
+    逐块检查语法，按输入顺序返回 parse_error() 的结果。
+      - cache（ConversionCache，指纹为 SYNTAX_FINGERPRINT）命中的块不再解析
+      - 未命中的块多于 jobs 个时分发到进程池/线程池
+    """
+    results: List[Optional[Dict]] = [None] * len(codes)
+    todo = []
+    for i, code in enumerate(codes):
+        key = None
+        if cache is not None:
+            key = cache.key_for(code)
+            hit = cache.get(key)
+            if hit is not None:
+                results[i] = hit.get("error")
+                continue
+        todo.append((i, key))
+
+    pending = [codes[i] for i, _ in todo]
+    if jobs > 1 and len(todo) > jobs:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        pool = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+        with pool(max_workers=jobs) as ex:
+            errors = list(ex.map(parse_error, pending, chunksize=max(1, len(pending) // (jobs * 4))))
+    else:
+        errors = [parse_error(code) for code in pending]
+
+    for (i, key), err in zip(todo, errors):
+        results[i] = err
+        if key is not None:
+            cache.put(key, {"error": err})
+    return results
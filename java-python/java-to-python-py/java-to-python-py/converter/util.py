@@ -1,12 +1,27 @@
 from typing import Any, Dict, List, Optional, Iterable
 
+from converter.node import _FIELD_SET, _MISSING, Node
+
 def get_attr(node: Dict, key: str, default=None):
-    """取 node['attrs'][key] 或顶层 key。"""
-    attrs = node.get("attrs") or {}
-    return attrs.get(key, node.get(key, default))
+    """取 node['attrs'][key] 或顶层 key（node 可以是 dict 或 node.Node；Node 走加载时合并好的 lookup）。"""
+    if node.__class__ is Node:
+        lookup = node.lookup
+        if lookup:
+            v = lookup.get(key, _MISSING)
+            if v is not _MISSING:
+                return v
+        if key in _FIELD_SET:
+            v = getattr(node, key)
+            return default if v is None else v
+        return default
+    attrs = node.get("attrs")
+    if attrs and key in attrs:
+        return attrs[key]
+    return node.get(key, default)
 
 def children(node: Dict) -> List[Dict]:
-    return node.get("children", []) or []
+    """子节点序列；Node 的叶子返回共享的空元组。"""
+    return node.get("children") or ()
 
 def get_modifiers(node: Dict) -> List[str]:
     """将 attrs.modifiers 转为小写 token 列表。兼容 '[public, static]' / 'public static'。"""
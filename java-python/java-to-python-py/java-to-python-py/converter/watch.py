@@ -0,0 +1,260 @@
+import collections
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from converter.cache import converter_fingerprint
+from converter.converter import Converter, efficiency_score
+from converter.mappings import python_node
+from converter.node import load_ast
+from converter.report import write_json_report, write_prometheus
+
+MANIFEST_NAME = ".j2p-manifest.json"
+MANIFEST_VERSION = 1
+PATTERN = "*.json"
+
+
+def file_digest(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def merge_entries(entries: Dict[str, Dict[str, Any]], errors: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    由清单里各文件缓存的统计合成整体报告（格式同 run() 结果 / --report-json），不重新转换：
+    stats 与覆盖率计数累加，效率按合并后的 stats 重算，语法检查按块数汇总。
+    """
+    stats = {"actionable": 0, "converted_ok": 0, "converted_trivial": 0, "fallback_lines": 0,
+             "unhandled_by_type": collections.Counter(), "unmapped_methods": collections.Counter()}
+    counts = collections.Counter()
+    has_coverage = False
+    blocks_total = blocks_ok = lines = 0
+    module_ok = True
+    failed_blocks = []
+    elapsed = 0.0
+    files = {}
+    for rel, e in sorted(entries.items()):
+        st = e.get("stats") or {}
+        for key in ("actionable", "converted_ok", "converted_trivial", "fallback_lines"):
+            stats[key] += st.get(key, 0)
+        for key in ("unhandled_by_type", "unmapped_methods"):
+            stats[key].update(st.get(key) or {})
+        if e.get("coverage") is not None:
+            has_coverage = True
+            counts.update(e["coverage"])
+        syn = e.get("syntax") or {}
+        blocks_total += syn.get("blocks_total", 0)
+        blocks_ok += syn.get("blocks_ok", 0)
+        module_ok = module_ok and syn.get("module_ok", False)
+        failed_blocks += [dict(blk, file=rel) for blk in syn.get("failed_blocks") or ()]
+        lines += e.get("lines", 0)
+        elapsed += e.get("elapsed_ms", 0.0)
+        files[rel] = {"output": e.get("output"), "efficiency": e.get("efficiency"), "lines": e.get("lines", 0),
+                      "module_ok": syn.get("module_ok", False), "blocks_ok": syn.get("blocks_ok", 0),
+                      "blocks_total": syn.get("blocks_total", 0)}
+    stats["unhandled_by_type"] = dict(stats["unhandled_by_type"])
+    stats["unmapped_methods"] = dict(stats["unmapped_methods"])
+    result = {
+        "stats": stats,
+        "syntax": {
+            "module_ok": module_ok,
+            "blocks_total": blocks_total,
+            "blocks_ok": blocks_ok,
+            "rate": (blocks_ok / blocks_total) if blocks_total else (1.0 if module_ok else 0.0),
+            "failed_blocks": failed_blocks,
+        },
+        "efficiency": efficiency_score(stats),
+        "timing": {"elapsed_ms": elapsed, "lines": lines},
+        "files": files,
+    }
+    if has_coverage:
+        conv = Converter(None)
+        result["coverage"] = {
+            t: {"count": c, "handler": conv._handler_name_for_type(t), "python": python_node(t)}
+            for t, c in sorted(counts.items(), key=lambda x: (-x[1], x[0]))
+        }
+    if errors:
+        result["errors"] = dict(sorted(errors.items()))
+    return result
+
+
+class WatchBuild:
+    """
+    增量转换一个目录下的 AST JSON（每个模块一个文件）到 out_dir，镜像目录结构，<name>.json → <name>.py。
+    清单 out_dir/.j2p-manifest.json 记录每个输入的摘要与上次转换的统计：
+      - 只有摘要变化（或转换器指纹变化、输出缺失）的文件才重新转换；mtime / 大小没变时不读文件
+      - 输出先写临时文件再 rename；输入删除时一并删除其输出
+      - 整体报告由清单里缓存的各文件统计合成（merge_entries），不重新转换未变的文件
+    """
+
+    def __init__(self, src_dir, out_dir, report_json=None, prometheus=None, cache_dir=None, coverage=True,
+                 prune=True, jobs=1, executor="process", quiet=False):
+        self.src_dir = Path(src_dir)
+        self.out_dir = Path(out_dir)
+        self.report_json = Path(report_json) if report_json else self.out_dir / "report.json"
+        self.prometheus = prometheus
+        self.cache_dir = cache_dir
+        self.coverage = coverage
+        self.prune = prune
+        self.jobs = jobs
+        self.executor = executor
+        self.quiet = quiet
+        self.manifest_path = self.out_dir / MANIFEST_NAME
+        self.fingerprint = converter_fingerprint() + ("" if coverage else ":no-coverage") + (
+            "" if prune else ":no-prune")
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.errors: Dict[str, str] = {}
+        self._failed: Dict[str, str] = {}  # 转换失败的输入 -> 其摘要（内容不变就不反复重试）
+        self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        if data.get("version") == MANIFEST_VERSION and data.get("fingerprint") == self.fingerprint:
+            self.entries = data.get("files") or {}
+
+    def _save_manifest(self):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "fingerprint": self.fingerprint,
+                                   "files": self.entries}, ensure_ascii=False, sort_keys=True),
+                       encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def scan(self) -> Dict[str, Path]:
+        """输入目录下的 AST 文件：相对路径（/ 分隔）-> 绝对路径。输出目录在输入目录里时跳过它。"""
+        out = self.out_dir.resolve()
+        found = {}
+        for p in sorted(self.src_dir.rglob(PATTERN)):
+            rp = p.resolve()
+            if rp == out or out in rp.parents or not p.is_file():
+                continue
+            found[p.relative_to(self.src_dir).as_posix()] = p
+        return found
+
+    def _output_for(self, rel: str) -> Path:
+        return self.out_dir / Path(rel).with_suffix(".py")
+
+    def _convert(self, rel: str, path: Path, digest: str, st: os.stat_result) -> Dict[str, Any]:
+        out = self._output_for(rel)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+        try:
+            with open(path, encoding="utf-8") as f:
+                ast = load_ast(f, pruned=self.prune)
+            result = Converter(ast).run(str(path), tmp, cache_dir=self.cache_dir, coverage=self.coverage,
+                                        jobs=self.jobs, executor=self.executor, quiet=True)
+            os.replace(tmp, out)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        syntax = result.get("syntax") or {}
+        return {
+            "digest": digest,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "output": out.relative_to(self.out_dir).as_posix(),
+            "stats": result["stats"],
+            "efficiency": result["efficiency"],
+            "syntax": {
+                "module_ok": syntax.get("module_ok", False),
+                "blocks_total": syntax.get("blocks_total", 0),
+                "blocks_ok": syntax.get("blocks_ok", 0),
+                "failed_blocks": [{"name": b.get("name"), "error": b.get("error")}
+                                  for b in syntax.get("blocks", []) if not b.get("ok")],
+            },
+            "coverage": {t: v["count"] for t, v in result["coverage"].items()} if "coverage" in result else None,
+            "lines": result["timing"].get("lines", 0),
+            "elapsed_ms": result["timing"].get("elapsed_ms", 0.0),
+        }
+
+    def build_once(self) -> Dict[str, Any]:
+        """扫描一遍并增量转换，必要时重写整体报告；返回本轮摘要 {converted, unchanged, removed, failed, elapsed_ms}。"""
+        start = time.perf_counter()
+        found = self.scan()
+        converted: List[str] = []
+        failed: List[str] = []
+        removed = [rel for rel in self.entries if rel not in found]
+        for rel in removed:
+            try:
+                self._output_for(rel).unlink()
+            except FileNotFoundError:
+                pass
+            del self.entries[rel]
+        for rel in [rel for rel in self.errors if rel not in found]:
+            self.errors.pop(rel, None)
+            self._failed.pop(rel, None)
+        unchanged = 0
+        dirty = False  # 只有 mtime 变了也要回写清单
+        for rel, path in found.items():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entry = self.entries.get(rel)
+            if (entry and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size
+                    and self._output_for(rel).exists()):
+                unchanged += 1
+                continue
+            try:
+                digest = file_digest(path)
+            except OSError:
+                continue
+            if entry and entry.get("digest") == digest and self._output_for(rel).exists():
+                # 只是被 touch 了：更新 mtime，不重新转换
+                entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+                unchanged += 1
+                dirty = True
+                continue
+            if self._failed.get(rel) == digest:
+                continue
+            try:
+                self.entries[rel] = self._convert(rel, path, digest, st)
+                self.errors.pop(rel, None)
+                self._failed.pop(rel, None)
+                converted.append(rel)
+            except Exception as e:
+                self.errors[rel] = f"{type(e).__name__}: {e}"
+                self._failed[rel] = digest
+                failed.append(rel)
+        if converted or removed or failed or not self.report_json.exists():
+            self._save_manifest()
+            merged = merge_entries(self.entries, self.errors)
+            write_json_report(merged, self.report_json)
+            if self.prometheus:
+                write_prometheus(merged, self.prometheus)
+        elif dirty:
+            self._save_manifest()
+        summary = {
+            "converted": converted,
+            "unchanged": unchanged,
+            "removed": removed,
+            "failed": failed,
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        }
+        if not self.quiet and (converted or removed or failed):
+            for rel in failed:
+                print(f"❌ {rel}: {self.errors[rel]}")
+            print(f"🔁 增量 → 转换: {len(converted)} | 未变: {unchanged} | 删除: {len(removed)} | "
+                  f"失败: {len(failed)} | 用时: {summary['elapsed_ms']:.1f} ms")
+        return summary
+
+    def watch(self, interval: float = 1.0):
+        """轮询输入目录（仅标准库），直到 Ctrl-C。"""
+        if not self.quiet:
+            print(f"👀 监视 {self.src_dir} → {self.out_dir}（每 {interval:g} 秒）")
+        self.build_once()
+        try:
+            while True:
+                time.sleep(interval)
+                self.build_once()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,105 @@
+import io
+import os
+from typing import Iterable, List
+
+from converter.emitter import Line, render_text
+from converter.postprocess import MainPatcher
+
+
+class ModuleWriter:
+    """
+    流式写出转换结果，全程不在内存里拼整份模块：
+      - write_lines()：转换出的行（可带深度标记）即时追加到 spool 文件（out_py 旁的 .<name>.<pid>.spool，close() 时删除）
+      - finish(imports)：在输出文件里写 import 头，再逐行把 spool 经过
+        MainPatcher（main 提取 / 去重 / 守卫）拷贝过去
+      - read_code()：语法检查需要时从同一句柄读回代码部分
+      - write_report()：报告注释写进同一句柄
+      - close()：关闭 spool 与输出句柄
+    输出与旧的 "\n".join → 前置 import → model_patch_code → 追加报告 完全一致。
+    out_py 为 None 时 spool 与输出都在内存里（StringIO），不碰文件系统（批量转换小 AST 用）。
+    """
+
+    def __init__(self, out_py, postprocess: bool = True):
+        self.out_py = out_py
+        self.postprocess = postprocess
+        self.count = 0  # 写入的行数（与原来 len(lines) 口径一致）
+        self._spool_path = None
+        if out_py is None:
+            self._spool = io.StringIO(newline="")
+        else:
+            # 不用 tempfile：它会带入 random / shutil 等，拖慢每次命令行转换的冷启动
+            folder, name = os.path.split(os.path.abspath(out_py))
+            self._spool_path = os.path.join(folder, f".{name}.{os.getpid()}.spool")
+            self._spool = open(self._spool_path, "w+", encoding="utf-8", newline="")
+        self._fh = None
+
+    def write_lines(self, lines: List[Line]):
+        if not lines:
+            return
+        if self.count:
+            self._spool.write("\n")
+        self._spool.write(render_text(lines))
+        self.count += len(lines)
+
+    def finish(self, imports: Iterable[str] = ()):
+        imports = sorted(imports)
+        header = "\n".join(imports) + "\n\n" if imports else ""
+        if self.out_py is None:
+            self._fh = io.StringIO(newline="")
+        else:
+            self._fh = open(self.out_py, "w+", encoding="utf-8", newline="")
+        if self.postprocess:
+            try:
+                self._copy(header, patch=True)
+                return
+            except Exception:
+                # 与旧逻辑一致：后处理失败时输出未处理的代码
+                self._fh.seek(0)
+                self._fh.truncate()
+        self._copy(header, patch=False)
+
+    def _copy(self, header: str, patch: bool):
+        patcher = MainPatcher(self._fh.write) if patch else None
+        feed = patcher.feed if patcher else self._fh.write
+        for ln in header.splitlines(keepends=True):
+            feed(ln)
+        # 正文等价于 "\n".join(lines).rstrip() + "\n"：末尾空白行暂存，最后丢弃
+        pending: List[str] = []
+        self._spool.seek(0)
+        for raw in self._spool:
+            for ln in raw.splitlines(keepends=True):
+                if ln.strip():
+                    for p in pending:
+                        feed(p)
+                    pending = [ln]
+                else:
+                    pending.append(ln)
+        if pending and pending[0].strip():
+            feed(pending[0].rstrip() + "\n")
+        else:
+            feed("\n")
+        if patcher:
+            patcher.close()
+
+    def read_code(self) -> str:
+        self._fh.flush()
+        self._fh.seek(0)
+        code = self._fh.read()
+        self._fh.seek(0, os.SEEK_END)
+        return code
+
+    def write_report(self, text: str):
+        self._fh.write(text)
+
+    def close(self):
+        self._spool.close()
+        if self._spool_path is not None:
+            try:
+                os.remove(self._spool_path)
+            except OSError:
+                pass
+            self._spool_path = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
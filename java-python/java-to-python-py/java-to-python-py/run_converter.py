@@ -1,13 +1,100 @@
 import argparse
-import json
-import re
-from pathlib import Path
+import contextlib
+import sys
 
 from converter.converter import Converter
+from converter.node import is_snapshot, load_ast
+
+# 子命令（快照 / 服务 / 映射包）与报告、拆分输出用到的模块在各自分支里导入：
+# 普通转换的冷启动不为 asyncio、zipfile / xml、mmap 等付费（见 python -m benchmarks startup）
+
+
+def convert_ast_main(argv):
+    """convert-ast 子命令：Project JSON → 二进制快照（之后可直接作为 in_ast 传入）。"""
+    parser = argparse.ArgumentParser(
+        prog="run_converter.py convert-ast",
+        description="Compile a Java AST JSON file into a binary snapshot that loads via mmap.",
+    )
+    parser.add_argument("in_json", help="Path to the Java AST JSON file.")
+    parser.add_argument("out", nargs="?", default=None, help="Snapshot path (defaults to <in_json stem>.j2pa).")
+    parser.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="Keep subtrees no handler reads (see converter/prune.py).",
+    )
+    args = parser.parse_args(argv)
+    from pathlib import Path
+
+    from converter.snapshot import write_snapshot
+
+    out = args.out or str(Path(args.in_json).with_suffix(".j2pa"))
+    info = write_snapshot(args.in_json, out, pruned=not args.no_prune)
+    print(f"✅ 快照 → {out}: {info['nodes']} 个节点, {info['strings']} 个字符串, "
+          f"{info['bytes'] / 1024:.1f} KB, 用时 {info['elapsed_ms']:.1f} ms")
+
+
+def serve_main(argv):
+    """serve 子命令：常驻转换服务（JSON-lines，Unix socket 或 stdin/stdout），见 converter/server.py。"""
+    parser = argparse.ArgumentParser(
+        prog="run_converter.py serve",
+        description="Serve conversion requests as JSON lines with warm caches and a worker pool.",
+    )
+    parser.add_argument("--socket", default=None, metavar="PATH",
+                        help="Listen on a Unix socket instead of stdin/stdout.")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker count (defaults to the CPU count).")
+    parser.add_argument("--executor", choices=("process", "thread"), default="process",
+                        help="Worker pool: 'thread' shares one warm process (free-threaded Python).")
+    args = parser.parse_args(argv)
+    import asyncio
+
+    from converter.server import ConversionServer
+
+    server = ConversionServer(args.jobs, args.executor)
+    try:
+        if args.socket:
+            print(f"✅ 服务已启动: {args.socket}（{server.executor} × {server.jobs}）", file=sys.stderr)
+            asyncio.run(server.serve_unix(args.socket))
+        else:
+            asyncio.run(server.serve_stdio())
+    except KeyboardInterrupt:
+        pass
+
+
+def build_mappings_main(argv):
+    """build-mappings 子命令：API_MAP + mappings_additions.json + 映射表.xlsx → 预建索引的映射包，并报告冲突。"""
+    parser = argparse.ArgumentParser(
+        prog="run_converter.py build-mappings",
+        description="Compile API_MAP, mappings_additions.json and the mapping spreadsheet into one versioned bundle.",
+    )
+    parser.add_argument("--out", default=None, help="Bundle path (defaults to converter/mappings.bundle).")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 when any conflict is reported.")
+    args = parser.parse_args(argv)
+    from converter.bundle import BUNDLE_PATH, build_bundle, format_conflict
+
+    args.out = args.out or BUNDLE_PATH
+    info = build_bundle(args.out)
+    for c in info["conflicts"]:
+        print(f"⚠️ 冲突 {format_conflict(c)}")
+    print(f"✅ 映射包 → {args.out}: 版本 {info['version'][:12]}, {info['nodes']} 个节点映射, "
+          f"{len(info['conflicts'])} 处冲突, {info['bytes'] / 1024:.1f} KB, 用时 {info['elapsed_ms']:.1f} ms")
+    return 1 if args.strict and info["conflicts"] else 0
+
 
 def main():
-    parser = argparse.ArgumentParser(description="Convert Java AST JSON to Python.")
-    parser.add_argument("in_ast", help="Path to the Java AST JSON file.")
+    if sys.argv[1:2] == ["build-mappings"]:
+        return build_mappings_main(sys.argv[2:])
+    if sys.argv[1:2] == ["convert-ast"]:
+        return convert_ast_main(sys.argv[2:])
+    if sys.argv[1:2] == ["serve"]:
+        return serve_main(sys.argv[2:])
+    parser = argparse.ArgumentParser(
+        description="Convert Java AST JSON to Python.",
+        epilog="Subcommands: run_converter.py convert-ast <in_json> [out] compiles the JSON into a binary snapshot; "
+               "run_converter.py serve [--socket PATH] runs a long-lived conversion server; "
+               "run_converter.py build-mappings compiles the mapping sources into a bundle.",
+    )
+    parser.add_argument("in_ast", nargs="?", default=None,
+                        help="Path to the Java AST JSON file or a snapshot from convert-ast.")
     parser.add_argument("out_py", nargs="?", default="converted.py", help="Output Python file path.")
     parser.add_argument(
         "--split-blocks",
@@ -19,21 +106,165 @@ def main():
         default=None,
         help="Output directory for split blocks (defaults to <out_py stem>_blocks).",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read Project.children[] one File subtree at a time (peak memory bounded by the largest File).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Convert File subtrees in N worker processes and merge results in original file order.",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=("process", "thread"),
+        default="process",
+        help="Worker pool used with --jobs: 'thread' shares one read-only Converter (free-threaded Python).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Content-addressed cache of per-File conversion results (reused when the File AST is unchanged).",
+    )
+    parser.add_argument(
+        "--no-coverage",
+        action="store_true",
+        help="Skip AST node-type coverage counting and its report section.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record calls, inclusive and exclusive wall time per handler and AST node type.",
+    )
+    parser.add_argument(
+        "--rule-stats",
+        action="store_true",
+        help="Count hits and wall time of each expression rewrite rule, reported by cost.",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Trace allocations (tracemalloc): peak/retained memory per phase and per File, top allocation sites.",
+    )
+    parser.add_argument(
+        "--report-json",
+        default=None,
+        metavar="PATH",
+        help="Write the run result (stats, syntax, coverage, per-phase timing) as JSON.",
+    )
+    parser.add_argument(
+        "--prometheus",
+        default=None,
+        metavar="PATH",
+        help="Write run metrics in Prometheus text format (for the node_exporter textfile collector).",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not print the console report.",
+    )
+    parser.add_argument(
+        "--dict-nodes",
+        action="store_true",
+        help="Load the AST as plain dicts instead of compact slotted nodes (more memory; for debugging).",
+    )
+    parser.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="Keep subtrees no handler reads instead of pruning them at load time (see converter/prune.py).",
+    )
+    parser.add_argument(
+        "--no-shared-ast",
+        action="store_true",
+        help="With --jobs (process executor), pickle each File subtree to workers instead of sharing one "
+             "node table in shared memory.",
+    )
+    parser.add_argument(
+        "--watch",
+        default=None,
+        metavar="DIR",
+        help="Incrementally convert every *.json AST under DIR into --out, reconverting only changed files.",
+    )
+    parser.add_argument("--out", default=None, metavar="OUTDIR", help="Output directory for --watch.")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds for --watch.")
+    parser.add_argument("--once", action="store_true", help="With --watch, run a single incremental pass and exit.")
     args = parser.parse_args()
 
+    if args.watch:
+        if not args.out:
+            parser.error("--watch 需要 --out OUTDIR")
+        from converter.watch import WatchBuild
+
+        build = WatchBuild(args.watch, args.out, report_json=args.report_json, prometheus=args.prometheus,
+                           cache_dir=args.cache_dir, coverage=not args.no_coverage, prune=not args.no_prune,
+                           jobs=args.jobs, executor=args.executor, quiet=args.quiet)
+        if args.once:
+            summary = build.build_once()
+            return 1 if summary["failed"] else 0
+        build.watch(args.interval)
+        return
+    if args.in_ast is None:
+        parser.error("需要 in_ast（或 --watch DIR --out OUTDIR）")
+
     in_json = args.in_ast
     out_py = args.out_py
 
-    with open(in_json, encoding="utf-8") as f:
-        ast = json.load(f)
-    conv = Converter(ast)
-    result = conv.run(in_json, out_py)
+    # load 阶段发生在 run() 之前，需要先开始记录
+    tracker = None
+    if args.memory:
+        from converter.memory import MemoryTracker
+
+        tracker = MemoryTracker()
+    snapshot = not args.stream and is_snapshot(in_json)
+    try:
+        shared = not args.no_shared_ast and args.jobs > 1 and args.executor == "process"
+        if args.stream or (shared and not args.dict_nodes and not snapshot):
+            # 流式读取 / 共享内存节点表：由 Converter 自己读输入，主进程不先建整棵 Node 树
+            conv = Converter(None)
+            conv.compact_nodes = not args.dict_nodes
+            conv.prune_ast = not args.no_prune
+            conv.shared_ast = shared
+            result = conv.run(in_json, out_py, stream=args.stream, jobs=args.jobs, executor=args.executor,
+                              cache_dir=args.cache_dir, coverage=not args.no_coverage, quiet=args.quiet,
+                              profile=args.profile, rule_stats=args.rule_stats, memory=tracker)
+        else:
+            with tracker.phase("load") if tracker else contextlib.nullcontext():
+                if snapshot:
+                    from converter.snapshot import open_snapshot
+
+                    ast = open_snapshot(in_json).root
+                else:
+                    with open(in_json, encoding="utf-8") as f:
+                        ast = load_ast(f, compact=not args.dict_nodes, pruned=not args.no_prune)
+            conv = Converter(ast)
+            conv.shared_ast = shared
+            result = conv.run(in_json, out_py, jobs=args.jobs, executor=args.executor,
+                              cache_dir=args.cache_dir, coverage=not args.no_coverage, quiet=args.quiet,
+                              profile=args.profile, rule_stats=args.rule_stats, memory=tracker)
+    finally:
+        if tracker:
+            tracker.close()
+
+    if args.report_json:
+        from converter.report import write_json_report
+
+        write_json_report(result, args.report_json, out_py)
+    if args.prometheus:
+        from converter.report import write_prometheus
+
+        write_prometheus(result, args.prometheus)
 
     if args.split_blocks:
         blocks = (result.get("syntax") or {}).get("blocks", [])
         if not blocks:
-            print("⚠️ 未发现可拆分的顶层块。")
+            if not args.quiet:
+                print("⚠️ 未发现可拆分的顶层块。")
             return
+        import re
+        from pathlib import Path
+
         out_path = Path(out_py)
         split_dir = Path(args.split_dir) if args.split_dir else out_path.with_suffix("").with_name(
             f"{out_path.stem}_blocks"
@@ -44,7 +275,8 @@ def main():
             safe = re.sub(r"[^0-9A-Za-z_]+", "_", name).strip("_") or f"block_{idx}"
             out_file = split_dir / f"{idx:02d}_{safe}.py"
             out_file.write_text(blk.get("code", "").rstrip() + "\n", encoding="utf-8")
-        print(f"✅ 已拆分输出到: {split_dir}")
+        if not args.quiet:
+            print(f"✅ 已拆分输出到: {split_dir}")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import os
+import shutil
+
+import pytest
+
+from converter import bundle
+from converter.bundle import api_conflicts, format_conflict, load_bundle, load_or_build, parse_node_table
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    # 来源换成临时副本；bundle_version 按进程缓存，清掉它相当于换了一个新进程
+    copies = []
+    for name, path in bundle.SOURCES:
+        shutil.copy(path, tmp_path / name)
+        copies.append((name, str(tmp_path / name)))
+    monkeypatch.setattr(bundle, "SOURCES", tuple(copies))
+    bundle.bundle_version.cache_clear()
+    compiled = []
+    compile_sources = bundle.compile_sources
+    monkeypatch.setattr(bundle, "compile_sources", lambda: compiled.append(1) or compile_sources())
+    yield dict(copies), compiled
+    bundle.bundle_version.cache_clear()
+
+
+def test_stale_bundle_is_recompiled(tmp_path, sources):
+    paths, compiled = sources
+    out = str(tmp_path / "mappings.bundle")
+    first = load_or_build(out)
+    assert len(compiled) == 1 and load_bundle(out)["version"] == first["version"]
+    load_or_build(out)
+    assert len(compiled) == 1
+
+    # 只 touch：版本不变，不重新编译，只记下新的 (mtime_ns, size)
+    st = os.stat(paths["映射表.xlsx"])
+    os.utime(paths["映射表.xlsx"], ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    bundle.bundle_version.cache_clear()
+    load_or_build(out)
+    assert len(compiled) == 1 and load_bundle(out)["stats"] == bundle.source_stats()
+
+    # 改动来源：旧包作废，重新编译并写回
+    with open(paths["mappings_additions.json"], "a", encoding="utf-8") as f:
+        f.write("\n")
+    bundle.bundle_version.cache_clear()
+    assert load_bundle(out) is None
+    rebuilt = load_or_build(out)
+    assert len(compiled) == 2 and rebuilt["version"] != first["version"]
+    assert load_bundle(out)["version"] == rebuilt["version"] == bundle.bundle_version()
+
+
+def test_format_conflict_reports_duplicates():
+    rows = [
+        ["JavaParser 节点", "Python ast 节点", "说明", "示例"],
+        ["语句"],
+        ["IfStmt", "If", None, None],
+        ["IfStmt", "IfExp", None, None],
+        ["ImportDeclaration (静态导入)", "ImportFrom", None, None],
+        ["ImportDeclaration (静态导入)", "Import", None, None],
+    ]
+    nodes, conflicts = parse_node_table(rows)
+    assert nodes["ifstmt"]["python"] == "If"
+    api_map = {"List": {"fqn": "java.util.List", "type": "list"},
+               "ArrayList": {"fqn": "java.util.List", "type": "dict"}}
+    conflicts = api_conflicts(api_map, {"java.util.List": {"py": "tuple"}}) + conflicts
+    assert [format_conflict(c) for c in conflicts] == [
+        "API_MAP: java.util.List → 保留 'List: list'，忽略 'ArrayList: dict'",
+        "mappings_additions.json: java.util.List → 保留 'list'，忽略 'tuple'",
+        "映射表.xlsx 第 4 行: IfStmt → 保留 'If'，忽略 'IfExp'",
+        "映射表.xlsx 第 6 行: ImportDeclaration (静态导入) → 保留 'ImportFrom'，忽略 'Import'",
+    ]
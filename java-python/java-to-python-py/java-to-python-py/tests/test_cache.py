@@ -0,0 +1,82 @@
+import ast
+import json
+import os
+import shutil
+
+import pytest
+
+from converter import cache as cache_mod
+from converter.cache import ConversionCache
+from converter.converter import Converter, convert
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NODE = {"type": "File", "name": "A.java", "children": [{"type": "Class", "name": "A"}]}
+RESULT = {"lines": ["class A:", [1, "pass"]], "stats": {"converted_ok": 1}, "profile": {"ms": 1.0}}
+
+
+def _project(copies):
+    with open(os.path.join(ROOT, "ast_Demo.json"), encoding="utf-8") as f:
+        demo = json.load(f)
+    return {**demo, "children": demo["children"] * copies}
+
+
+def test_hit_and_miss(tmp_path):
+    cache = ConversionCache(tmp_path, "fp")
+    key = cache.key_for(NODE)
+    assert cache.get(key) is None
+    cache.put(key, RESULT)
+    # 只对本次运行有意义的字段不落盘
+    assert ConversionCache(tmp_path, "fp").get(key) == {k: v for k, v in RESULT.items() if k != "profile"}
+    # 键只看内容，与键顺序 / 节点形式无关
+    assert cache.key_for(dict(reversed(list(NODE.items())))) == key
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_fingerprint_change_invalidates(tmp_path):
+    old = ConversionCache(tmp_path, "fp-1")
+    old.put(old.key_for(NODE), RESULT)
+    new = ConversionCache(tmp_path, "fp-2")
+    assert new.key_for(NODE) != old.key_for(NODE)
+    assert new.get(new.key_for(NODE)) is None
+
+
+def test_converter_fingerprint_follows_sources(tmp_path, monkeypatch):
+    pkg = tmp_path / "converter"
+    pkg.mkdir()
+    for name in ("cache.py", "exprs.py", "mappings_additions.json"):
+        shutil.copy(os.path.join(ROOT, "converter", name), pkg / name)
+    monkeypatch.setattr(cache_mod, "_PKG_DIR", pkg)
+    before = cache_mod.converter_fingerprint.__wrapped__()
+    with open(pkg / "exprs.py", "a", encoding="utf-8") as f:
+        f.write("\n# 改动\n")
+    assert cache_mod.converter_fingerprint.__wrapped__() != before
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ConversionCache(tmp_path, "fp")
+    key = cache.key_for(NODE)
+    cache.put(key, RESULT)
+    cache._path(key).write_text('{"lines": [', encoding="utf-8")  # 写到一半的条目
+    assert cache.get(key) is None and cache.misses == 1
+    cache.put(key, RESULT)
+    assert cache.get(key)["lines"] == RESULT["lines"]
+
+
+@pytest.mark.parametrize("options", [{}, {"jobs": 2, "executor": "thread"}])
+def test_warm_rerun_does_not_convert_or_parse(tmp_path, monkeypatch, options):
+    cold = convert(_project(2), cache_dir=str(tmp_path), **options)
+    assert cold.cache["misses"] >= 1  # 两份相同的文件共用一个条目
+
+    calls = []
+
+    def record(name):
+        return lambda *args, **kwargs: calls.append(name)
+
+    # 命中缓存时不应再转换或解析；断言前先撤掉替身（pytest 报错时自己也要用 ast.parse）
+    with monkeypatch.context() as m:
+        m.setattr(Converter, "convert_isolated", record("convert_isolated"))
+        m.setattr(ast, "parse", record("ast.parse"))
+        warm = convert(_project(2), cache_dir=str(tmp_path), **options)
+    assert calls == []
+    assert warm.cache["misses"] == 0 and warm.cache["syntax"]["misses"] == 0
+    assert (warm.content, warm.stats, warm.syntax) == (cold.content, cold.stats, cold.syntax)
@@ -0,0 +1,25 @@
+import json
+import os
+
+import pytest
+
+from converter.converter import convert
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _project(copies):
+    # ast_Demo.json 只有一个 File：复制成多文件项目，后面的文件会看到前一个文件留下的符号表
+    with open(os.path.join(ROOT, "ast_Demo.json"), encoding="utf-8") as f:
+        demo = json.load(f)
+    return {**demo, "children": demo["children"] * copies}
+
+
+@pytest.mark.parametrize("options", [{}, {"jobs": 2, "executor": "thread"}])
+def test_files_are_converted_in_isolation(options):
+    single = convert(_project(1), syntax=False)
+    double = convert(_project(2), syntax=False, **options)
+    # 每个文件独立转换：两份相同文件的统计正好翻倍，串行与 --jobs 一致
+    assert double.stats == {k: {m: 2 * n for m, n in v.items()} if isinstance(v, dict) else 2 * v
+                            for k, v in single.stats.items()}
+    assert double.content == convert(_project(2), syntax=False, jobs=2, executor="thread").content
@@ -0,0 +1,19 @@
+from benchmarks.corpus import CorpusSpec, count_nodes, generate_project
+from converter.converter import convert
+
+
+def test_corpus_is_deterministic_per_seed():
+    spec = CorpusSpec(files=3, seed=1)
+    assert generate_project(spec) == generate_project(CorpusSpec(**spec.to_dict()))
+    assert generate_project(spec) != generate_project(CorpusSpec(files=3, seed=2))
+
+
+def test_corpus_scales_and_converts():
+    small, large = CorpusSpec(files=2), CorpusSpec(files=4, classes=3, depth=3, seed=5)
+    projects = [generate_project(s) for s in (small, large)]
+    assert [len(p["children"]) for p in projects] == [2, 4]
+    assert count_nodes(projects[1]) > 2 * count_nodes(projects[0])
+    # 基准测的是能跑通的转换：生成的代码要整体可解析
+    for project in projects:
+        result = convert(project)
+        assert result.syntax["module_ok"] and result.stats["converted_ok"] > 0
@@ -0,0 +1,25 @@
+from converter.emitter import BLANK_EMPTY, BLANK_PAD, INDENT, indent, indent_block, render_lines, render_text
+
+
+def test_indent_blank_modes():
+    lines = ["a", " ", (1, "b"), (2, "")]
+    assert render_lines(indent(lines)) == ["    a", "     ", "        b", "            "]
+    assert render_lines(indent(lines, 1, BLANK_EMPTY)) == ["    a", "", "        b", ""]
+    assert render_lines(indent(lines, 2, BLANK_PAD)) == ["        a", "        ", "            b", "        "]
+    assert indent_block([]) == [(1, "pass")]
+    assert indent_block([""]) == [""]
+
+
+def test_render_deeper_than_prefix_table():
+    lines = ["x"]
+    for _ in range(40):
+        lines = indent(lines)
+    assert render_text(lines + ["y"]) == INDENT * 40 + "x\ny"
+
+
+def test_deep_render_leaves_prefix_table_alone():
+    from converter import emitter
+
+    before = emitter._PREFIXES
+    assert emitter.render((100, "x")) == INDENT * 100 + "x"
+    assert emitter._PREFIXES is before and len(before) == 32
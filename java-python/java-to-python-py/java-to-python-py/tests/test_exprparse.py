@@ -0,0 +1,38 @@
+import pytest
+
+from converter import exprparse
+from converter.exprs import _rewrite_common_expr_regex
+
+
+def rewrite(src):
+    return exprparse.rewrite(src, _rewrite_common_expr_regex)
+
+
+@pytest.mark.parametrize("src, expected", [
+    # 嵌套三目作为 then 分支要加括号；else 分支右结合不用
+    ("a ? b ? c : d : e", "(c if b else d) if a else e"),
+    ("a ? b : c ? d : e", "b if a else d if c else e"),
+    # in 是比较，作为 == 的操作数不能和它连写
+    ("a.get(i).contains(j) == true", "(j in a[i]) == True"),
+    ("set.contains(a ? b : c)", "(b if a else c) in set"),
+    ("!set.contains(x)", "not x in set"),
+    ("a.contains(b).toString()", "(b in a).toString()"),
+    ("new int[n + 1]", "[None] * (n + 1)"),
+    ("a & b == c", "a & (b == c)"),
+    ("int x = a.size() > 0 ? a.get(0) : null", "int x = a[0] if len(a) > 0 else None"),
+])
+def test_precedence(src, expected):
+    assert rewrite(src) == expected
+
+
+def test_long_chain_is_parsed():
+    src = " && ".join(f"grid.get(r{i}).contains(c{i})" for i in range(400))
+    assert len(src) > 10000
+    out = rewrite(src)
+    assert out == " and ".join(f"c{i} in grid[r{i}]" for i in range(400))
+
+
+def test_long_call_chain_is_parsed():
+    # 调用链是左深树：生成阶段不能随链长递归
+    src = "a" + "".join(f".f{i}()" for i in range(2000)) + ".size()"
+    assert rewrite(src) == "len(" + src[:-len(".size()")] + ")"
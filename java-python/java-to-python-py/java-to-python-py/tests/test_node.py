@@ -0,0 +1,29 @@
+import io
+import pickle
+
+from converter.node import load_ast
+from converter.util import get_attr
+
+_SRC = '{"type": "Parameter", "name": "x", "line": 3, "attrs": {"type": "int", "final": "true"}, "extra": "e"}'
+
+
+def _node():
+    return load_ast(io.StringIO(_SRC))
+
+
+def test_get_attr_matches_dict_lookup():
+    node, raw = _node(), load_ast(io.StringIO(_SRC), compact=False)
+    for key in ("type", "final", "name", "line", "extra", "column", "missing"):
+        assert get_attr(node, key, "d") == get_attr(raw, key, "d"), key
+    assert get_attr(node, "type") == "int"  # attrs 优先于顶层字段
+
+
+def test_lookup_follows_updates_and_pickle():
+    node = _node()
+    node["attrs"] = {"name": "y"}
+    node["other"] = 1
+    assert get_attr(node, "name") == "y"
+    assert get_attr(node, "type") == "Parameter"
+    assert get_attr(node, "other") == 1
+    clone = pickle.loads(pickle.dumps(node))
+    assert [get_attr(clone, k) for k in ("name", "type", "other")] == ["y", "Parameter", 1]
@@ -0,0 +1,29 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.corpus import CorpusSpec, count_nodes, generate_project
+from converter.converter import convert
+from converter.node import loads_ast
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _demo_text():
+    with open(os.path.join(ROOT, "ast_Demo.json"), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("text", [
+    _demo_text(),
+    json.dumps(generate_project(CorpusSpec(files=3, depth=3, expr_len=6, overloads=2, seed=7))),
+], ids=["demo", "corpus"])
+@pytest.mark.parametrize("compact", [True, False])
+def test_pruning_does_not_change_output(text, compact):
+    full_ast, pruned_ast = loads_ast(text, compact=compact, pruned=False), loads_ast(text, compact=compact)
+    assert count_nodes(pruned_ast) < count_nodes(full_ast)
+    full, pruned = convert(full_ast), convert(pruned_ast)
+    # 剪掉的只是处理器不读的子树：代码逐字节一致，统计与覆盖率（剪枝计数记在父节点上）也一致
+    assert pruned.content.encode("utf-8") == full.content.encode("utf-8")
+    assert (pruned.stats, pruned.syntax, pruned.coverage) == (full.stats, full.syntax, full.coverage)
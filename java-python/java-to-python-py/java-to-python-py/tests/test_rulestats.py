@@ -0,0 +1,34 @@
+import json
+import os
+import threading
+
+from converter.converter import convert
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _demo():
+    with open(os.path.join(ROOT, "ast_Demo.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _branch_calls(rules):
+    # convert:* 按分支计数，与表达式缓存冷热无关
+    return {k: v["calls"] for k, v in rules.items() if k.startswith("convert:")}
+
+
+def test_rule_stats_are_per_run():
+    solo = _branch_calls(convert(_demo(), rule_stats=True, syntax=False).rules)
+    assert solo
+    results = {}
+
+    def work(name, on):
+        results[name] = [convert(_demo(), rule_stats=on, syntax=False) for _ in range(3)]
+
+    threads = [threading.Thread(target=work, args=("on", True)), threading.Thread(target=work, args=("off", False))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(r.rules is None for r in results["off"])
+    assert all(_branch_calls(r.rules) == solo for r in results["on"])
@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_stdio_live_pipe(executor):
+    # 真实管道 + 请求之间有停顿：读线程此时阻塞在 stdin 上，进程池不能因此卡死
+    proc = subprocess.Popen([sys.executable, "run_converter.py", "serve", "--jobs", "2", "--executor", executor],
+                            cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        proc.stdin.write(b'{"id": 1, "path": "ast_Demo.json"}\n')
+        proc.stdin.flush()
+        time.sleep(1.5)
+        proc.stdin.write(b'{"id": 2, "path": "ast_Demo.json"}\n{"op": "shutdown"}\n')
+        proc.stdin.flush()
+        out, _ = proc.communicate(timeout=60)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    replies = [json.loads(line) for line in out.splitlines()]
+    assert proc.returncode == 0
+    assert [r.get("id") for r in replies[:2]] == [1, 2]
+    assert all(r["ok"] for r in replies)
+    assert replies[0]["result"]["stats"]["converted_ok"] > 0
@@ -0,0 +1,54 @@
+import json
+import os
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from benchmarks.corpus import CorpusSpec, generate_project
+from converter import sharedast
+from converter.converter import Converter
+from converter.node import load_ast
+
+OPTIONS = {"jobs": 2, "executor": "process", "syntax": False}
+
+
+@pytest.fixture
+def in_json(tmp_path):
+    path = tmp_path / "corpus.json"
+    path.write_text(json.dumps(generate_project(CorpusSpec(files=5, depth=3, seed=11))), encoding="utf-8")
+    return str(path)
+
+
+def _convert(shared, **kwargs):
+    conv = Converter(None)
+    conv.shared_ast = shared
+    return conv.convert(**kwargs)
+
+
+def test_shared_ast_matches_pickled_subtrees(in_json, monkeypatch):
+    segments = []
+    from_json = sharedast.SharedAST.from_json.__func__
+
+    def spy(cls, *args, **kwargs):
+        seg = from_json(cls, *args, **kwargs)
+        segments.append(seg.name)
+        return seg
+
+    monkeypatch.setattr(sharedast.SharedAST, "from_json", classmethod(spy))
+    serial = _convert(False, source=in_json, syntax=False)
+    pickled = _convert(False, source=in_json, **OPTIONS)
+    shared = _convert(True, source=in_json, **OPTIONS)
+    assert len(segments) == 1
+    assert shared.content == pickled.content == serial.content
+    assert shared.stats == pickled.stats == serial.stats
+    # 转换结束后段已删除，本进程不再持有
+    assert sharedast._owned == {}
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=segments[0])
+
+
+def test_shared_ast_from_loaded_tree(in_json):
+    with open(in_json, encoding="utf-8") as f:
+        tree = load_ast(f)
+    assert _convert(True, ast=tree, **OPTIONS).content == _convert(False, ast=tree, syntax=False).content
+    assert sharedast._owned == {}
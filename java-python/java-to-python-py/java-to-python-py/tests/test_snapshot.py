@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.corpus import CorpusSpec, generate_project
+from converter.converter import convert
+from converter.node import is_snapshot, load_ast, to_plain
+from converter.snapshot import Snapshot, write_snapshot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEMO = os.path.join(ROOT, "ast_Demo.json")
+
+
+@pytest.fixture(params=["demo", "corpus"])
+def in_json(request, tmp_path):
+    if request.param == "demo":
+        return DEMO
+    path = tmp_path / "corpus.json"
+    path.write_text(json.dumps(generate_project(CorpusSpec(files=3, depth=3, seed=3))), encoding="utf-8")
+    return str(path)
+
+
+def _load(path, pruned):
+    with open(path, encoding="utf-8") as f:
+        return load_ast(f, pruned=pruned)
+
+
+@pytest.mark.parametrize("pruned", [True, False])
+def test_round_trip_matches_json(in_json, tmp_path, pruned):
+    snap_path = str(tmp_path / "ast.j2pa")
+    write_snapshot(in_json, snap_path, pruned=pruned)
+    assert is_snapshot(snap_path) and not is_snapshot(in_json)
+    snap = Snapshot(snap_path)
+    try:
+        assert json.dumps(snap.root, default=to_plain) == json.dumps(_load(in_json, pruned), default=to_plain)
+    finally:
+        snap.close()
+
+
+@pytest.mark.parametrize("options", [{}, {"jobs": 2, "executor": "process"}])
+def test_conversion_matches_json_path(in_json, tmp_path, options):
+    snap_path = str(tmp_path / "ast.j2pa")
+    write_snapshot(in_json, snap_path)
+    from_json = convert(None, source=in_json, **options)
+    from_snap = convert(None, source=snap_path, **options)
+    assert from_snap.content == from_json.content
+    assert (from_snap.stats, from_snap.syntax, from_snap.coverage) == (from_json.stats, from_json.syntax,
+                                                                        from_json.coverage)
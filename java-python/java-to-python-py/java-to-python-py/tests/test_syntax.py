@@ -0,0 +1,35 @@
+from converter import syntax
+from converter.cache import ConversionCache
+from converter.converter import Converter
+from converter.syntax import SYNTAX_FINGERPRINT
+
+GOOD = "class A:\n    pass\n"
+BAD = "class A:\n    pass\n\n\nclass B:\n    def f(self):\n        return (\n"
+
+
+def _check(content, cache):
+    conv = Converter(None)
+    conv.syntax_cache = cache
+    return conv._syntax_check(content)
+
+
+def _no_parse(code):
+    raise AssertionError("ast.parse 不应再执行")
+
+
+def test_module_verdict_is_cached(tmp_path, monkeypatch):
+    for content in (GOOD, BAD):
+        cold = _check(content, ConversionCache(tmp_path, SYNTAX_FINGERPRINT))
+        with monkeypatch.context() as m:
+            m.setattr(syntax, "parse_error", _no_parse)
+            cache = ConversionCache(tmp_path, SYNTAX_FINGERPRINT)
+            assert _check(content, cache) == cold
+        assert cache.misses == 0
+    assert not cold["module_ok"] and cold["blocks_ok"] == 1 and cold["blocks_total"] == 2
+
+
+def test_module_verdict_follows_fingerprint(tmp_path):
+    _check(GOOD, ConversionCache(tmp_path, SYNTAX_FINGERPRINT))
+    cache = ConversionCache(tmp_path, SYNTAX_FINGERPRINT + ":other")
+    assert _check(GOOD, cache)["module_ok"]
+    assert cache.hits == 0
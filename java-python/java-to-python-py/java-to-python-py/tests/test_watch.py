@@ -0,0 +1,52 @@
+import json
+import os
+
+from benchmarks.corpus import CorpusSpec, generate_project
+from converter.converter import convert
+from converter.watch import WatchBuild
+
+NAMES = ("a.json", "pkg/b.json", "pkg/c.json")
+
+
+def _write(path, seed):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(generate_project(CorpusSpec(files=1, seed=seed))), encoding="utf-8")
+    # 显式推进 mtime：同一时间粒度内的两次写入也要能被察觉
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def _outputs(out):
+    return {p.relative_to(out).as_posix(): (p.read_bytes(), p.stat().st_mtime_ns) for p in out.rglob("*.py")}
+
+
+def test_only_changed_inputs_are_reconverted(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    for seed, name in enumerate(NAMES):
+        _write(src / name, seed)
+    build = WatchBuild(src, out, quiet=True)
+    assert sorted(build.build_once()["converted"]) == sorted(NAMES)
+    before = _outputs(out)
+
+    # 只 touch 不改内容：不重新转换
+    st = (src / "a.json").stat()
+    os.utime(src / "a.json", ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert build.build_once()["converted"] == []
+
+    # 改一个文件：只重新转换它，其余输出原封不动
+    _write(src / "pkg/b.json", 42)
+    summary = build.build_once()
+    assert summary["converted"] == ["pkg/b.json"] and summary["unchanged"] == 2
+    after = _outputs(out)
+    assert {k: v for k, v in after.items() if k != "pkg/b.py"} == {k: v for k, v in before.items() if k != "pkg/b.py"}
+    expected = convert(json.loads((src / "pkg/b.json").read_text(encoding="utf-8"))).content
+    assert after["pkg/b.py"][0].decode("utf-8").startswith(expected)
+
+    # 删除输入时一并删除输出；新进程读清单后不再转换
+    (src / "pkg/c.json").unlink()
+    assert build.build_once()["removed"] == ["pkg/c.json"]
+    assert not (out / "pkg/c.py").exists()
+    rerun = WatchBuild(src, out, quiet=True).build_once()
+    assert rerun["converted"] == [] and rerun["unchanged"] == 2
+    report = json.loads((out / "report.json").read_text(encoding="utf-8"))
+    assert report["stats"]["converted_ok"] > 0